@@ -0,0 +1 @@
+# Artifacts module
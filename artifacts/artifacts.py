@@ -0,0 +1,301 @@
+"""
+Artifacts Module
+Content-addressed store for the JSON artefacts of each run.
+
+Payloads (POD-1 customizations, clone responses) are stored once per distinct
+content as gzip-compressed canonical JSON blobs named by their SHA-256:
+
+    output/artifacts/blobs/ab/abcdef....json.gz
+
+A small SQLite manifest maps (run, template label, kind) to a blob, so
+repeated runs write no blob for unchanged payloads and two templates whose
+names share a prefix can never overwrite each other. Blobs are written to a
+temporary file and renamed into place, so a blob is either complete or absent.
+
+Streamed payloads (put_stream) are compressed and hashed chunk by chunk as
+they arrive and stored byte for byte as received; their digest covers those
+bytes rather than the canonical form. The compressed bytes stay in memory up
+to BLOB_SPOOL_SIZE before spilling to a temporary file, and are dropped
+without touching the disk when the blob already exists.
+
+    zcat output/artifacts/blobs/ab/abcdef....json.gz | python -m json.tool
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import gzip
+import hashlib
+import io
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, Optional
+from codec.codec import TRANSFER_STATS, canonical_json, loads, timed_write
+
+DEFAULT_ARTIFACTS_DIR = Path(__file__).parent.parent / 'output' / 'artifacts'
+
+# Compressed streamed blobs up to this size are kept in memory until their digest is known
+BLOB_SPOOL_SIZE = 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS artifacts (
+    run_id TEXT NOT NULL,
+    label TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at TEXT NOT NULL,
+    PRIMARY KEY (run_id, label, kind)
+);
+CREATE INDEX IF NOT EXISTS artifacts_digest ON artifacts (digest);
+"""
+
+# Artefact kinds written by main.py
+POD1_CUSTOMIZATIONS = 'pod1_customizations'
+POD2_CLONE_RESPONSE = 'pod2_clone_response'
+
+
+def new_run_id() -> str:
+    return datetime.now().strftime('%Y%m%dT%H%M%S')
+
+
+class StoredArtifact:
+    
+    def __init__(self, digest: str, path: Path, size: int, created: bool):
+        self.digest = digest
+        self.path = path
+        self.size = size
+        self.created = created
+    
+    def __repr__(self):
+        return f"StoredArtifact(digest='{self.digest[:12]}...', created={self.created})"
+
+
+class BlobSpool:
+    """
+    Write target for a compressed blob of unknown size: kept in memory up to
+    max_size, then moved to a temporary file in the blob directory.
+    """
+    
+    def __init__(self, directory: Path, max_size: int):
+        self.directory = directory
+        self.max_size = max_size
+        self.buffer = io.BytesIO()
+        self.file = None
+        self.tmp_path = None
+        self.size = 0
+        self.write_seconds = 0.0
+    
+    def write(self, data: bytes) -> int:
+        if self.file is None and self.size + len(data) > self.max_size:
+            self._spill(self.directory)
+        self.size += len(data)
+        if self.file is None:
+            return self.buffer.write(data)
+        start = time.perf_counter()
+        written = self.file.write(data)
+        self.write_seconds += time.perf_counter() - start
+        return written
+    
+    def flush(self) -> None:
+        pass
+    
+    def _spill(self, directory: Path) -> None:
+        fd, self.tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        self.file = os.fdopen(fd, 'wb')
+        start = time.perf_counter()
+        self.file.write(self.buffer.getvalue())
+        self.write_seconds += time.perf_counter() - start
+        self.buffer = None
+    
+    def save(self, path: Path) -> None:
+        # Move the blob into place (a blob is either complete or absent)
+        if self.file is None:
+            self._spill(path.parent)
+        start = time.perf_counter()
+        self.file.close()
+        self.write_seconds += time.perf_counter() - start
+        os.replace(self.tmp_path, path)
+        self.tmp_path = None
+        TRANSFER_STATS.add(file_writes=1, file_write_bytes=self.size, file_write_seconds=self.write_seconds)
+    
+    def discard(self) -> None:
+        if self.file is not None:
+            self.file.close()
+        if self.tmp_path is not None and os.path.exists(self.tmp_path):
+            os.unlink(self.tmp_path)
+        self.tmp_path = None
+
+
+class ArtifactStore:
+    """
+    Deduplicated, compressed storage of JSON artefacts with a per-run manifest.
+    """
+    
+    def __init__(self, root: Optional[str] = None):
+        self.root = Path(root) if root else DEFAULT_ARTIFACTS_DIR
+        self.blob_dir = self.root / 'blobs'
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.root / 'manifest.db'), timeout=60, check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+    
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def blob_path(self, digest: str) -> Path:
+        return self.blob_dir / digest[:2] / f"{digest}.json.gz"
+    
+    def put_blob(self, obj: Any) -> StoredArtifact:
+        """
+        Store a JSON-serialisable object unless an identical one is already stored.
+        """
+        start = time.perf_counter()
+        data = canonical_json(obj)
+        TRANSFER_STATS.add(file_encode_seconds=time.perf_counter() - start)
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.blob_path(digest)
+        
+        if path.exists():
+            return StoredArtifact(digest, path, len(data), created=False)
+        
+        path.parent.mkdir(exist_ok=True)
+        # mtime=0 keeps the compressed bytes identical for identical content
+        compressed = gzip.compress(data, mtime=0)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        try:
+            with timed_write(len(compressed)), os.fdopen(fd, 'wb') as f:
+                f.write(compressed)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        
+        return StoredArtifact(digest, path, len(data), created=True)
+    
+    def put_blob_stream(self, chunks: Iterable[bytes]) -> StoredArtifact:
+        """
+        Store a JSON document arriving in chunks, e.g. a streamed response body.
+        Only one chunk and at most BLOB_SPOOL_SIZE compressed bytes are held in
+        memory; the digest is computed on the fly.
+        """
+        sha256 = hashlib.sha256()
+        size = 0
+        spool = BlobSpool(self.blob_dir, BLOB_SPOOL_SIZE)
+        try:
+            # filename='' and mtime=0 keep the compressed bytes identical for identical content
+            with gzip.GzipFile(filename='', mode='wb', fileobj=spool, mtime=0) as gz:
+                for chunk in chunks:
+                    sha256.update(chunk)
+                    size += len(chunk)
+                    gz.write(chunk)
+            
+            digest = sha256.hexdigest()
+            path = self.blob_path(digest)
+            if path.exists():
+                spool.discard()
+                return StoredArtifact(digest, path, size, created=False)
+            path.parent.mkdir(exist_ok=True)
+            spool.save(path)
+        except BaseException:
+            spool.discard()
+            raise
+        
+        return StoredArtifact(digest, path, size, created=True)
+    
+    def put(self, run_id: str, label: str, kind: str, obj: Any) -> StoredArtifact:
+        """
+        Store an artefact and record it in the manifest.
+        
+        Args:
+            run_id: Run the artefact belongs to
+            label: Template label (results key)
+            kind: Artefact kind, e.g. POD1_CUSTOMIZATIONS
+            obj: JSON-serialisable payload
+        """
+        return self._record(run_id, label, kind, self.put_blob(obj))
+    
+    def put_stream(self, run_id: str, label: str, kind: str, chunks: Iterable[bytes]) -> StoredArtifact:
+        """
+        Store an artefact arriving in chunks and record it in the manifest.
+        """
+        return self._record(run_id, label, kind, self.put_blob_stream(chunks))
+    
+    def _record(self, run_id: str, label: str, kind: str, artifact: StoredArtifact) -> StoredArtifact:
+        with self._lock, timed_write(), self.conn:
+            self.conn.execute(
+                """INSERT OR REPLACE INTO artifacts (run_id, label, kind, digest, size, created_at)
+                   VALUES (?, ?, ?, ?, ?, ?)""",
+                (run_id, label, kind, artifact.digest, artifact.size, datetime.now().isoformat())
+            )
+        return artifact
+    
+    def load(self, digest: str) -> Any:
+        with gzip.open(self.blob_path(digest), 'rb') as f:
+            return loads(f.read())
+    
+    def get(self, run_id: str, label: str, kind: str) -> Optional[Any]:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT digest FROM artifacts WHERE run_id = ? AND label = ? AND kind = ?",
+                (run_id, label, kind)
+            ).fetchone()
+        return self.load(row[0]) if row else None
+    
+    def iter_run(self, run_id: str) -> Iterator[Dict]:
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT label, kind, digest, size FROM artifacts WHERE run_id = ? ORDER BY rowid",
+                (run_id,)
+            ).fetchall()
+        for label, kind, digest, size in rows:
+            yield {'label': label, 'kind': kind, 'digest': digest, 'size': size}
+    
+    def runs(self) -> list:
+        with self._lock:
+            return [row[0] for row in self.conn.execute(
+                "SELECT DISTINCT run_id FROM artifacts ORDER BY run_id"
+            )]
+
+
+class RunArtifacts:
+    """
+    Artefact store bound to one run; counts new and deduplicated blobs.
+    """
+    
+    def __init__(self, store: ArtifactStore, run_id: Optional[str] = None):
+        self.store = store
+        self.run_id = run_id or new_run_id()
+        self.stored = 0
+        self.created = 0
+        self.bytes_written = 0
+        self._lock = threading.Lock()
+    
+    def put(self, label: str, kind: str, obj: Any) -> StoredArtifact:
+        return self._count(self.store.put(self.run_id, label, kind, obj))
+    
+    def put_stream(self, label: str, kind: str, chunks: Iterable[bytes]) -> StoredArtifact:
+        return self._count(self.store.put_stream(self.run_id, label, kind, chunks))
+    
+    def _count(self, artifact: StoredArtifact) -> StoredArtifact:
+        with self._lock:
+            self.stored += 1
+            if artifact.created:
+                self.created += 1
+                self.bytes_written += artifact.path.stat().st_size
+        return artifact
@@ -0,0 +1,77 @@
+"""
+Tests for the content-addressed artefact store.
+"""
+import gzip
+import hashlib
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+from artifacts import artifacts
+from artifacts.artifacts import ArtifactStore
+from codec.codec import TRANSFER_STATS
+
+PAYLOAD = b'{"name": "A", "monitors": [{"metric": "cpu", "threshold": 90}]}'
+
+
+@pytest.fixture
+def store(tmp_path):
+    with ArtifactStore(tmp_path / "artifacts") as store:
+        yield store
+
+
+def chunked(data, size=7):
+    return (data[i:i + size] for i in range(0, len(data), size))
+
+
+def test_put_stream_stores_bytes_as_received(store):
+    artifact = store.put_stream("run", "A", artifacts.POD1_CUSTOMIZATIONS, chunked(PAYLOAD))
+    assert artifact.created and artifact.size == len(PAYLOAD)
+    assert artifact.digest == hashlib.sha256(PAYLOAD).hexdigest()
+    assert gzip.decompress(artifact.path.read_bytes()) == PAYLOAD
+    assert store.get("run", "A", artifacts.POD1_CUSTOMIZATIONS) == {
+        'name': "A", 'monitors': [{'metric': "cpu", 'threshold': 90}]}
+
+
+def test_put_stream_existing_blob_is_not_written(store):
+    """A payload already stored writes no file, temporary or final"""
+    first = store.put_stream("run-1", "A", artifacts.POD1_CUSTOMIZATIONS, chunked(PAYLOAD))
+    mtime = first.path.stat().st_mtime_ns
+    writes = TRANSFER_STATS.to_dict()['file_writes']
+
+    second = store.put_stream("run-2", "A", artifacts.POD1_CUSTOMIZATIONS, chunked(PAYLOAD))
+    assert not second.created and second.path == first.path
+    assert first.path.stat().st_mtime_ns == mtime
+    # Only the manifest row was written
+    assert TRANSFER_STATS.to_dict()['file_writes'] == writes + 1
+    assert not list(store.blob_dir.rglob("*.tmp"))
+
+
+def test_put_stream_spills_large_blobs(store, monkeypatch):
+    """Compressed output beyond BLOB_SPOOL_SIZE goes to a temporary file, then into place"""
+    monkeypatch.setattr(artifacts, 'BLOB_SPOOL_SIZE', 64)
+    data = os.urandom(4096)
+    artifact = store.put_stream("run", "big", artifacts.POD1_CUSTOMIZATIONS, chunked(data, 512))
+    assert artifact.created
+    assert gzip.decompress(artifact.path.read_bytes()) == data
+    assert not list(store.blob_dir.rglob("*.tmp"))
+
+    again = store.put_stream("run", "big", artifacts.POD1_CUSTOMIZATIONS, chunked(data, 512))
+    assert not again.created
+    assert not list(store.blob_dir.rglob("*.tmp"))
+
+
+def test_put_stream_failure_leaves_no_temporary_file(store, monkeypatch):
+    monkeypatch.setattr(artifacts, 'BLOB_SPOOL_SIZE', 64)
+
+    def failing():
+        yield os.urandom(4096)
+        raise OSError("connection reset")
+
+    with pytest.raises(OSError):
+        store.put_stream("run", "A", artifacts.POD1_CUSTOMIZATIONS, failing())
+    assert not list(store.blob_dir.rglob("*.tmp"))
+    assert not list(store.blob_dir.rglob("*.json.gz"))
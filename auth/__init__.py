@@ -0,0 +1 @@
+# Auth module
@@ -1,10 +1,26 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import threading
 import requests
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Optional
 from datetime import datetime, timedelta
+from codec.codec import read_json
+from transport.transport import mount_transport
+from limiter.limiter import LimitedSession, PodLimits
+from deadline.deadline import TIMEOUTS
 
 
 class OpsRampAuth:
     
+    # Connections kept per host by the session's connection pool (requests default)
+    POOL_SIZE = 10
+    
     def __init__(self, base_url: str, client_id: str, client_secret: str):
 
         self.base_url = base_url.rstrip('/')
@@ -14,8 +30,26 @@ class OpsRampAuth:
         self.token_type: Optional[str] = None
         self.expires_at: Optional[datetime] = None
         self.scope: Optional[str] = None
+        # Sessions and tokens are shared by every tenant and thread using this POD
+        self._token_lock = threading.Lock()
+        # Adaptive read/write concurrency limits for this POD
+        self.limits = PodLimits(urlsplit(self.base_url).netloc or self.base_url)
+        # Pooled connections to this POD, shared by every manager using this auth
+        self.session = LimitedSession(self.limits)
+        pool_size = max(self.POOL_SIZE, self.limits.read.max_limit + self.limits.write.max_limit)
+        if pool_size > self.POOL_SIZE:
+            adapter = HTTPAdapter(pool_maxsize=pool_size)
+            self.session.mount('http://', adapter)
+            self.session.mount('https://', adapter)
+        # Record/replay transport, when one is installed, with the same pool size
+        mount_transport(self.session, pool_maxsize=pool_size)
     
     def get_token(self) -> Dict[str, str]:
+        
+        with self._token_lock:
+            return self._get_token()
+    
+    def _get_token(self) -> Dict[str, str]:
       
         if self.access_token and self.expires_at:
             if datetime.now() < self.expires_at:
@@ -37,10 +71,10 @@ class OpsRampAuth:
             'client_secret': self.client_secret
         }
         
-        response = requests.post(url, headers=headers, data=data, verify=False)
+        response = self.session.post(url, headers=headers, data=data, verify=False)
         response.raise_for_status()
         
-        token_data = response.json()
+        token_data = read_json(response)
         
         self.access_token = token_data['access_token']
         self.token_type = token_data['token_type']
@@ -66,6 +100,27 @@ class OpsRampAuth:
     
     def refresh_token(self) -> Dict[str, str]:
         
-        self.access_token = None
-        self.expires_at = None
-        return self.get_token()
\ No newline at end of file
+        with self._token_lock:
+            self.access_token = None
+            self.expires_at = None
+            return self._get_token()
+    
+    def warm_up(self, connections: int = 1) -> int:
+        
+        # Open up to `connections` pooled connections (DNS, TCP and TLS setup) ahead of use
+        # with concurrent HEAD requests; returns the number of requests that got a response.
+        connections = max(0, min(connections, self.POOL_SIZE))
+        if connections == 0:
+            return 0
+        
+        def head(_):
+            try:
+                # The configured connect timeout bounds the response too: only the connection matters.
+                # Not limited, or the read limiter would open the connections one by one
+                self.session.head(self.base_url, verify=False, timeout=TIMEOUTS['read'][0], limited=False)
+                return True
+            except requests.exceptions.RequestException:
+                return False
+        
+        with ThreadPoolExecutor(max_workers=connections) as executor:
+            return sum(executor.map(head, range(connections)))
@@ -1,103 +1,58 @@
 """
-Test script for OpsRamp authentication.
-Loads credentials from .env file.
+Tests for OpsRamp authentication and POD configuration.
 """
-from auth import OpsRampAuth
-from config import get_default_config
-import json
+import sys
+from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
 
-def test_authentication():
-    """Test basic authentication flow"""
-    print("=" * 60)
-    print("Testing OpsRamp Authentication")
-    print("=" * 60)
-    
-    # Load configuration from .env file
-    try:
-        config = get_default_config()
-    except ValueError as e:
-        print(f"\n✗ Configuration Error: {str(e)}")
-        print("\nMake sure your .env file exists and has the required variables:")
-        print("  OPSRAMP_BASE_URL")
-        print("  OPSRAMP_CLIENT_ID")
-        print("  OPSRAMP_CLIENT_SECRET")
-        return False
-    
-    # Initialize auth
-    print("\n1. Initializing authentication...")
-    auth = OpsRampAuth(**config)
-    
-    try:
-        # Get token
-        print("\n2. Requesting access token...")
-        token_info = auth.get_token()
-        
-        print("\n✓ Token retrieved successfully!")
-        print(f"   Token Type: {token_info['token_type']}")
-        print(f"   Access Token: {token_info['access_token'][:20]}...{token_info['access_token'][-20:]}")
-        print(f"   Scope: {token_info['scope']}")
-        print(f"   Expires In: {token_info['expires_in']} seconds")
-        print(f"   Expires At: {token_info['expires_at']}")
-        
-        # Get auth header (this should reuse the cached token)
-        print("\n3. Getting authorization header...")
-        auth_header = auth.get_auth_header()
-        print(f"   Authorization: {auth_header['Authorization'][:30]}...")
-        
-        # Test token reuse (should use cached token)
-        print("\n4. Testing token reuse (should use cached token)...")
-        token_info2 = auth.get_token()
-        if token_info2['access_token'] == token_info['access_token']:
-            print("   ✓ Token correctly reused from cache")
-        
-        # Pretty print full token response
-        print("\n5. Full token information:")
-        print(json.dumps(token_info, indent=2))
-        
-        return True
-        
-    except Exception as e:
-        print(f"\n✗ Error: {str(e)}")
-        print(f"   Type: {type(e).__name__}")
-        return False
+import pytest
+import requests
+from auth.config import get_pod_config
 
 
-def test_pod_configurations():
-    """Test POD1 and POD2 configurations from .env file"""
-    from config import get_pod_config
-    
-    print("\n" + "=" * 60)
-    print("Testing POD Configurations")
-    print("=" * 60)
-    
-    for pod_num in [1, 2]:
-        try:
-            print(f"\n[POD{pod_num}] Loading configuration...")
-            config = get_pod_config(pod_num)
-            auth = OpsRampAuth(**config)
-            token_info = auth.get_token()
-            print(f"✓ POD{pod_num} authenticated successfully!")
-            print(f"   Base URL: {config['base_url']}")
-            print(f"   Token: {token_info['access_token'][:20]}...")
-        except ValueError as e:
-            print(f"✗ POD{pod_num} configuration missing")
-            print(f"   {str(e)}")
-        except Exception as e:
-            print(f"✗ POD{pod_num} authentication failed: {str(e)}")
+@pytest.fixture
+def pod(fake_network):
+    return fake_network.add_pod("pod1")
 
 
-if __name__ == "__main__":
-    # Run basic test
-    success = test_authentication()
-    
-    print("\n" + "=" * 60)
-    if success:
-        print("✓ All tests passed!")
-    else:
-        print("✗ Tests failed - check your .env file")
-    print("=" * 60)
-    
-    # Test POD configurations
-    print("\n")
-    test_pod_configurations()
+def test_authentication(fake_network, pod):
+    """A token is requested once, then reused from the cache"""
+    auth = fake_network.auth("pod1")
+    token_info = auth.get_token()
+
+    assert token_info['access_token'] == "token-pod1" and token_info['token_type'] == 'bearer'
+    assert token_info['expires_in'] == 7200 and token_info['expires_at']
+    assert auth.get_auth_header() == {'Authorization': "Bearer token-pod1"}
+    assert auth.get_token()['access_token'] == token_info['access_token']
+    assert pod.calls[('POST', 'token')] == 1
+
+
+def test_refresh_token(fake_network, pod):
+    auth = fake_network.auth("pod1")
+    auth.get_token()
+    auth.refresh_token()
+    assert pod.calls[('POST', 'token')] == 2
+
+
+def test_rejected_credentials(fake_network, pod):
+    pod.rejected_clients.add("bad")
+    auth = fake_network.auth("pod1", client_id="bad")
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        auth.get_token()
+    assert auth.access_token is None
+
+
+def test_pod_configurations(monkeypatch):
+    """POD settings come from PODn_* variables; missing ones are all named"""
+    monkeypatch.setenv("POD1_BASE_URL", "https://pod1")
+    monkeypatch.setenv("POD1_CLIENT_KEY", "key")
+    monkeypatch.setenv("POD1_CLIENT_SECRET", "secret")
+    for name in ("POD2_BASE_URL", "POD2_CLIENT_KEY", "POD2_CLIENT_SECRET"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("POD2_BASE_URL", "https://pod2")
+
+    assert get_pod_config(1) == {'base_url': "https://pod1", 'client_id': "key", 'client_secret': "secret"}
+    with pytest.raises(ValueError, match="POD2_CLIENT_KEY, POD2_CLIENT_SECRET"):
+        get_pod_config(2)
@@ -1,7 +1,8 @@
 # Loads credentials from .env file.
 import os
+import re
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
 
 def load_env_file(env_path: Optional[str] = None) -> None:
@@ -77,6 +78,17 @@ def get_tenant_ids(pod_number: int) -> Dict[str, str]:
     }
 
 
+def get_configured_pods() -> List[int]:
+    
+    # POD numbers with a PODn_BASE_URL set, in ascending order
+    pods = set()
+    for key, value in os.environ.items():
+        match = re.fullmatch(r'POD(\d+)_BASE_URL', key)
+        if match and value:
+            pods.add(int(match.group(1)))
+    return sorted(pods)
+
+
 def get_default_config() -> Dict[str, str]:
 
     # default OpsRamp configuration (for single POD testing).
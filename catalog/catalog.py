@@ -0,0 +1,224 @@
+"""
+Catalog Module
+In-memory index of a tenant's global templates, used to resolve template
+selectors (glob, regex, prefix, appName, nativeType) without per-name API calls.
+
+Selector syntax (one per input line, terms may be combined with ' & '):
+    glob:hpe-alletra*Battery*
+    re:^hpe-alletra .* Template - \\d+$
+    prefix:hpe-alletra Alletra 9000
+    app:hpe-alletra & type:Battery
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import re
+import bisect
+import difflib
+import fnmatch
+import threading
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+from global_template.global_template import GlobalTemplateInfo, GlobalTemplateManager
+from config.settings import TemplateSelection
+
+SELECTOR_KINDS = ('glob', 're', 'prefix', 'app', 'type')
+
+# Characters that end the literal prefix of a glob pattern
+GLOB_SPECIAL = '*?['
+
+
+def is_selector(text: str) -> bool:
+    kind, sep, _ = text.partition(':')
+    return bool(sep) and kind.strip() in SELECTOR_KINDS
+
+
+class TemplateCatalog:
+    """
+    Index over global templates.
+    Names are kept in a sorted, case-folded array so prefix queries are two
+    binary searches; appName and nativeType have their own hash indexes.
+    """
+    
+    def __init__(self, templates: Iterable[GlobalTemplateInfo]):
+        """
+        Build the catalog indexes.
+        
+        Args:
+            templates: Global templates of one tenant
+        """
+        self.by_name: Dict[str, GlobalTemplateInfo] = {}
+        self.by_app_name: Dict[str, List[GlobalTemplateInfo]] = {}
+        self.by_native_type: Dict[str, List[GlobalTemplateInfo]] = {}
+        # Case-folded name -> first template listed with it, for exact lookups
+        self._by_folded_name: Dict[str, GlobalTemplateInfo] = {}
+        
+        for template in templates:
+            # Keep the first template per name, like get_global_template_by_name
+            if template.name in self.by_name:
+                continue
+            self.by_name[template.name] = template
+            self._by_folded_name.setdefault(template.name.casefold(), template)
+            self.by_app_name.setdefault(template.app_name.casefold(), []).append(template)
+            self.by_native_type.setdefault(template.native_type.casefold(), []).append(template)
+        
+        # Sorted (folded name, name) pairs form the prefix index
+        self._prefix_index = sorted((name.casefold(), name) for name in self.by_name)
+        self._folded_names = [folded for folded, _ in self._prefix_index]
+    
+    @classmethod
+    def from_manager(cls, manager: GlobalTemplateManager) -> Optional['TemplateCatalog']:
+        """
+        Build a catalog by listing all global templates of the manager's tenant.
+        
+        Returns:
+            TemplateCatalog, None if the listing failed
+        """
+        templates = manager.list_global_templates()
+        if templates is None:
+            return None
+        return cls(templates)
+    
+    def __len__(self):
+        return len(self.by_name)
+    
+    def get(self, name: str) -> Optional[GlobalTemplateInfo]:
+        # Exact but case-insensitive, like GlobalTemplateManager name lookups
+        return self._by_folded_name.get(name.casefold())
+    
+    def prefix(self, prefix: str) -> List[GlobalTemplateInfo]:
+        # Case-insensitive prefix match
+        
+        folded = prefix.casefold()
+        start = bisect.bisect_left(self._folded_names, folded)
+        end = bisect.bisect_left(self._folded_names, folded + '\U0010ffff', lo=start)
+        return [self.by_name[name] for _, name in self._prefix_index[start:end]]
+    
+    def glob(self, pattern: str) -> List[GlobalTemplateInfo]:
+        # Case-insensitive glob, narrowed by the pattern's literal prefix
+        
+        folded = pattern.casefold()
+        literal_end = min((i for i, c in enumerate(folded) if c in GLOB_SPECIAL), default=len(folded))
+        candidates = self.prefix(pattern[:literal_end])
+        return [t for t in candidates if fnmatch.fnmatchcase(t.name.casefold(), folded)]
+    
+    def regex(self, pattern: str) -> List[GlobalTemplateInfo]:
+        # Regular expression searched against the full name (use ^...$ to anchor)
+        
+        compiled = re.compile(pattern)
+        return [self.by_name[name] for _, name in self._prefix_index if compiled.search(name)]
+    
+    def app_name(self, app_name: str) -> List[GlobalTemplateInfo]:
+        return list(self.by_app_name.get(app_name.casefold(), []))
+    
+    def native_type(self, native_type: str) -> List[GlobalTemplateInfo]:
+        return list(self.by_native_type.get(native_type.casefold(), []))
+    
+    def resolve(self, selector: str) -> List[GlobalTemplateInfo]:
+        """
+        Resolve a selector to matching global templates, ordered by name.
+        
+        Args:
+            selector: One or more 'kind:value' terms joined with ' & '
+            
+        Returns:
+            Templates matching every term
+        """
+        lookups: Dict[str, Callable[[str], List[GlobalTemplateInfo]]] = {
+            'glob': self.glob,
+            're': self.regex,
+            'prefix': self.prefix,
+            'app': self.app_name,
+            'type': self.native_type
+        }
+        
+        matches = None
+        for term in selector.split(' & '):
+            kind, sep, value = term.strip().partition(':')
+            kind = kind.strip()
+            if not sep or kind not in lookups:
+                raise ValueError(f"Invalid selector term '{term}', expected one of "
+                                 f"{', '.join(k + ':' for k in SELECTOR_KINDS)}")
+            
+            # Only pattern kinds keep surrounding whitespace significant
+            value = value if kind in ('glob', 're', 'prefix') else value.strip()
+            found = {t.name: t for t in lookups[kind](value)}
+            matches = found if matches is None else {n: t for n, t in matches.items() if n in found}
+        
+        return sorted((matches or {}).values(), key=lambda t: t.name.casefold())
+    
+    def suggest(self, name: str, limit: int = 3) -> List[str]:
+        """
+        Return near-miss template names for a name that is not in the catalog.
+        """
+        # Compare against names sharing the first word first, then everything
+        first_word = name.split(' ', 1)[0]
+        candidates = [t.name for t in self.prefix(first_word)] if first_word else []
+        suggestions = difflib.get_close_matches(name, candidates, n=limit, cutoff=0.6)
+        if not suggestions:
+            suggestions = difflib.get_close_matches(name, list(self.by_name), n=limit, cutoff=0.6)
+        return suggestions
+
+
+def expand_selections(selections: Iterable[TemplateSelection],
+                      get_catalog: Callable[[], Optional[TemplateCatalog]]) -> Iterator[TemplateSelection]:
+    """
+    Lazily replace selector rows with one selection per matching template.
+    
+    Args:
+        selections: Template selections, some of which may be selectors
+        get_catalog: Returns the source catalog, called on the first selector
+        
+    Returns:
+        Iterator of selections naming concrete templates. A selector row's
+        new_name may contain '{name}', filled in with each matched name.
+    """
+    for selection in selections:
+        if not is_selector(selection.name):
+            yield selection
+            continue
+        
+        catalog = get_catalog()
+        if catalog is None:
+            print(f"  ✗ Cannot resolve selector without a catalog: {selection.name}")
+            continue
+        
+        try:
+            matches = catalog.resolve(selection.name)
+        except re.error as e:
+            print(f"  ✗ Invalid regular expression in selector '{selection.name}': {str(e)}")
+            continue
+        except ValueError as e:
+            print(f"  ✗ {str(e)}")
+            continue
+        
+        print(f"  ✓ Selector '{selection.name}' matched {len(matches)} template(s)")
+        
+        for template in matches:
+            new_name = selection.new_name.replace('{name}', template.name) if selection.new_name else None
+            yield TemplateSelection(template.name, new_name, selection.target_pod, selection.priority)
+
+
+class LazyCatalog:
+    """
+    Builds a tenant's catalog on first use and keeps it for the rest of the run.
+    """
+    
+    def __init__(self, manager: GlobalTemplateManager, label: str = ""):
+        self.manager = manager
+        self.label = label
+        self.loaded = False
+        self.catalog: Optional[TemplateCatalog] = None
+        self._lock = threading.Lock()
+    
+    def __call__(self) -> Optional[TemplateCatalog]:
+        # Concurrent callers wait for a single build
+        with self._lock:
+            if not self.loaded:
+                print(f"\n  [Catalog] Indexing {self.label or 'tenant'} global templates...")
+                self.catalog = TemplateCatalog.from_manager(self.manager)
+                self.loaded = True
+                if self.catalog is not None:
+                    print(f"    ✓ Indexed {len(self.catalog)} global template(s)")
+        return self.catalog
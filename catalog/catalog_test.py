@@ -0,0 +1,119 @@
+"""
+Tests for the global template catalog and selector resolution.
+"""
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+from catalog.catalog import TemplateCatalog, expand_selections, is_selector
+from config.settings import TemplateSelection
+from global_template.global_template import GlobalTemplateInfo, GlobalTemplateManager
+
+TEMPLATES = [
+    GlobalTemplateInfo("1", "hpe-alletra Alletra 9000 Battery", app_name="hpe-alletra", native_type="Battery"),
+    GlobalTemplateInfo("2", "hpe-alletra Alletra 9000 Disk", app_name="hpe-alletra", native_type="Disk"),
+    GlobalTemplateInfo("3", "HPE-Alletra Alletra 6000 Battery", app_name="HPE-Alletra", native_type="battery"),
+    GlobalTemplateInfo("4", "Windows Server", app_name="windows", native_type="Server"),
+    GlobalTemplateInfo("5", "Windows Server", app_name="windows", native_type="Duplicate"),
+]
+
+
+def names(templates):
+    return [template.name for template in templates]
+
+
+@pytest.fixture
+def catalog():
+    return TemplateCatalog(TEMPLATES)
+
+
+def test_catalog_keeps_first_template_per_name(catalog):
+    """Duplicate names keep the first template, like a lookup by name"""
+    assert len(catalog) == 4
+    assert catalog.get("Windows Server").template_id == "4"
+
+
+def test_get_matches_exactly(catalog):
+    """Names are looked up exactly, ignoring case"""
+    assert catalog.get("hpe-alletra Alletra 9000 Disk").template_id == "2"
+    assert catalog.get("HPE-ALLETRA ALLETRA 9000 DISK").template_id == "2"
+    assert catalog.get("Alletra 9000 Disk") is None
+
+
+def test_resolve_single_terms(catalog):
+    """Each selector kind matches case-insensitively (regex excepted) and orders by name"""
+    assert names(catalog.resolve("prefix:hpe-alletra Alletra 9")) == ["hpe-alletra Alletra 9000 Battery",
+                                                                     "hpe-alletra Alletra 9000 Disk"]
+    assert names(catalog.resolve("glob:*battery")) == ["HPE-Alletra Alletra 6000 Battery",
+                                                       "hpe-alletra Alletra 9000 Battery"]
+    assert names(catalog.resolve("re:^hpe-alletra .* Disk$")) == ["hpe-alletra Alletra 9000 Disk"]
+    assert len(catalog.resolve("app:hpe-alletra")) == 3
+    assert names(catalog.resolve("type: Server ")) == ["Windows Server"]
+
+
+def test_resolve_combined_terms(catalog):
+    """Terms joined with ' & ' must all match"""
+    assert names(catalog.resolve("app:hpe-alletra & type:Battery")) == ["HPE-Alletra Alletra 6000 Battery",
+                                                                        "hpe-alletra Alletra 9000 Battery"]
+    assert catalog.resolve("app:windows & type:Battery") == []
+
+
+def test_resolve_invalid_term(catalog):
+    """Unknown selector kinds are rejected"""
+    with pytest.raises(ValueError):
+        catalog.resolve("app:hpe-alletra & name:Battery")
+
+
+def test_suggest(catalog):
+    """Near misses are suggested for unknown names"""
+    assert catalog.suggest("hpe-alletra Alletra 9000 Batery")[0] == "hpe-alletra Alletra 9000 Battery"
+
+
+def test_expand_selections_is_lazy_and_fills_new_name(catalog):
+    """Plain names pass through; the catalog is only built for selectors"""
+    calls = []
+
+    def get_catalog():
+        calls.append(1)
+        return catalog
+
+    selections = expand_selections([TemplateSelection("Windows Server"),
+                                    TemplateSelection("type:Disk", new_name="Copy of {name}", target_pod=3)],
+                                   get_catalog)
+    first = next(selections)
+    assert first.name == "Windows Server" and not calls
+
+    expanded = list(selections)
+    assert [(s.name, s.new_name, s.target_pod) for s in expanded] == [
+        ("hpe-alletra Alletra 9000 Disk", "Copy of hpe-alletra Alletra 9000 Disk", 3)
+    ]
+    assert calls == [1]
+    assert is_selector("glob:x") and not is_selector("Windows: Server")
+
+
+class ListingManager(GlobalTemplateManager):
+    # Serves the bulk listing from memory
+
+    def __init__(self, templates):
+        super().__init__(SimpleNamespace(base_url="https://pod", limits=SimpleNamespace(
+            read=SimpleNamespace(max_limit=1))), "tenant")
+        self.templates = templates
+
+    def iter_global_templates(self):
+        yield from self.templates
+
+
+def test_bulk_lookup_matches_like_catalog():
+    """Bulk name lookups follow the catalog's exact matching"""
+    manager = ListingManager(TEMPLATES)
+    catalog = TemplateCatalog(TEMPLATES)
+    lookup = ["Windows Server", "windows server"] + [f"Missing {i}" for i in range(GlobalTemplateManager.BULK_THRESHOLD)]
+
+    results = dict(manager.get_global_templates_by_names(lookup))
+    assert set(results) == set(lookup)
+    for name in lookup:
+        expected = catalog.get(name)
+        assert (results[name].template_id if results[name] else None) == (expected.template_id if expected else None)
@@ -0,0 +1 @@
+# Cleanup module
@@ -0,0 +1,209 @@
+"""
+Cleanup Module
+Finds and deletes the cloned templates earlier runs created on destination PODs.
+
+Candidates come from two places:
+
+    journal    - the clone journal of run state files (every template a run
+                 created, kept across runs) and, when asked for, the sync
+                 index: IDs and destination tenants of templates this tool created
+    discovery  - cloned templates of the destination (listed in bulk) that
+                 have a parent global template and whose name starts with
+                 the tool's clone name prefix
+
+Journal IDs are checked against the same listing, so templates that were
+already removed are reported rather than deleted again. Deletes run
+concurrently (DELETE_WORKERS per tenant by default) under the POD's adaptive
+write limit. Templates that were deleted or found gone are pruned from the
+journals afterwards, so later cleanups stop reporting them.
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import sqlite3
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from auth.auth import OpsRampAuth
+from cloned_template.cloned_template import ClonedTemplateManager
+from clone_template.clone_template import CloneTemplateManager
+
+# Queries listing (label, target POD, target tenant, template ID) of created templates, per journal
+# table; {target_tenant} is NULL for files written before tenants were recorded
+JOURNAL_QUERIES = {
+    'clone_journal': "SELECT label, target_pod, {target_tenant}, template_id FROM clone_journal ORDER BY rowid",
+    # State files written before the clone journal
+    'clone_results': """SELECT label, target_pod, {target_tenant}, new_cloned_template_id FROM clone_results
+                        WHERE success = 1 AND new_cloned_template_id IS NOT NULL""",
+    'synced_templates': """SELECT label, target_pod, {target_tenant}, target_template_id FROM synced_templates
+                           WHERE target_template_id IS NOT NULL"""
+}
+
+# Statements dropping a deleted or vanished template from each journal table; run
+# results and the sync index keep their rows, without the template ID
+JOURNAL_PRUNES = {
+    'clone_journal': "DELETE FROM clone_journal WHERE template_id = ?",
+    'clone_results': "UPDATE clone_results SET new_cloned_template_id = NULL WHERE new_cloned_template_id = ?",
+    'synced_templates': "UPDATE synced_templates SET target_template_id = NULL WHERE target_template_id = ?"
+}
+
+# Concurrent deletes per tenant unless the caller sets max_workers
+DELETE_WORKERS = 8
+
+
+class CleanupCandidate:
+    
+    def __init__(self, template_id: str, name: str, target_pod: int, source: str,
+                 label: str = "", parent_id: str = "", tenant_id: str = ""):
+        self.template_id = template_id
+        self.name = name
+        self.target_pod = target_pod
+        self.tenant_id = tenant_id
+        self.source = source
+        self.label = label
+        self.parent_id = parent_id
+    
+    def __repr__(self):
+        return f"CleanupCandidate(id='{self.template_id[:8]}...', name='{self.name[:40]}...')"
+    
+    def to_dict(self) -> Dict:
+        return {
+            'template_id': self.template_id,
+            'name': self.name,
+            'target_pod': self.target_pod,
+            'tenant_id': self.tenant_id,
+            'source': self.source,
+            'label': self.label,
+            'parent_id': self.parent_id
+        }
+
+
+def read_journal(paths: Iterable[Path]) -> Iterator[Tuple[str, int, Optional[str], str, str]]:
+    """
+    Read created templates from run state files and sync indexes.
+    
+    Files are opened read-only; files without a journal table are skipped.
+    
+    Returns:
+        Iterator of (label, target POD, target tenant or None, template ID, journal file name)
+    """
+    for path in paths:
+        try:
+            conn = sqlite3.connect(f"{Path(path).resolve().as_uri()}?mode=ro", uri=True)
+        except sqlite3.Error as e:
+            print(f"  ✗ Cannot open journal {path}: {str(e)}")
+            continue
+        try:
+            tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            if 'clone_journal' in tables:
+                tables.discard('clone_results')
+            for table, query in JOURNAL_QUERIES.items():
+                if table in tables:
+                    columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+                    query = query.format(target_tenant='target_tenant' if 'target_tenant' in columns else 'NULL')
+                    for label, target_pod, target_tenant, template_id in conn.execute(query):
+                        yield label, target_pod, target_tenant, template_id, Path(path).name
+        except sqlite3.Error as e:
+            print(f"  ✗ Cannot read journal {path}: {str(e)}")
+        finally:
+            conn.close()
+
+
+def prune_journal(path: Path, template_ids: Iterable[str]) -> int:
+    """
+    Remove templates that were deleted, or are gone, from one journal file.
+    
+    Returns:
+        Number of journal rows changed
+    """
+    params = [(template_id,) for template_id in template_ids]
+    if not params:
+        return 0
+    try:
+        conn = sqlite3.connect(str(path), timeout=30)
+    except sqlite3.Error as e:
+        print(f"  ✗ Cannot open journal {path}: {str(e)}")
+        return 0
+    try:
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        if 'clone_journal' in tables:
+            # Read from the journal only (see read_journal), so the run's results are kept
+            tables.discard('clone_results')
+        changed = 0
+        with conn:
+            for table, statement in JOURNAL_PRUNES.items():
+                if table in tables:
+                    changed += conn.executemany(statement, params).rowcount
+        return changed
+    except sqlite3.Error as e:
+        print(f"  ✗ Cannot update journal {path}: {str(e)}")
+        return 0
+    finally:
+        conn.close()
+
+
+class TemplateCleaner:
+    """
+    Finds and deletes tool-created cloned templates of one tenant on a destination POD.
+    """
+    
+    def __init__(self, auth: OpsRampAuth, tenant_id: str, target_pod: int):
+        """
+        Initialize TemplateCleaner.
+        
+        Args:
+            auth: OpsRampAuth instance of the destination POD
+            tenant_id: Destination tenant ID
+            target_pod: Destination POD number
+        """
+        self.auth = auth
+        self.tenant_id = tenant_id
+        self.target_pod = target_pod
+    
+    def find(self, journal: Dict[str, Tuple[str, str]], name_prefix: Optional[str] = None
+             ) -> Tuple[List[CleanupCandidate], List[str]]:
+        """
+        Match journal entries and, optionally, the name prefix against the listing.
+        
+        Args:
+            journal: {template ID: (label, journal file name)} recorded for this tenant
+            name_prefix: Also select cloned templates whose name starts with this
+            
+        Returns:
+            (candidates in listing order, journal template IDs no longer present)
+            
+        Raises:
+            requests.exceptions.RequestException: If the listing failed
+        """
+        candidates = []
+        found = set()
+        folded_prefix = name_prefix.casefold() if name_prefix else None
+        
+        for template in ClonedTemplateManager(self.auth, self.tenant_id).iter_cloned_templates():
+            if template.template_id in journal:
+                label, source = journal[template.template_id]
+                found.add(template.template_id)
+                candidates.append(CleanupCandidate(template.template_id, template.name, self.target_pod,
+                                                   f"journal {source}", label, template.parent_id,
+                                                   self.tenant_id))
+            elif (folded_prefix and template.parent_id
+                  and template.name.casefold().startswith(folded_prefix)):
+                candidates.append(CleanupCandidate(template.template_id, template.name, self.target_pod,
+                                                   "discovered", parent_id=template.parent_id,
+                                                   tenant_id=self.tenant_id))
+        
+        gone = [template_id for template_id in journal if template_id not in found]
+        return candidates, gone
+    
+    def delete(self, candidates: Iterable[CleanupCandidate],
+               max_workers: Optional[int] = None) -> Iterator[Tuple[CleanupCandidate, bool]]:
+        """
+        Delete candidates concurrently (default: DELETE_WORKERS at once, paced by the POD's write limit).
+        
+        Returns:
+            Iterator of (candidate, deleted) in completion order
+        """
+        by_id = {candidate.template_id: candidate for candidate in candidates}
+        clone_mgr = CloneTemplateManager(self.auth, self.tenant_id)
+        for template_id, deleted in clone_mgr.delete_many(by_id, max_workers or DELETE_WORKERS):
+            yield by_id[template_id], deleted
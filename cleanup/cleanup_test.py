@@ -0,0 +1,175 @@
+"""
+Tests for the cleanup journals and deletes.
+"""
+import argparse
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+import main
+from cleanup.cleanup import DELETE_WORKERS, TemplateCleaner, prune_journal, read_journal
+from limiter.limiter import DEFAULT_MAX_CONCURRENCY
+from state.state import RunStateStore
+from sync.sync import SyncIndex
+
+
+def cloned(name, template_id, target_pod=2, target_tenant="tenant-b"):
+    return {'pod2_global_template_id': f"global-{name}", 'new_cloned_template_id': template_id,
+            'success': True, 'template_name': name, 'target_pod': target_pod, 'target_tenant': target_tenant}
+
+
+def test_journal_survives_reset(tmp_path):
+    """Clones of every run in a state file are journalled with their destination tenant"""
+    path = tmp_path / "run_state.db"
+    with RunStateStore(path) as state:
+        state.clone_results["A"] = cloned("A", "new-A")
+        state.clone_results["B"] = {'existing_template_id': "old-B", 'success': True, 'skipped': True,
+                                    'template_name': "B", 'target_pod': 2}
+        state.clone_results["C"] = {'success': False, 'template_name': "C", 'target_pod': 2}
+        state.reset()
+        state.clone_results["A"] = cloned("A", "newer-A", 3, "tenant-c")
+
+    assert list(read_journal([path])) == [
+        ("A", 2, "tenant-b", "new-A", "run_state.db"),
+        ("A", 3, "tenant-c", "newer-A", "run_state.db")
+    ]
+
+
+def test_journal_merges_from_shards(tmp_path):
+    shard_path, run_path = tmp_path / "run_state_shard_1_of_2.db", tmp_path / "run_state.db"
+    with RunStateStore(shard_path) as shard:
+        shard.clone_results["A"] = cloned("A", "new-A")
+    with RunStateStore(run_path) as state:
+        state.merge_from(shard_path)
+        state.merge_from(shard_path)
+    assert [row[3] for row in read_journal([run_path])] == ["new-A"]
+
+
+def test_state_files_without_journal(tmp_path):
+    """Older state files are read from clone_results (read-only) and journalled once reopened"""
+    path = tmp_path / "run_state.db"
+    conn = sqlite3.connect(str(path))
+    conn.execute("""CREATE TABLE clone_results (
+        label TEXT PRIMARY KEY, template_name TEXT, target_pod INTEGER, pod2_global_template_id TEXT,
+        new_cloned_template_id TEXT, success INTEGER NOT NULL, finished_at TEXT NOT NULL)""")
+    conn.execute("INSERT INTO clone_results VALUES ('A', 'A', 2, 'global-A', 'new-A', 1, 'now')")
+    conn.execute("INSERT INTO clone_results VALUES ('B', 'B', 2, 'global-B', NULL, 0, 'now')")
+    conn.commit()
+    conn.close()
+
+    assert list(read_journal([path])) == [("A", 2, None, "new-A", "run_state.db")]
+
+    with RunStateStore(path) as state:
+        state.reset()
+    assert list(read_journal([path])) == [("A", 2, None, "new-A", "run_state.db")]
+
+
+def test_sync_index_journal(tmp_path):
+    path = tmp_path / "sync_index.db"
+    with SyncIndex(path) as index:
+        index.record("A", "source-A", "1", 2, "synced-A", "tenant-b")
+        index.record("B", "source-B", "1", 2, None, "tenant-b")
+    assert list(read_journal([path])) == [("A", 2, "tenant-b", "synced-A", "sync_index.db")]
+
+
+def test_prune_journal(tmp_path):
+    """Pruned templates leave the journal; run results and the sync index keep their rows"""
+    state_path, index_path = tmp_path / "run_state.db", tmp_path / "sync_index.db"
+    with RunStateStore(state_path) as state:
+        state.clone_results["A"] = cloned("A", "new-A")
+        state.clone_results["B"] = cloned("B", "new-B")
+    with SyncIndex(index_path) as index:
+        index.record("C", "source-C", "1", 2, "synced-C", "tenant-b")
+
+    assert prune_journal(state_path, ["new-A", "unknown"]) == 1
+    assert prune_journal(index_path, ["synced-C"]) == 1
+    assert prune_journal(state_path, []) == 0
+
+    assert [row[3] for row in read_journal([state_path, index_path])] == ["new-B"]
+    with RunStateStore(state_path) as state:
+        assert dict(state.clone_results.items())["A"]['new_cloned_template_id'] == "new-A"
+    with SyncIndex(index_path) as index:
+        assert index.get("C")['target_template_id'] is None
+
+
+def test_prune_journal_without_clone_journal(tmp_path):
+    path = tmp_path / "run_state.db"
+    conn = sqlite3.connect(str(path))
+    conn.execute("CREATE TABLE clone_results (label TEXT, target_pod INTEGER, new_cloned_template_id TEXT, "
+                 "success INTEGER)")
+    conn.execute("INSERT INTO clone_results VALUES ('A', 2, 'new-A', 1)")
+    conn.commit()
+    conn.close()
+
+    assert prune_journal(path, ["new-A"]) == 1
+    assert list(read_journal([path])) == []
+
+
+@pytest.fixture
+def destination(fake_network):
+    pod = fake_network.add_pod("pod2")
+    return pod, {2: (fake_network.auth("pod2"), "tenant-b")}
+
+
+def cleanup_args(tmp_path, **overrides):
+    values = dict(state=str(tmp_path / "run_state.db"), include_sync=False, sync_index=None, target_pod=None,
+                  discover=False, name_prefix="Clone of ", confirm=True, results_file=None,
+                  delete_workers=DELETE_WORKERS)
+    values.update(overrides)
+    return argparse.Namespace(**values)
+
+
+def test_cleanup_prunes_deleted_and_missing_templates(tmp_path, destination, capsys):
+    """A confirmed cleanup forgets what it deleted and what was already gone"""
+    pod, pods = destination
+    kept = pod.add_clone("tenant-b", "Linux")['id']
+    with RunStateStore(tmp_path / "run_state.db") as state:
+        state.clone_results["A"] = cloned("A", kept)
+        state.clone_results["B"] = cloned("B", "gone-B")
+
+    main.run_cleanup(cleanup_args(tmp_path, confirm=False), pods)
+    assert "1 journalled template(s) no longer exist" in capsys.readouterr().out
+    assert len(list(read_journal([tmp_path / "run_state.db"]))) == 2
+
+    main.run_cleanup(cleanup_args(tmp_path), pods)
+    out = capsys.readouterr().out
+    assert "Deleted 1 of 1 template(s)" in out and "Removed 2 journal row(s)" in out
+    assert pod.clones("tenant-b") == []
+
+    main.run_cleanup(cleanup_args(tmp_path), pods)
+    out = capsys.readouterr().out
+    assert "no longer exist" not in out and "0 template(s) created by earlier runs" in out
+
+
+def test_deletes_run_concurrently_by_default(fake_network, destination, monkeypatch):
+    """Cleanup deletes several templates at once without any --concurrency setting"""
+    pod, _ = destination
+    ids = [pod.add_clone("tenant-b", "Linux")['id'] for _ in range(DELETE_WORKERS * 2)]
+    running, peak = [0], [0]
+    lock = threading.Lock()
+    handle = pod.handle
+
+    def slow_handle(request):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.02)
+        with lock:
+            running[0] -= 1
+        return handle(request)
+
+    monkeypatch.setattr(pod, 'handle', slow_handle)
+    main.configure_concurrency(main.parse_args(['cleanup']))
+    try:
+        cleaner = TemplateCleaner(fake_network.auth("pod2"), "tenant-b", 2)
+        candidates, _ = cleaner.find({template_id: ("A", "run_state.db") for template_id in ids})
+        assert all(deleted for _, deleted in cleaner.delete(candidates))
+    finally:
+        main.set_max_concurrency(DEFAULT_MAX_CONCURRENCY)
+        main.SCHEDULER.set_slots(1)
+    assert peak[0] > 1 and pod.clones("tenant-b") == []
@@ -7,16 +7,21 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-import json
 import requests
 import urllib3
-from typing import Dict, Optional
+from typing import Dict, Iterable, Iterator, Optional, Tuple
 from auth.auth import OpsRampAuth
+from codec.codec import dump_to_file, json_body, read_json
+from limiter.limiter import map_as_completed
 
 # Disable SSL warnings (temporary for development)
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 
+class TemplateNotFound(LookupError):
+    """The template to update no longer exists on the target POD (404)."""
+
+
 class CloneTemplateManager:
     """
     Manages cloning templates to a target POD using OpsRamp API.
@@ -99,10 +104,11 @@ class CloneTemplateManager:
         headers['Content-Type'] = 'application/json'
         
         try:
-            response = requests.post(url, headers=headers, json=payload, verify=False)
+            # Compact body: the customization payload is sent without indentation
+            response = self.auth.session.post(url, headers=headers, data=json_body(payload), verify=False)
             
             if response.status_code in [200, 201]:
-                clone_response = response.json()
+                clone_response = read_json(response)
                 print(f"  ✓ Template cloned successfully!")
                 
                 # Extract and display the new template ID
@@ -118,6 +124,117 @@ class CloneTemplateManager:
             print(f"  ✗ Request failed: {str(e)}")
             return None
     
+    def update_template(self, template_id: str, source_customizations: Dict,
+                        target_global_template_id: str,
+                        new_template_name: Optional[str] = None) -> Optional[Dict]:
+        """
+        Update an existing cloned template with a new customization payload.
+        
+        API: PUT https://{base_url}/monitoring/api/v3/tenants/{tenantId}/templates/{templateId}
+        
+        Args:
+            template_id: ID of the cloned template on the target POD
+            source_customizations: The customization payload from POD-1
+            target_global_template_id: Global template ID from POD-2
+            new_template_name: Optional name for the cloned template
+            
+        Returns:
+            Update response, None if failed
+            
+        Raises:
+            TemplateNotFound: If the template was deleted on the target POD
+        """
+        url = f"{self.base_url}/monitoring/api/v3/tenants/{self.tenant_id}/templates/{template_id}"
+        
+        payload = self.prepare_clone_payload(
+            source_customizations,
+            target_global_template_id,
+            new_template_name
+        )
+        
+        headers = self.auth.get_auth_header()
+        headers['Content-Type'] = 'application/json'
+        
+        try:
+            response = self.auth.session.put(url, headers=headers, data=json_body(payload), verify=False)
+            
+            if response.status_code in [200, 201, 204]:
+                print(f"  ✓ Template updated successfully!")
+                return read_json(response) if response.content else {'id': template_id}
+            elif response.status_code == 404:
+                raise TemplateNotFound(template_id)
+            else:
+                print(f"  ✗ Update API Error [{response.status_code}]: {response.text}")
+                return None
+                
+        except requests.exceptions.RequestException as e:
+            print(f"  ✗ Request failed: {str(e)}")
+            return None
+    
+    def delete_template(self, template_id: str) -> bool:
+        """
+        Delete a cloned template.
+        
+        API: DELETE https://{base_url}/monitoring/api/v3/tenants/{tenantId}/templates/{templateId}
+        
+        Args:
+            template_id: ID of the cloned template on the target POD
+            
+        Returns:
+            True if the template was deleted or no longer exists, False if failed
+        """
+        url = f"{self.base_url}/monitoring/api/v3/tenants/{self.tenant_id}/templates/{template_id}"
+        
+        headers = self.auth.get_auth_header()
+        
+        try:
+            response = self.auth.session.delete(url, headers=headers, verify=False)
+            
+            if response.status_code in [200, 202, 204]:
+                return True
+            elif response.status_code == 404:
+                print(f"  ⚠ Template already deleted: {template_id}")
+                return True
+            else:
+                print(f"  ✗ Delete API Error [{response.status_code}]: {response.text}")
+                return False
+                
+        except requests.exceptions.RequestException as e:
+            print(f"  ✗ Request failed: {str(e)}")
+            return False
+    
+    def delete_many(self, template_ids: Iterable[str], max_workers: Optional[int] = None
+                    ) -> Iterator[Tuple[str, bool]]:
+        """
+        Delete many cloned templates concurrently.
+        
+        Args:
+            template_ids: Template IDs (read lazily)
+            max_workers: Concurrent delete requests (default: the POD's write limit)
+            
+        Returns:
+            Iterator of (template ID, deleted) in completion order
+        """
+        return map_as_completed(self.delete_template, template_ids,
+                                max_workers or self.auth.limits.write.max_limit)
+    
+    def clone_many(self, items: Iterable[Dict], max_workers: Optional[int] = None
+                   ) -> Iterator[Tuple[Dict, Optional[Dict]]]:
+        """
+        Clone many templates concurrently.
+        
+        Args:
+            items: Dicts of clone_template arguments (source_customizations,
+                   target_global_template_id and optionally new_template_name),
+                   read lazily
+            max_workers: Concurrent clone requests (default: the POD's write limit)
+            
+        Returns:
+            Iterator of (item, clone response or None) in completion order
+        """
+        return map_as_completed(lambda item: self.clone_template(**item), items,
+                                max_workers or self.auth.limits.write.max_limit)
+    
     def get_cloned_template_id(self, clone_response: Dict) -> Optional[str]:
         """
         Extract the template ID from clone response.
@@ -147,8 +264,7 @@ class CloneTemplateManager:
             
             output_path = output_dir / filename
             
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(clone_response, f, indent=4)
+            dump_to_file(clone_response, output_path)
             
             print(f"  ✓ Saved clone response to: {output_path}")
             return True
@@ -0,0 +1,60 @@
+"""
+Tests for concurrent cloning and deletion on the destination POD.
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+from clone_template.clone_template import CloneTemplateManager
+
+# Batch sizes on either side of the lookups' bulk threshold
+BATCH_SIZES = [5, 25]
+
+
+@pytest.fixture
+def pod(fake_network):
+    pod = fake_network.add_pod("pod2")
+    pod.add_global("Linux")
+    return pod
+
+
+@pytest.fixture
+def manager(fake_network, pod):
+    return CloneTemplateManager(fake_network.auth("pod2"), "target")
+
+
+@pytest.mark.parametrize('count', BATCH_SIZES)
+def test_clone_many(manager, pod, count):
+    items = [{'source_customizations': {'id': f"src-{i}", 'name': f"Clone {i}"},
+              'target_global_template_id': "g-Linux",
+              'new_template_name': f"Renamed {i}" if i % 2 else None}
+             for i in range(count)]
+    results = list(manager.clone_many(iter(items), max_workers=4))
+
+    assert len(results) == count and all(response and response['id'] for _, response in results)
+    clones = pod.clones("target")
+    assert sorted(t['name'] for t in clones) == sorted(
+        f"Renamed {i}" if i % 2 else f"Clone {i}" for i in range(count))
+    # Source IDs are dropped and the destination parent is set
+    assert all('id' not in t['payload'] and t['payload']['clonedTemplateId'] == "g-Linux" for t in clones)
+
+
+def test_clone_many_reports_failures(manager):
+    items = [{'source_customizations': {'name': "A"}, 'target_global_template_id': "g-Linux"},
+             {'source_customizations': {'name': "B"}, 'target_global_template_id': "g-Missing"}]
+    results = {item['source_customizations']['name']: response for item, response in manager.clone_many(items)}
+    assert results["A"]['id'] and results["B"] is None
+
+
+@pytest.mark.parametrize('count', BATCH_SIZES)
+def test_delete_many(manager, pod, count):
+    """Deleted and already missing templates both count as deleted"""
+    ids = [pod.add_clone("target", "Linux")['id'] for _ in range(count)]
+    other = pod.add_clone("other", "Linux")['id']
+    results = dict(manager.delete_many(iter(ids + ["missing"]), max_workers=4))
+
+    assert results == {template_id: True for template_id in ids + ["missing"]}
+    assert pod.clones("target") == [] and other in pod.templates
+    assert pod.calls[('DELETE', 'template')] == count + 1
@@ -5,8 +5,10 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 import requests
 import urllib3
-from typing import Dict, Optional, List
+from typing import Dict, Iterable, Iterator, Optional, List, Tuple
 from auth.auth import OpsRampAuth
+from codec.codec import read_json
+from limiter.limiter import map_as_completed
 
 # Disable SSL warnings (temporary for development)
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -50,12 +52,35 @@ class ClonedTemplateManager:
     Cloned templates are identified using their parent global template IDs.
     """
     
+    # Page size used when listing cloned templates in bulk
+    PAGE_SIZE = 500
+    
+    # Scopes of tenant-level (non-global) templates
+    CLONED_SCOPES = "SERVICE PROVIDER,CLIENT,PARTNER"
+    
+    # Batch lookups of more parent IDs than this use the bulk listing
+    BULK_THRESHOLD = 20
+    
     def __init__(self, auth: OpsRampAuth, tenant_id: str):
       
         self.auth = auth
         self.tenant_id = tenant_id
         self.base_url = auth.base_url
     
+    @staticmethod
+    def _parse_template(item: Dict, parent_id: str = "") -> ClonedTemplateInfo:
+        return ClonedTemplateInfo(
+            template_id=item.get('id', ''),
+            name=item.get('name', ''),
+            description=item.get('description', ''),
+            parent_id=item.get('parentUUID', parent_id),
+            scope=item.get('scope', ''),
+            app_name=item.get('appName', ''),
+            native_type=item.get('nativeType', ''),
+            version=str(item.get('version', '')),
+            raw_response=item
+        )
+    
     def get_cloned_template_by_parent_id(self, global_template_id: str) -> Optional[ClonedTemplateInfo]:
         
         # API: GET https://{base_url}/api/v2/tenants/{tenantId}/templates
@@ -74,32 +99,19 @@ class ClonedTemplateManager:
         headers = self.auth.get_auth_header()
         
         try:
-            response = requests.get(url, headers=headers, params=params, verify=False)
+            response = self.auth.session.get(url, headers=headers, params=params, verify=False)
             
             if response.status_code == 200:
-                data = response.json()
-                results = data.get('results', [])
+                data = read_json(response)
+                # First result whose parent is exactly this template, as the bulk listing matches
+                match = next((item for item in data.get('results', [])
+                              if item.get('parentUUID', global_template_id) == global_template_id), None)
                 
-                if not results:
+                if match is None:
                     print(f" No cloned template found for parent ID: {global_template_id}")
                     return None
                 
-                # Get the first matching result
-                item = results[0]
-                
-                cloned_info = ClonedTemplateInfo(
-                    template_id=item.get('id', ''),
-                    name=item.get('name', ''),
-                    description=item.get('description', ''),
-                    parent_id=item.get('parentUUID', global_template_id),
-                    scope=item.get('scope', ''),
-                    app_name=item.get('appName', ''),
-                    native_type=item.get('nativeType', ''),
-                    version=str(item.get('version', '')),
-                    raw_response=item
-                )
-                
-                return cloned_info
+                return self._parse_template(match, global_template_id)
             else:
                 print(f"  ✗ API Error [{response.status_code}]: {response.text}")
                 return None
@@ -122,28 +134,13 @@ class ClonedTemplateManager:
         headers = self.auth.get_auth_header()
         
         try:
-            response = requests.get(url, headers=headers, params=params, verify=False)
+            response = self.auth.session.get(url, headers=headers, params=params, verify=False)
             
             if response.status_code == 200:
-                data = response.json()
+                data = read_json(response)
                 results = data.get('results', [])
                 
-                cloned_templates = []
-                for item in results:
-                    cloned_info = ClonedTemplateInfo(
-                        template_id=item.get('id', ''),
-                        name=item.get('name', ''),
-                        description=item.get('description', ''),
-                        parent_id=item.get('parentUUID', global_template_id),
-                        scope=item.get('scope', ''),
-                        app_name=item.get('appName', ''),
-                        native_type=item.get('nativeType', ''),
-                        version=str(item.get('version', '')),
-                        raw_response=item
-                    )
-                    cloned_templates.append(cloned_info)
-                
-                return cloned_templates
+                return [self._parse_template(item, global_template_id) for item in results]
             else:
                 print(f"  ✗ API Error [{response.status_code}]: {response.text}")
                 return []
@@ -152,6 +149,81 @@ class ClonedTemplateManager:
             print(f"  ✗ Request failed: {str(e)}")
             return []
     
+    def iter_cloned_templates(self, sort_by_update: bool = False) -> Iterator[ClonedTemplateInfo]:
+        
+        # API: GET https://{base_url}/api/v2/tenants/{tenantId}/templates
+        #      ?queryString=scope:SERVICE PROVIDER,CLIENT,PARTNER&pageNo={n}&pageSize={size}
+        # Lists metadata of all tenant-level templates; raises requests.exceptions.RequestException on failure.
+        # With sort_by_update, the most recently updated templates come first.
+        
+        url = f"{self.base_url}/api/v2/tenants/{self.tenant_id}/templates"
+        page_no = 1
+        
+        while True:
+            params = {
+                'queryString': f"scope:{self.CLONED_SCOPES}",
+                'includeGatewaySDK': 'true',
+                'pageNo': page_no,
+                'pageSize': self.PAGE_SIZE
+            }
+            if sort_by_update:
+                params['sortName'] = 'updatedTime'
+                params['isDescendingOrder'] = 'true'
+            
+            response = self.auth.session.get(url, headers=self.auth.get_auth_header(),
+                                             params=params, verify=False)
+            response.raise_for_status()
+            
+            data = read_json(response)
+            results = data.get('results', [])
+            for item in results:
+                yield self._parse_template(item)
+            
+            if not data.get('nextPage') or not results:
+                break
+            page_no += 1
+    
+    def get_cloned_templates_by_parent_ids(self, global_template_ids: Iterable[str],
+                                           max_workers: Optional[int] = None
+                                           ) -> Iterator[Tuple[str, Optional[ClonedTemplateInfo]]]:
+        """
+        Look up the cloned template of many global templates.
+        
+        Up to BULK_THRESHOLD parent IDs are looked up concurrently one by one;
+        more are matched while paging through the bulk listing of cloned templates.
+        Both ways return the first clone listed whose parent ID is an exact match.
+        
+        Args:
+            global_template_ids: Parent global template IDs
+            max_workers: Concurrent lookups (default: the POD's read limit)
+            
+        Returns:
+            Iterator of (global template ID, ClonedTemplateInfo or None) in completion order
+        """
+        parent_ids = list(dict.fromkeys(global_template_ids))
+        max_workers = max_workers or self.auth.limits.read.max_limit
+        
+        if len(parent_ids) > self.BULK_THRESHOLD:
+            pending = set(parent_ids)
+            try:
+                for template in self.iter_cloned_templates():
+                    # The first clone listed for a parent, as in get_cloned_template_by_parent_id
+                    if template.parent_id in pending:
+                        pending.discard(template.parent_id)
+                        yield template.parent_id, template
+                        if not pending:
+                            return
+            except requests.exceptions.RequestException as e:
+                print(f"  ✗ Bulk listing failed, looking up parents one by one: {str(e)}")
+                parent_ids = [parent_id for parent_id in parent_ids if parent_id in pending]
+            else:
+                for parent_id in parent_ids:
+                    if parent_id in pending:
+                        yield parent_id, None
+                return
+        
+        yield from map_as_completed(self.get_cloned_template_by_parent_id, parent_ids, max_workers)
+    
     def get_cloned_template_id(self, global_template_id: str) -> Optional[str]:
         
         cloned_info = self.get_cloned_template_by_parent_id(global_template_id)
@@ -0,0 +1,50 @@
+"""
+Tests for cloned template lookups by parent global template.
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+from cloned_template.cloned_template import ClonedTemplateManager
+
+
+@pytest.fixture
+def pod(fake_network):
+    pod = fake_network.add_pod("pod1")
+    pod.add_clone("client", "Linux")
+    pod.add_clone("client", "Linux", name="Second clone of Linux")
+    pod.add_clone("client", "Windows")
+    # Clones of other tenants are not found
+    pod.add_clone("other", "Solaris")
+    return pod
+
+
+@pytest.fixture
+def manager(fake_network, pod):
+    return ClonedTemplateManager(fake_network.auth("pod1"), "client")
+
+
+def test_lookup_by_parent_id(manager):
+    """The first clone of the parent is returned"""
+    assert manager.get_cloned_template_id("g-Linux") == "c1"
+    assert len(manager.get_all_cloned_templates_by_parent_id("g-Linux")) == 2
+    assert manager.get_cloned_template_by_parent_id("g-Solaris") is None
+
+
+@pytest.mark.parametrize('padding', [0, ClonedTemplateManager.BULK_THRESHOLD])
+def test_batch_lookup_matches_alike_on_both_paths(manager, pod, padding):
+    """Small batches query each parent, large ones page the listing; the answers are the same"""
+    parent_ids = ["g-Linux", "g-Windows", "g-Solaris", "g-linux"] + [f"g-Unknown {i}" for i in range(padding)]
+    results = dict(manager.get_cloned_templates_by_parent_ids(parent_ids, max_workers=2))
+
+    assert set(results) == set(parent_ids)
+    assert results["g-Linux"].template_id == "c1" and results["g-Linux"].parent_id == "g-Linux"
+    assert results["g-Windows"].template_id == "c3"
+    # Parent IDs match exactly, case included
+    assert all(results[parent_id] is None for parent_id in parent_ids[2:])
+
+    bulk = len(parent_ids) > ClonedTemplateManager.BULK_THRESHOLD
+    assert pod.calls[('GET', 'parent')] == (0 if bulk else len(parent_ids))
+    assert pod.calls[('GET', 'clone page')] == (1 if bulk else 0)
@@ -0,0 +1 @@
+# Codec module
@@ -0,0 +1,220 @@
+"""
+Codec Module
+JSON encoding/decoding for API payloads and output files.
+
+Uses orjson when it is installed and falls back to the stdlib json module.
+Responses arrive compressed with whatever content encodings requests offers
+(gzip/deflate, plus br and zstd when urllib3 can decode them) and request
+bodies are serialized compactly. Bytes on the wire and time spent in JSON
+encoding/decoding are tracked in TRANSFER_STATS for the run summary.
+"""
+import json
+import hashlib
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Union
+
+import requests
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+JSON_BACKEND = 'orjson' if orjson is not None else 'json'
+
+
+class TransferStats:
+    """
+    Thread-safe counters for bytes transferred and JSON CPU time.
+    """
+    
+    FIELDS = ('responses', 'response_wire_bytes', 'response_json_bytes', 'decode_seconds',
+              'receive_seconds', 'requests', 'request_body_bytes', 'encode_seconds',
+              'file_writes', 'file_write_bytes', 'file_encode_seconds', 'file_write_seconds')
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self) -> None:
+        with self._lock:
+            self.values = {field: 0 for field in self.FIELDS}
+    
+    def add(self, **counts) -> None:
+        with self._lock:
+            for field, value in counts.items():
+                self.values[field] += value
+    
+    def merge(self, other: Dict) -> None:
+        # Add counters from another run (e.g. a shard worker's results file)
+        self.add(**{field: other.get(field, 0) for field in self.FIELDS})
+    
+    def to_dict(self) -> Dict:
+        with self._lock:
+            return dict(self.values)
+    
+    def report_lines(self, template_count: int = 0) -> list:
+        """
+        Format the counters for the run summary.
+        
+        Args:
+            template_count: Number of templates processed, for per-template averages
+        """
+        values = self.to_dict()
+        wire = values['response_wire_bytes']
+        decoded = values['response_json_bytes']
+        saved = (1 - wire / decoded) * 100 if decoded else 0.0
+        
+        lines = [
+            f"JSON backend: {JSON_BACKEND}",
+            f"Responses: {values['responses']}, {_format_bytes(wire)} on the wire, "
+            f"{_format_bytes(decoded)} decoded ({saved:.0f}% saved by compression)",
+            f"Request bodies: {values['requests']}, {_format_bytes(values['request_body_bytes'])}",
+            f"JSON CPU time: decode {values['decode_seconds']:.3f}s, encode {values['encode_seconds']:.3f}s"
+        ]
+        if template_count:
+            per_template_bytes = (wire + values['request_body_bytes']) / template_count
+            per_template_cpu = (values['decode_seconds'] + values['encode_seconds']) / template_count
+            lines.append(f"Per template: {_format_bytes(per_template_bytes)} transferred, "
+                         f"{per_template_cpu * 1000:.1f}ms JSON CPU")
+        return lines
+
+
+TRANSFER_STATS = TransferStats()
+
+
+def _format_bytes(count: float) -> str:
+    for unit in ('B', 'KB', 'MB'):
+        if count < 1024:
+            return f"{count:.1f} {unit}" if unit != 'B' else f"{int(count)} B"
+        count /= 1024
+    return f"{count:.1f} GB"
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any) -> bytes:
+    # Compact UTF-8 JSON, used for request bodies
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def canonical_json(obj: Any) -> bytes:
+    # Key-sorted compact JSON, identical for equal payloads regardless of key order
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+    return json.dumps(obj, sort_keys=True, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def canonical_hash(obj: Any) -> str:
+    # SHA-256 of the canonical JSON form
+    return hashlib.sha256(canonical_json(obj)).hexdigest()
+
+
+def read_json(response: requests.Response) -> Any:
+    """
+    Decode a JSON response body, recording wire size and decode time.
+    
+    Raises:
+        requests.exceptions.InvalidJSONError: If the body is not valid JSON
+    """
+    content = response.content
+    
+    # Compressed bytes read from the socket; falls back to the decoded size
+    try:
+        wire_bytes = response.raw.tell() or len(content)
+    except (AttributeError, TypeError, ValueError):
+        wire_bytes = len(content)
+    
+    start = time.perf_counter()
+    try:
+        data = loads(content)
+    except ValueError as e:
+        raise requests.exceptions.InvalidJSONError(f"Invalid JSON response: {str(e)}", response=response)
+    elapsed = time.perf_counter() - start
+    
+    TRANSFER_STATS.add(responses=1, response_wire_bytes=wire_bytes,
+                       response_json_bytes=len(content), decode_seconds=elapsed)
+    return data
+
+
+def iter_response(response: requests.Response, chunk_size: int) -> Iterator[bytes]:
+    """
+    Yield a streamed (stream=True) response body in decoded chunks without parsing
+    it, recording its wire and decoded size like read_json once it is exhausted.
+    Time spent waiting for chunks is recorded as receive_seconds (see --profile).
+    """
+    size = 0
+    receive_seconds = 0.0
+    chunks = response.iter_content(chunk_size)
+    try:
+        while True:
+            start = time.perf_counter()
+            chunk = next(chunks, None)
+            receive_seconds += time.perf_counter() - start
+            if chunk is None:
+                break
+            size += len(chunk)
+            yield chunk
+    finally:
+        TRANSFER_STATS.add(receive_seconds=receive_seconds)
+    
+    try:
+        wire_bytes = response.raw.tell() or size
+    except (AttributeError, TypeError, ValueError):
+        wire_bytes = size
+    TRANSFER_STATS.add(responses=1, response_wire_bytes=wire_bytes, response_json_bytes=size)
+
+
+def json_body(obj: Any) -> bytes:
+    """
+    Serialize a request body compactly, recording its size and encode time.
+    """
+    start = time.perf_counter()
+    body = dumps(obj)
+    elapsed = time.perf_counter() - start
+    
+    TRANSFER_STATS.add(requests=1, request_body_bytes=len(body), encode_seconds=elapsed)
+    return body
+
+
+def dump_to_file(obj: Any, path: Union[str, Path]) -> None:
+    # Four-space indented JSON for output files that are read by people, as
+    # json.dump has always written them. Always the stdlib: orjson only
+    # supports two-space indents, and these files are small next to API payloads.
+    # Encoding and writing are timed separately (see TRANSFER_STATS).
+    start = time.perf_counter()
+    data = json.dumps(obj, indent=4).encode('utf-8')
+    encoded = time.perf_counter()
+    
+    with open(path, 'wb') as f:
+        f.write(data)
+    
+    TRANSFER_STATS.add(file_writes=1, file_write_bytes=len(data),
+                       file_encode_seconds=encoded - start,
+                       file_write_seconds=time.perf_counter() - encoded)
+
+
+@contextmanager
+def timed_write(size: int = 0) -> Iterator[None]:
+    """
+    Time a blocking write to a file or SQLite database (artefact blobs, run
+    state and snapshot rows), recorded with the output file writes.
+    
+    Args:
+        size: Bytes written, when known
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        TRANSFER_STATS.add(file_writes=1, file_write_bytes=size,
+                           file_write_seconds=time.perf_counter() - start)
@@ -0,0 +1,139 @@
+"""
+Tests for JSON encoding/decoding and transfer accounting.
+"""
+import io
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+import requests
+from codec import codec
+from codec.codec import (TRANSFER_STATS, TransferStats, canonical_hash, dump_to_file, dumps, iter_response,
+                         json_body, loads, read_json)
+
+PAYLOAD = {'name': "Linux – servers", 'monitors': [{'metric': 'cpu', 'threshold': 90.5, 'enabled': True}],
+           'description': None, 'tags': []}
+
+
+@pytest.fixture(params=['orjson', 'json'])
+def backend(request, monkeypatch):
+    # Run a test with orjson (when installed) and with the stdlib fallback
+    if request.param == 'orjson':
+        pytest.importorskip('orjson')
+    else:
+        monkeypatch.setattr(codec, 'orjson', None)
+    return request.param
+
+
+def make_response(body):
+    response = requests.Response()
+    response.status_code = 200
+    response.raw = io.BytesIO(body)
+    return response
+
+
+def counters_since(before):
+    after = TRANSFER_STATS.to_dict()
+    return {field: after[field] - before[field] for field in TransferStats.FIELDS}
+
+
+class SlowBody(io.RawIOBase):
+    # Response body that takes a while to arrive
+
+    def __init__(self, data, delay):
+        self.data = io.BytesIO(data)
+        self.delay = delay
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        time.sleep(self.delay)
+        return self.data.readinto(buffer)
+
+
+def test_iter_response_records_receive_time():
+    """Reading a streamed body counts as network time (see --profile)"""
+    response = requests.Response()
+    response.status_code = 200
+    response.raw = SlowBody(b'{"name": "A"}' * 10, 0.01)
+    before = TRANSFER_STATS.to_dict()
+
+    assert b''.join(iter_response(response, 16)) == b'{"name": "A"}' * 10
+
+    after = TRANSFER_STATS.to_dict()
+    assert after['responses'] == before['responses'] + 1
+    assert after['response_json_bytes'] - before['response_json_bytes'] == 130
+    assert after['receive_seconds'] - before['receive_seconds'] >= 0.05
+
+
+def test_round_trip(backend):
+    """Both backends write compact UTF-8 that either one reads back"""
+    body = dumps(PAYLOAD)
+    assert b': ' not in body and b', ' not in body and "–".encode('utf-8') in body
+    assert loads(body) == json.loads(body.decode('utf-8')) == PAYLOAD
+    assert loads(json.dumps(PAYLOAD)) == PAYLOAD
+    # Key order does not change the canonical hash
+    assert canonical_hash(PAYLOAD) == canonical_hash(dict(reversed(list(PAYLOAD.items()))))
+
+
+def test_backends_agree():
+    orjson = pytest.importorskip('orjson')
+    stdlib = json.dumps(PAYLOAD, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    assert orjson.dumps(PAYLOAD) == stdlib
+    assert orjson.dumps(PAYLOAD, option=orjson.OPT_SORT_KEYS) == json.dumps(
+        PAYLOAD, sort_keys=True, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def test_read_json_records_response(backend):
+    before = TRANSFER_STATS.to_dict()
+    assert read_json(make_response(b'{"results": [1, 2]}')) == {'results': [1, 2]}
+
+    counts = counters_since(before)
+    assert counts['responses'] == 1
+    assert counts['response_json_bytes'] == counts['response_wire_bytes'] == 19
+    assert counts['decode_seconds'] >= 0
+
+
+def test_read_json_rejects_invalid_body(backend):
+    before = TRANSFER_STATS.to_dict()
+    with pytest.raises(requests.exceptions.InvalidJSONError, match="Invalid JSON response"):
+        read_json(make_response(b'<html>'))
+    assert counters_since(before)['responses'] == 0
+
+
+def test_json_body_records_request(backend):
+    before = TRANSFER_STATS.to_dict()
+    body = json_body(PAYLOAD)
+
+    counts = counters_since(before)
+    assert counts['requests'] == 1 and counts['request_body_bytes'] == len(body)
+    assert loads(body) == PAYLOAD
+
+
+def test_dump_to_file_indents_four_spaces(backend, tmp_path):
+    """Output files look the same with either backend, as json.dump wrote them"""
+    path = tmp_path / "out.json"
+    before = TRANSFER_STATS.to_dict()
+    dump_to_file(PAYLOAD, path)
+
+    assert path.read_text(encoding='utf-8') == json.dumps(PAYLOAD, indent=4)
+    counts = counters_since(before)
+    assert counts['file_writes'] == 1 and counts['file_write_bytes'] == path.stat().st_size
+
+
+def test_transfer_stats_report():
+    stats = TransferStats()
+    stats.add(responses=2, response_wire_bytes=512, response_json_bytes=2048, requests=1, request_body_bytes=512)
+    stats.merge({'responses': 1, 'unknown': 5})
+
+    assert stats.to_dict()['responses'] == 3
+    lines = stats.report_lines(template_count=2)
+    assert "Responses: 3, 512 B on the wire, 2.0 KB decoded (75% saved by compression)" in lines
+    assert lines[-1].startswith("Per template: 512 B transferred")
+    stats.reset()
+    assert set(stats.to_dict().values()) == {0}
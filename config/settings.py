@@ -1,34 +1,308 @@
+import csv
+import sys
+import json
+import hashlib
 from pathlib import Path
-from typing import List
+from typing import Dict, IO, Iterable, Iterator, List, Optional, Union
 
+# Destination POD used when an input row does not override it
+DEFAULT_TARGET_POD = 2
 
-def load_template_names(config_file: str = None) -> List[str]:
-    
-    if config_file is None:
+INPUT_FORMATS = ('text', 'csv', 'jsonl')
+
+
+class TemplateSelection:
+    # one template requested for cloning, with optional per-row overrides
+
+    def __init__(self, name: str, new_name: Optional[str] = None,
+                 target_pod: Optional[int] = None, priority: int = 0):
+        self.name = name
+        self.new_name = new_name
+        self.target_pod = target_pod or DEFAULT_TARGET_POD
+        # Higher priorities are extracted and cloned first (see scheduler.py)
+        self.priority = priority
+
+    @property
+    def label(self) -> str:
+        # Key used for results; a template cloned to several PODs gets one entry per POD
+        if self.target_pod == DEFAULT_TARGET_POD:
+            return self.name
+        return f"{self.name} (POD{self.target_pod})"
+
+    def __repr__(self):
+        return f"TemplateSelection(name='{self.name[:40]}', target_pod={self.target_pod})"
+
+    def to_dict(self) -> Dict:
+        return {
+            'name': self.name,
+            'new_name': self.new_name,
+            'target_pod': self.target_pod,
+            'priority': self.priority
+        }
+
+
+def _parse_target_pod(value) -> Optional[int]:
+
+    if value is None or str(value).strip() == '':
+        return None
+
+    value = str(value).strip()
+    if value.upper().startswith('POD'):
+        value = value[3:]
+
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"Invalid target POD: {value!r}")
+
+
+def _parse_priority(value) -> int:
+
+    if value is None or str(value).strip() == '':
+        return 0
+
+    try:
+        return int(str(value).strip())
+    except ValueError:
+        raise ValueError(f"Invalid priority: {value!r}")
+
+
+def _selection_from_row(row: Dict) -> Optional[TemplateSelection]:
+
+    name = (row.get('name') or '').strip()
+    if not name:
+        return None
+
+    new_name = (row.get('new_name') or '').strip() or None
+    return TemplateSelection(name, new_name, _parse_target_pod(row.get('target_pod')),
+                             _parse_priority(row.get('priority')))
+
+
+def iter_text_selections(lines: Iterable[str]) -> Iterator[TemplateSelection]:
+    # One template name per line, empty lines and '#' comments are skipped
+
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        yield TemplateSelection(line)
+
+
+def iter_csv_selections(lines: Iterable[str]) -> Iterator[TemplateSelection]:
+    # CSV with a header row: name[,new_name][,target_pod][,priority]
+
+    rows = (line for line in lines if not line.lstrip().startswith('#'))
+    for row in csv.DictReader(rows):
+        selection = _selection_from_row(row)
+        if selection:
+            yield selection
+
+
+def iter_jsonl_selections(lines: Iterable[str]) -> Iterator[TemplateSelection]:
+    # One JSON value per line: a template name string or {"name", "new_name", "target_pod", "priority"}
+
+    for line_number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON on input line {line_number}: {str(e)}")
+
+        selection = TemplateSelection(row) if isinstance(row, str) else _selection_from_row(row)
+        if selection:
+            yield selection
+
+
+def dedupe_selections(selections: Iterable[TemplateSelection]) -> Iterator[TemplateSelection]:
+    """
+    Drop repeated selections on the fly.
+
+    The seen-set holds a 64-bit digest per selection rather than the name
+    itself, so its size does not depend on how long template names are.
+    """
+    seen = set()
+    for selection in selections:
+        key = f"{selection.name}\0{selection.target_pod}".encode('utf-8')
+        digest = int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), 'big')
+        if digest in seen:
+            continue
+        seen.add(digest)
+        yield selection
+
+
+def _detect_format(path: Path) -> str:
+
+    suffix = path.suffix.lower()
+    if suffix == '.csv':
+        return 'csv'
+    if suffix in ('.jsonl', '.ndjson'):
+        return 'jsonl'
+    return 'text'
+
+
+def detect_input_format(source: Union[str, Path, None] = None,
+                        input_format: Optional[str] = None) -> str:
+    # Format iter_template_selections reads a file or stdin ('-') in
+
+    if input_format:
+        return input_format
+    if source is None or source == '-':
+        return 'text'
+    return _detect_format(Path(source))
+
+
+def _iter_lines(stream: IO[str]) -> Iterator[str]:
+    # Read line by line so stdin is consumed as data arrives
+
+    line = stream.readline()
+    while line:
+        yield line
+        line = stream.readline()
+
+
+def iter_template_selections(source: Union[str, Path, Iterable, None] = None,
+                             input_format: Optional[str] = None) -> Iterator[TemplateSelection]:
+    """
+    Lazily yield deduplicated template selections from an input source.
+
+    Args:
+        source: Path to a text/CSV/JSONL file, '-' for stdin, None for
+                config/template_names.txt, or any iterable (e.g. a generator)
+                of names, row dicts or TemplateSelection objects
+        input_format: 'text', 'csv' or 'jsonl'; detected from the file
+                      extension when omitted (stdin defaults to text)
+
+    Returns:
+        Iterator of TemplateSelection, consumed as the pipeline pulls it
+    """
+    if input_format and input_format not in INPUT_FORMATS:
+        raise ValueError(f"Unknown input format '{input_format}', expected one of {', '.join(INPUT_FORMATS)}")
+
+    if source is not None and not isinstance(source, (str, Path)):
+        return dedupe_selections(_iter_generated(source))
+
+    parsers = {
+        'text': iter_text_selections,
+        'csv': iter_csv_selections,
+        'jsonl': iter_jsonl_selections
+    }
+
+    if source == '-':
+        return dedupe_selections(parsers[input_format or 'text'](_iter_lines(sys.stdin)))
+
+    if source is None:
         config_file = Path(__file__).parent / 'template_names.txt'
     else:
-        config_file = Path(config_file)
-    
+        config_file = Path(source)
+
+    # Checked up front so a missing file fails before any work starts
     if not config_file.exists():
         raise FileNotFoundError(
             f"Template names file not found: {config_file}\n"
             "Please create the file and add template names (one per line)."
         )
-    
-    template_names = []
-    
-    with open(config_file, 'r', encoding='utf-8') as f:
-        for line in f:
-            line = line.strip()
-            # Skip empty lines and comments
-            if not line or line.startswith('#'):
-                continue
-            template_names.append(line)
-    
+
+    parser = parsers[input_format or _detect_format(config_file)]
+    return dedupe_selections(_iter_file(config_file, parser))
+
+
+def _iter_generated(items: Iterable) -> Iterator[TemplateSelection]:
+
+    for item in items:
+        if isinstance(item, TemplateSelection):
+            yield item
+        elif isinstance(item, dict):
+            selection = _selection_from_row(item)
+            if selection:
+                yield selection
+        elif str(item).strip():
+            yield TemplateSelection(str(item).strip())
+
+
+def _iter_file(config_file: Path, parser) -> Iterator[TemplateSelection]:
+
+    with open(config_file, 'r', encoding='utf-8', newline='') as f:
+        yield from parser(_iter_lines(f))
+
+
+class TenantPair:
+    # one source tenant (POD-1) whose templates are cloned into one destination tenant
+
+    def __init__(self, source_tenant: str, target_tenant: str, target_pod: Optional[int] = None):
+        self.source_tenant = source_tenant
+        self.target_tenant = target_tenant
+        self.target_pod = target_pod or DEFAULT_TARGET_POD
+
+    @property
+    def label(self) -> str:
+        return f"{self.source_tenant} -> {self.target_tenant} (POD{self.target_pod})"
+
+    def __repr__(self):
+        return f"TenantPair('{self.source_tenant}' -> '{self.target_tenant}', target_pod={self.target_pod})"
+
+    def to_dict(self) -> Dict:
+        return {
+            'source_tenant': self.source_tenant,
+            'target_tenant': self.target_tenant,
+            'target_pod': self.target_pod
+        }
+
+
+def load_tenant_pairs(path: Union[str, Path]) -> List[TenantPair]:
+    """
+    Load source/destination tenant pairs.
+
+    Args:
+        path: CSV file with a header row source_tenant,target_tenant[,target_pod],
+              or a JSONL file with one object per line using the same keys
+
+    Returns:
+        List of TenantPair, duplicates removed
+    """
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"Tenant pairs file not found: {path}")
+
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        lines = [line for line in f if line.strip() and not line.lstrip().startswith('#')]
+
+    if _detect_format(path) == 'jsonl':
+        try:
+            rows = [json.loads(line) for line in lines]
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON in {path}: {str(e)}")
+    else:
+        rows = list(csv.DictReader(lines))
+
+    pairs = []
+    seen = set()
+    for row_number, row in enumerate(rows, 1):
+        source = str(row.get('source_tenant') or '').strip()
+        target = str(row.get('target_tenant') or '').strip()
+        if not source or not target:
+            raise ValueError(f"Row {row_number} of {path} needs source_tenant and target_tenant")
+
+        pair = TenantPair(source, target, _parse_target_pod(row.get('target_pod')))
+        if pair.label not in seen:
+            seen.add(pair.label)
+            pairs.append(pair)
+
+    if not pairs:
+        raise ValueError(f"No tenant pairs found in {path}")
+    return pairs
+
+
+def load_template_names(config_file: str = None) -> List[str]:
+
+    template_names = [selection.name for selection in iter_template_selections(config_file)]
+
     if not template_names:
         raise ValueError(
-            f"No template names found in {config_file}\n"
+            f"No template names found in {config_file or Path(__file__).parent / 'template_names.txt'}\n"
             "Please add at least one template name."
         )
-    
+
     return template_names
@@ -0,0 +1,142 @@
+"""
+Tests for template input parsing.
+"""
+import io
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+from config.settings import (DEFAULT_TARGET_POD, TemplateSelection, dedupe_selections, detect_input_format,
+                             iter_csv_selections, iter_jsonl_selections, iter_template_selections,
+                             iter_text_selections, load_tenant_pairs)
+
+
+def test_iter_text_selections_skips_blanks_and_comments():
+    """One name per line; blank lines and '#' comments are ignored"""
+    selections = list(iter_text_selections(["hpe-alletra\n", "\n", "# comment\n", "  Battery  \n"]))
+    assert [selection.name for selection in selections] == ["hpe-alletra", "Battery"]
+    assert all(selection.target_pod == DEFAULT_TARGET_POD for selection in selections)
+
+
+def test_iter_csv_selections_reads_overrides():
+    """CSV rows may set new_name, target_pod (with or without a POD prefix) and priority"""
+    lines = [
+        "name,new_name,target_pod,priority\n",
+        "# skipped\n",
+        "hpe-alletra,Alletra copy,POD3,5\n",
+        "Battery,,,\n",
+        ",no name,,\n",
+    ]
+    selections = list(iter_csv_selections(lines))
+    assert [selection.to_dict() for selection in selections] == [
+        {'name': "hpe-alletra", 'new_name': "Alletra copy", 'target_pod': 3, 'priority': 5},
+        {'name': "Battery", 'new_name': None, 'target_pod': DEFAULT_TARGET_POD, 'priority': 0},
+    ]
+    assert selections[0].label == "hpe-alletra (POD3)"
+    assert selections[1].label == "Battery"
+
+
+def test_iter_csv_selections_invalid_values():
+    """Unparseable target PODs and priorities are input errors"""
+    with pytest.raises(ValueError):
+        list(iter_csv_selections(["name,target_pod\n", "Battery,somewhere\n"]))
+    with pytest.raises(ValueError):
+        list(iter_csv_selections(["name,priority\n", "Battery,high\n"]))
+
+
+def test_iter_jsonl_selections():
+    """Lines are names or row objects; invalid JSON reports the line number"""
+    lines = ['"hpe-alletra"\n', '\n', '{"name": "Battery", "target_pod": 3, "priority": 2}\n']
+    selections = list(iter_jsonl_selections(lines))
+    assert [(selection.name, selection.target_pod, selection.priority) for selection in selections] == [
+        ("hpe-alletra", DEFAULT_TARGET_POD, 0), ("Battery", 3, 2)
+    ]
+    with pytest.raises(ValueError, match="line 2"):
+        list(iter_jsonl_selections(['"ok"\n', '{not json\n']))
+
+
+def test_dedupe_selections_keeps_first_per_name_and_pod():
+    """A name repeated for the same POD is dropped; the same name for another POD is kept"""
+    selections = [
+        TemplateSelection("A"), TemplateSelection("B"), TemplateSelection("A", new_name="later"),
+        TemplateSelection("A", target_pod=3)
+    ]
+    result = list(dedupe_selections(selections))
+    assert [selection.label for selection in result] == ["A", "B", "A (POD3)"]
+    assert result[0].new_name is None
+
+
+def test_dedupe_selections_is_lazy():
+    """Selections are yielded as they are read, not after the input ends"""
+    def names():
+        yield TemplateSelection("A")
+        raise AssertionError("read past the first selection")
+
+    assert next(dedupe_selections(names())).name == "A"
+
+
+def test_iter_template_selections_from_file(tmp_path):
+    """The format follows the file extension unless given"""
+    path = tmp_path / "templates.csv"
+    path.write_text("name,target_pod\nA,3\nA,3\nB,\n", encoding='utf-8')
+    assert [selection.label for selection in iter_template_selections(path)] == ["A (POD3)", "B"]
+    assert detect_input_format(path) == 'csv'
+    assert detect_input_format(tmp_path / "templates.ndjson") == 'jsonl'
+    assert detect_input_format('-') == 'text'
+    assert detect_input_format(path, 'text') == 'text'
+
+
+def test_iter_template_selections_from_generator():
+    """Generators may yield names, row dicts or selections"""
+    items = ["A", {'name': "B", 'target_pod': 3}, TemplateSelection("C"), "  ", "A"]
+    assert [selection.label for selection in iter_template_selections(iter(items))] == ["A", "B (POD3)", "C"]
+
+
+def test_iter_template_selections_from_stdin(monkeypatch):
+    """'-' reads stdin in the given format"""
+    monkeypatch.setattr(sys, 'stdin', io.StringIO('{"name": "A"}\n"B"\n'))
+    assert [selection.name for selection in iter_template_selections('-', 'jsonl')] == ["A", "B"]
+
+
+def test_iter_template_selections_errors(tmp_path):
+    """Missing files and unknown formats fail before any work starts"""
+    with pytest.raises(FileNotFoundError):
+        iter_template_selections(tmp_path / "missing.txt")
+    with pytest.raises(ValueError):
+        iter_template_selections(tmp_path / "missing.txt", 'xml')
+
+
+def test_load_tenant_pairs_csv(tmp_path):
+    """Duplicate pairs are dropped; target_pod is optional and may carry a POD prefix"""
+    path = tmp_path / "tenants.csv"
+    path.write_text("source_tenant,target_tenant,target_pod\n# comment\nsrc-a,dst-a,\n"
+                    "src-b,dst-b,POD3\nsrc-a,dst-a,2\n", encoding='utf-8')
+    pairs = load_tenant_pairs(path)
+    assert [pair.to_dict() for pair in pairs] == [
+        {'source_tenant': "src-a", 'target_tenant': "dst-a", 'target_pod': DEFAULT_TARGET_POD},
+        {'source_tenant': "src-b", 'target_tenant': "dst-b", 'target_pod': 3}
+    ]
+    assert pairs[1].label == "src-b -> dst-b (POD3)"
+
+
+def test_load_tenant_pairs_jsonl(tmp_path):
+    path = tmp_path / "tenants.jsonl"
+    path.write_text('{"source_tenant": "src-a", "target_tenant": "dst-a", "target_pod": 1}\n', encoding='utf-8')
+    assert [pair.label for pair in load_tenant_pairs(path)] == ["src-a -> dst-a (POD1)"]
+
+
+@pytest.mark.parametrize('name, content, error', [
+    ("missing.csv", None, FileNotFoundError),
+    ("tenants.csv", "source_tenant,target_tenant\nsrc-a,\n", ValueError),
+    ("tenants.csv", "source_tenant,target_tenant\n", ValueError),
+    ("tenants.csv", "source_tenant,target_tenant,target_pod\nsrc-a,dst-a,POD-X\n", ValueError),
+    ("tenants.jsonl", '{"source_tenant": \n', ValueError),
+])
+def test_load_tenant_pairs_errors(tmp_path, name, content, error):
+    path = tmp_path / name
+    if content is not None:
+        path.write_text(content, encoding='utf-8')
+    with pytest.raises(error):
+        load_tenant_pairs(path)
@@ -0,0 +1,188 @@
+"""
+Shared test fixtures: an in-memory fake of the OpsRamp template API.
+
+The fake is installed like the record/replay transport, so every OpsRampAuth
+session created while the `fake_network` fixture is active talks to it
+instead of the network.
+"""
+import io
+import itertools
+import json
+import sys
+import threading
+from collections import Counter
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+from auth.auth import OpsRampAuth
+from transport.transport import install_transport
+
+CLONED_SCOPES = {'SERVICE PROVIDER', 'CLIENT', 'PARTNER'}
+
+
+class FakePod:
+    """
+    Global templates of one POD and the tenant-level (cloned) templates of its tenants.
+    """
+
+    def __init__(self, host: str):
+        self.host = host
+        self.globals = []
+        # Template ID -> tenant-level template (with 'tenant' and its customizations)
+        self.templates = {}
+        self.rejected_clients = set()
+        self.calls = Counter()
+        self._ids = itertools.count(1)
+        # Update times are ISO timestamps, one second apart
+        self._clock = (f"2026-01-01T00:{n // 60:02d}:{n % 60:02d}" for n in itertools.count(1))
+        self._lock = threading.Lock()
+
+    def add_global(self, name: str, **fields) -> dict:
+        template = dict(fields, id=f"g-{name}", name=name, scope='GLOBAL')
+        self.globals.append(template)
+        return template
+
+    def add_clone(self, tenant: str, parent_name: str, name: str = None, version: int = 1, **fields) -> dict:
+        template_id = f"c{next(self._ids)}"
+        self.templates[template_id] = dict(
+            fields, id=template_id, name=name or f"Clone of {parent_name}", parentUUID=f"g-{parent_name}",
+            scope='CLIENT', version=version, updatedTime=next(self._clock), tenant=tenant
+        )
+        return self.templates[template_id]
+
+    def touch(self, template_id: str, version: int) -> None:
+        # A new version of a template, updated now
+        self.templates[template_id].update(version=version, updatedTime=next(self._clock))
+
+    def clones(self, tenant: str) -> list:
+        return [t for t in self.templates.values() if t['tenant'] == tenant]
+
+    def handle(self, request):
+        """
+        Returns:
+            (status code, JSON body or None)
+        """
+        parts = urlsplit(request.url)
+        path = parts.path.rstrip('/').split('/')
+        params = {key: values[0] for key, values in parse_qs(parts.query).items()}
+
+        with self._lock:
+            if parts.path.endswith('/oauth/token'):
+                self.calls[('POST', 'token')] += 1
+                form = {key: values[0] for key, values in parse_qs(request.body).items()}
+                if form.get('client_id') in self.rejected_clients:
+                    return 401, {'error': 'invalid_client'}
+                return 200, {'access_token': f"token-{self.host}", 'token_type': 'bearer', 'expires_in': 7200}
+
+            if request.method == 'HEAD':
+                self.calls[('HEAD', 'root')] += 1
+                return 200, None
+
+            tenant = path[path.index('tenants') + 1]
+            if path[-1] == 'templates' and request.method == 'GET':
+                return 200, self._search(tenant, params)
+            if path[-1] == 'clone' and request.method == 'POST':
+                self.calls[('POST', 'clone')] += 1
+                body = json.loads(request.body)
+                parent = next((t for t in self.globals if t['id'] == body['clonedTemplateId']), None)
+                if parent is None:
+                    return 400, {'message': 'Global template not found'}
+                template = self.add_clone(tenant, parent['name'], body.get('name'), payload=body)
+                return 200, {'id': template['id']}
+
+            template_id = path[-1]
+            template = self.templates.get(template_id)
+            self.calls[(request.method, 'template')] += 1
+            if template is None or template['tenant'] != tenant:
+                return 404, {'message': 'Template not found'}
+            if request.method == 'GET':
+                return 200, dict(template, monitors=[{'metric': 'cpu', 'threshold': 90}])
+            if request.method == 'PUT':
+                template.update(payload=json.loads(request.body), updatedTime=next(self._clock))
+                return 200, {'id': template_id}
+            if request.method == 'DELETE':
+                del self.templates[template_id]
+                return 204, None
+        return 405, None
+
+    def _search(self, tenant: str, params: dict) -> dict:
+        # Template search: 'name:' is a case-insensitive substring match, like the API's
+        terms = dict(term.split(':', 1) for term in params['queryString'].split('+'))
+        scopes = set(terms['scope'].split(','))
+        if 'name' in terms:
+            self.calls[('GET', 'name')] += 1
+            folded = terms['name'].casefold()
+            return {'results': [t for t in self.globals if folded in t['name'].casefold()]}
+        if 'parentId' in terms:
+            self.calls[('GET', 'parent')] += 1
+            return {'results': [t for t in self.clones(tenant) if t['parentUUID'] == terms['parentId']]}
+
+        if scopes == {'GLOBAL'}:
+            self.calls[('GET', 'global page')] += 1
+            items = self.globals
+        else:
+            self.calls[('GET', 'clone page')] += 1
+            items = [t for t in self.clones(tenant) if t['scope'] in scopes & CLONED_SCOPES]
+            if params.get('sortName') == 'updatedTime':
+                items = sorted(items, key=lambda t: t['updatedTime'], reverse=params.get('isDescendingOrder') == 'true')
+        page_no, page_size = int(params['pageNo']), int(params['pageSize'])
+        page = items[(page_no - 1) * page_size:page_no * page_size]
+        return {'results': page, 'nextPage': page_no * page_size < len(items)}
+
+
+class FakeNetwork:
+    # Routes requests to FakePods by host
+
+    def __init__(self):
+        self.pods = {}
+
+    def add_pod(self, host: str) -> FakePod:
+        self.pods[host] = FakePod(host)
+        return self.pods[host]
+
+    def auth(self, host: str, client_id: str = "id") -> OpsRampAuth:
+        return OpsRampAuth(f"https://{host}", client_id, "secret")
+
+    def adapter(self, **pool_kwargs):
+        return FakeAdapter(self)
+
+
+class FakeAdapter(BaseAdapter):
+
+    def __init__(self, network: FakeNetwork):
+        super().__init__()
+        self.network = network
+
+    def send(self, request, **kwargs):
+        pod = self.network.pods.get(urlsplit(request.url).hostname)
+        if pod is None:
+            raise requests.exceptions.ConnectionError(f"Unknown host in {request.url}")
+        status, body = pod.handle(request)
+
+        response = requests.Response()
+        response.status_code = status
+        response.headers = CaseInsensitiveDict({'Content-Type': 'application/json'})
+        response.raw = io.BytesIO(json.dumps(body).encode('utf-8') if body is not None else b'')
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def fake_network():
+    network = FakeNetwork()
+    install_transport(network)
+    try:
+        yield network
+    finally:
+        install_transport(None)
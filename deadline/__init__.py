@@ -0,0 +1 @@
+# Deadline module
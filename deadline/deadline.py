@@ -0,0 +1,166 @@
+"""
+Deadline Module
+Timeouts, deadlines and cooperative cancellation for every POD request.
+
+Every OpsRampAuth session sends its requests with a (connect, read) timeout
+chosen by endpoint class:
+
+    token  - OAuth token requests
+    read   - GET/HEAD: lookups, listings, customizations, verification
+    write  - POST/PUT/DELETE: clones and updates
+
+Work may also run under deadlines: one for the whole run and one opened
+around each template's steps (template_deadline). A request's timeouts are
+capped by the time left before the nearest deadline. Once a deadline has
+passed, or the run has been cancelled (first Ctrl-C), new requests (other
+than token requests) fail at once with DeadlineExceeded or Cancelled. Both are
+requests.exceptions.RequestException, so managers handle them like any other
+failed request; requests already on the wire finish or time out.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple, Union
+
+import requests
+
+# (connect, read) timeouts in seconds per endpoint class
+DEFAULT_TIMEOUTS: Dict[str, Tuple[float, float]] = {
+    'token': (10.0, 30.0),
+    'read': (10.0, 60.0),
+    'write': (10.0, 180.0)
+}
+
+TIMEOUTS: Dict[str, Tuple[float, float]] = dict(DEFAULT_TIMEOUTS)
+
+# Shortest timeout given to a request that is still sent close to (or, for token
+# requests, after) a deadline; requests rejects zero and negative timeouts
+MIN_TIMEOUT = 1.0
+
+
+class Cancelled(requests.exceptions.RequestException):
+    """The run was cancelled before the request was sent."""
+
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """A run or template deadline passed before the request was sent."""
+
+
+def set_timeouts(connect: Optional[float] = None, read: Optional[float] = None,
+                 write: Optional[float] = None) -> None:
+    # Override timeouts: connect applies to every class, read to token and read
+    # requests, write to the response of write requests
+    for endpoint, (default_connect, default_read) in DEFAULT_TIMEOUTS.items():
+        response_timeout = write if endpoint == 'write' else read
+        TIMEOUTS[endpoint] = (connect or default_connect, response_timeout or default_read)
+
+
+class RunControl:
+    """
+    Cancellation flag and deadline shared by every thread of the run.
+    """
+    
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reason: Optional[str] = None
+        self.deadline: Optional[float] = None
+        self.deadline_seconds: Optional[float] = None
+    
+    def set_deadline(self, seconds: Optional[float]) -> None:
+        # Run deadline, counted from now
+        self.deadline_seconds = seconds
+        self.deadline = time.monotonic() + seconds if seconds else None
+    
+    def cancel(self, reason: str) -> None:
+        with self._lock:
+            if self.reason is None:
+                self.reason = reason
+            self._event.set()
+    
+    def reset(self) -> None:
+        with self._lock:
+            self.reason = None
+            self._event.clear()
+        self.set_deadline(None)
+    
+    def stopped(self) -> Optional[str]:
+        """
+        Why the run should stop starting new work, None while it may continue.
+        """
+        if self.deadline is not None and not self._event.is_set() and time.monotonic() >= self.deadline:
+            self.cancel(f"run deadline of {self.deadline_seconds:g}s exceeded")
+        return self.reason if self._event.is_set() else None
+    
+    def wait(self, seconds: float) -> bool:
+        # Sleep up to `seconds`, waking early on cancellation or the run deadline
+        if self.deadline is not None:
+            seconds = min(seconds, max(0.0, self.deadline - time.monotonic()))
+        self._event.wait(seconds)
+        return self.stopped() is not None
+    
+    @contextmanager
+    def template_deadline(self, seconds: Optional[float]) -> Iterator[None]:
+        """
+        Cap the requests made by this thread inside the block at `seconds` in total.
+        """
+        if not seconds:
+            yield
+            return
+        previous = getattr(self._local, 'deadline', None)
+        self._local.deadline = time.monotonic() + seconds
+        self._local.seconds = seconds
+        try:
+            yield
+        finally:
+            self._local.deadline = previous
+    
+    def check(self) -> None:
+        # Raise Cancelled / DeadlineExceeded if new requests must not start
+        reason = self.stopped()
+        if reason is not None:
+            raise (DeadlineExceeded if 'deadline' in reason else Cancelled)(reason)
+        template_deadline = getattr(self._local, 'deadline', None)
+        if template_deadline is not None and time.monotonic() >= template_deadline:
+            raise DeadlineExceeded(f"template deadline of {self._local.seconds:g}s exceeded")
+    
+    def remaining(self) -> Optional[float]:
+        # Seconds until the nearest deadline of this thread, None without deadlines
+        deadlines = [d for d in (self.deadline, getattr(self._local, 'deadline', None)) if d is not None]
+        if not deadlines:
+            return None
+        return min(deadlines) - time.monotonic()
+    
+    def request_timeout(self, endpoint: str,
+                        timeout: Union[None, float, Tuple[float, float]] = None) -> Tuple[float, float]:
+        """
+        (connect, read) timeout for a request, capped by the remaining deadline
+        but never below MIN_TIMEOUT.
+        
+        Args:
+            endpoint: 'token', 'read' or 'write'
+            timeout: Timeout passed by the caller, overriding the endpoint default
+            
+        Raises:
+            Cancelled, DeadlineExceeded: The request must not be sent
+        """
+        if endpoint != 'token':
+            # Token requests are never refused: a stopping run may still need to authenticate
+            self.check()
+        if timeout is None:
+            connect, read = TIMEOUTS[endpoint]
+        elif isinstance(timeout, tuple):
+            connect, read = timeout
+        else:
+            connect = read = timeout
+        
+        remaining = self.remaining()
+        if remaining is not None:
+            remaining = max(MIN_TIMEOUT, remaining)
+            connect, read = min(connect, remaining), min(read, remaining)
+        return connect, read
+
+
+# Cancellation and deadlines of this process
+RUN = RunControl()
@@ -0,0 +1,92 @@
+"""
+Tests for request timeouts, deadlines and cancellation.
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+import requests
+from deadline.deadline import (DEFAULT_TIMEOUTS, MIN_TIMEOUT, TIMEOUTS, Cancelled, DeadlineExceeded,
+                               RunControl, set_timeouts)
+
+
+@pytest.fixture
+def run():
+    return RunControl()
+
+
+@pytest.fixture(autouse=True)
+def default_timeouts():
+    set_timeouts()
+    yield
+    set_timeouts()
+
+
+def test_endpoint_defaults_and_overrides(run):
+    assert run.request_timeout('read') == DEFAULT_TIMEOUTS['read']
+    assert run.request_timeout('write', 5) == (5, 5)
+    assert run.request_timeout('token', (2, 3)) == (2, 3)
+
+
+def test_set_timeouts():
+    """connect applies to every class, read to token and read requests, write to writes"""
+    set_timeouts(connect=4, read=20, write=90)
+    assert TIMEOUTS == {'token': (4, 20), 'read': (4, 20), 'write': (4, 90)}
+    set_timeouts(read=15)
+    assert TIMEOUTS['write'] == DEFAULT_TIMEOUTS['write']
+
+
+def test_capped_by_run_deadline(run):
+    run.set_deadline(5)
+    connect, read = run.request_timeout('write')
+    assert 4 < connect <= 5 and 4 < read <= 5
+    # Timeouts shorter than the remaining time are kept
+    assert run.request_timeout('write', (2, 3)) == (2, 3)
+
+
+def test_capped_by_template_deadline(run):
+    with run.template_deadline(3):
+        connect, read = run.request_timeout('read')
+        assert 2 < connect <= 3 and 2 < read <= 3
+    assert run.request_timeout('read') == DEFAULT_TIMEOUTS['read']
+
+
+def test_after_run_deadline(run):
+    """Reads and writes are refused; token requests still get a valid timeout"""
+    run.set_deadline(0.01)
+    time.sleep(0.02)
+    with pytest.raises(DeadlineExceeded):
+        run.request_timeout('read')
+    with pytest.raises(requests.exceptions.RequestException):
+        run.request_timeout('write')
+    assert run.request_timeout('token') == (MIN_TIMEOUT, MIN_TIMEOUT)
+    assert "deadline" in run.stopped()
+
+
+def test_after_template_deadline(run):
+    with run.template_deadline(0.01):
+        time.sleep(0.02)
+        with pytest.raises(DeadlineExceeded):
+            run.request_timeout('read')
+        assert run.request_timeout('token') == (MIN_TIMEOUT, MIN_TIMEOUT)
+    assert run.stopped() is None
+
+
+def test_near_deadline_keeps_a_minimum_timeout(run):
+    run.set_deadline(MIN_TIMEOUT / 10)
+    assert run.request_timeout('read') == (MIN_TIMEOUT, MIN_TIMEOUT)
+    # Shorter timeouts set by the caller are kept
+    assert run.request_timeout('read', 0.1) == (0.1, 0.1)
+
+
+def test_cancel(run):
+    run.cancel("interrupted")
+    run.cancel("second reason")
+    with pytest.raises(Cancelled):
+        run.request_timeout('read')
+    assert run.stopped() == "interrupted"
+    run.reset()
+    assert run.stopped() is None
@@ -5,9 +5,11 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 import requests
 import urllib3
-from typing import Dict, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from urllib.parse import quote
 from auth.auth import OpsRampAuth
+from codec.codec import read_json
+from limiter.limiter import map_as_completed
 
 # Disable SSL warnings (temporary for development)
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -46,12 +48,31 @@ class GlobalTemplateInfo:
 
 class GlobalTemplateManager:
     
+    # Page size used when listing the whole global template catalog
+    PAGE_SIZE = 500
+    
+    # Batch lookups of more names than this use the bulk listing
+    BULK_THRESHOLD = 20
+    
     def __init__(self, auth: OpsRampAuth, tenant_id: str):
         
         self.auth = auth
         self.tenant_id = tenant_id
         self.base_url = auth.base_url
     
+    @staticmethod
+    def _parse_template(item: Dict) -> GlobalTemplateInfo:
+        return GlobalTemplateInfo(
+            template_id=item.get('id', ''),
+            name=item.get('name', ''),
+            description=item.get('description', ''),
+            app_name=item.get('appName', ''),
+            native_type=item.get('nativeType', ''),
+            version=str(item.get('version', '')),
+            scope=item.get('scope', 'GLOBAL'),
+            raw_response=item
+        )
+    
     def get_global_template_by_name(self, template_name: str) -> Optional[GlobalTemplateInfo]:
         # API: GET https://{base_url}/api/v2/tenants/{tenantId}/templates?queryString=scope:GLOBAL+name:{template_name}&includeGatewaySDK=true
 
@@ -69,31 +90,20 @@ class GlobalTemplateManager:
         headers = self.auth.get_auth_header()
         
         try:
-            response = requests.get(url, headers=headers, params=params, verify=False)
+            response = self.auth.session.get(url, headers=headers, params=params, verify=False)
             
             if response.status_code == 200:
-                data = response.json()
-                results = data.get('results', [])
+                data = read_json(response)
+                # name: is a substring match; keep the first exact (case-insensitive) one
+                folded = template_name.casefold()
+                match = next((item for item in data.get('results', [])
+                              if item.get('name', '').casefold() == folded), None)
                 
-                if not results:
+                if match is None:
                     print(f"  ⚠ No global template found with name: {template_name}")
                     return None
                 
-                # Get the first matching result
-                item = results[0]
-                
-                template_info = GlobalTemplateInfo(
-                    template_id=item.get('id', ''),
-                    name=item.get('name', ''),
-                    description=item.get('description', ''),
-                    app_name=item.get('appName', ''),
-                    native_type=item.get('nativeType', ''),
-                    version=str(item.get('version', '')),
-                    scope=item.get('scope', 'GLOBAL'),
-                    raw_response=item
-                )
-                
-                return template_info
+                return self._parse_template(match)
             else:
                 print(f"  ✗ API Error [{response.status_code}]: {response.text}")
                 return None
@@ -102,6 +112,88 @@ class GlobalTemplateManager:
             print(f"  ✗ Request failed: {str(e)}")
             return None
     
+    def iter_global_templates(self) -> Iterator[GlobalTemplateInfo]:
+        # API: GET https://{base_url}/api/v2/tenants/{tenantId}/templates?queryString=scope:GLOBAL&pageNo={n}&pageSize={size}
+        # Pages through the whole catalog; raises requests.exceptions.RequestException on failure
+        
+        url = f"{self.base_url}/api/v2/tenants/{self.tenant_id}/templates"
+        page_no = 1
+        
+        while True:
+            params = {
+                'queryString': 'scope:GLOBAL',
+                'includeGatewaySDK': 'true',
+                'pageNo': page_no,
+                'pageSize': self.PAGE_SIZE
+            }
+            
+            response = self.auth.session.get(url, headers=self.auth.get_auth_header(),
+                                             params=params, verify=False)
+            response.raise_for_status()
+            
+            data = read_json(response)
+            results = data.get('results', [])
+            for item in results:
+                yield self._parse_template(item)
+            
+            if not data.get('nextPage') or not results:
+                break
+            page_no += 1
+    
+    def list_global_templates(self) -> Optional[List[GlobalTemplateInfo]]:
+        
+        try:
+            return list(self.iter_global_templates())
+        except requests.exceptions.RequestException as e:
+            print(f"  ✗ Failed to list global templates: {str(e)}")
+            return None
+    
+    def get_global_templates_by_names(self, template_names: Iterable[str],
+                                      max_workers: Optional[int] = None
+                                      ) -> Iterator[Tuple[str, Optional[GlobalTemplateInfo]]]:
+        """
+        Look up many global templates by name.
+        
+        Up to BULK_THRESHOLD names are looked up concurrently one by one; more
+        names are matched while paging through the bulk listing, which costs
+        one request per PAGE_SIZE templates instead of one per name. Both ways
+        match names exactly but case-insensitively and return the first
+        template listed with that name.
+        
+        Args:
+            template_names: Template names (duplicates are looked up once)
+            max_workers: Concurrent lookups (default: the POD's read limit)
+            
+        Returns:
+            Iterator of (name, GlobalTemplateInfo or None) in completion order
+        """
+        names = list(dict.fromkeys(template_names))
+        max_workers = max_workers or self.auth.limits.read.max_limit
+        
+        if len(names) > self.BULK_THRESHOLD:
+            # Folded name -> requested names, answered by the first template listed with it
+            pending: Dict[str, List[str]] = {}
+            for name in names:
+                pending.setdefault(name.casefold(), []).append(name)
+            
+            try:
+                for template in self.iter_global_templates():
+                    for name in pending.pop(template.name.casefold(), ()):
+                        yield name, template
+                    if not pending:
+                        return
+            except requests.exceptions.RequestException as e:
+                print(f"  ✗ Bulk listing failed, looking up names one by one: {str(e)}")
+                names = [name for requested in pending.values() for name in requested]
+            else:
+                # The listing is complete: names left over do not exist
+                for requested in pending.values():
+                    for name in requested:
+                        yield name, None
+                return
+        
+        yield from map_as_completed(self.get_global_template_by_name, names, max_workers)
+    
     def get_global_template_id(self, template_name: str) -> Optional[str]:
        
         template_info = self.get_global_template_by_name(template_name)
@@ -0,0 +1,57 @@
+"""
+Tests for global template lookups by name.
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+from global_template.global_template import GlobalTemplateManager
+
+# Names looked up in every test, and the template each one should find
+EXPECTED = {
+    "Linux": "g-Linux",
+    "LINUX": "g-Linux",
+    "Lin": None,
+    "Windows Server": "g-Windows Server",
+    "Missing": None,
+}
+
+
+@pytest.fixture
+def pod(fake_network):
+    pod = fake_network.add_pod("pod1")
+    # Listed before "Linux", so a substring match would find it first
+    pod.add_global("Linux Agent")
+    pod.add_global("Linux")
+    pod.add_global("Windows Server")
+    return pod
+
+
+@pytest.fixture
+def manager(fake_network, pod):
+    return GlobalTemplateManager(fake_network.auth("pod1"), "client")
+
+
+def test_lookup_by_name_is_exact(manager):
+    """The server's name: query matches substrings; only exact names are kept"""
+    assert manager.get_global_template_id("Linux") == "g-Linux"
+    assert manager.get_global_template_id("linux") == "g-Linux"
+    assert manager.get_global_template_by_name("Agent") is None
+
+
+@pytest.mark.parametrize('padding', [0, GlobalTemplateManager.BULK_THRESHOLD])
+def test_batch_lookup_matches_alike_on_both_paths(manager, pod, padding):
+    """Small batches query each name, large ones page the listing; the answers are the same"""
+    names = list(EXPECTED) + [f"Unknown {i}" for i in range(padding)]
+    results = dict(manager.get_global_templates_by_names(names + ["Linux"], max_workers=2))
+
+    assert set(results) == set(names)
+    assert {name: (template.template_id if template else None)
+            for name, template in results.items() if name in EXPECTED} == EXPECTED
+    assert all(results[name] is None for name in names[len(EXPECTED):])
+
+    bulk = len(names) > GlobalTemplateManager.BULK_THRESHOLD
+    assert pod.calls[('GET', 'name')] == (0 if bulk else len(names))
+    assert pod.calls[('GET', 'global page')] == (1 if bulk else 0)
@@ -0,0 +1 @@
+# Limiter module
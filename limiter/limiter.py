@@ -0,0 +1,284 @@
+"""
+Limiter Module
+Adaptive (AIMD) concurrency limits for requests to each POD.
+
+Every OpsRampAuth session routes its requests through two limiters, one for
+reads (GET/HEAD) and one for writes (POST/PUT/DELETE, e.g. clone POSTs),
+because their costs differ greatly. A limiter starts at --concurrency and,
+after every window of completed requests, compares the window's p95 latency
+with a baseline p95:
+
+    - healthy (p95 within LATENCY_TOLERANCE x baseline, few 5xx/429/errors):
+      the limit grows by one (additive increase)
+    - otherwise: the limit is halved (multiplicative decrease)
+
+The baseline is a moving average of the windows' p95 (BASELINE_WEIGHT), so
+one unusually fast window does not set a bar later windows can never meet.
+The limit stays between 1 and the maximum, --max-concurrency. Without it the
+maximum is --concurrency, so the limits only back off and recover; with it
+they can grow past the starting value. Token requests, and connection
+warm-up requests (limited=False), bypass the limiters. Current limits are
+listed in the run summary.
+
+Requests also get their endpoint class's timeouts, capped by the run and
+template deadlines (see deadline.py).
+"""
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import requests
+
+from deadline.deadline import RUN
+
+# A window is unhealthy when its p95 exceeds the baseline p95 by this factor
+LATENCY_TOLERANCE = 2.0
+
+# Weight of each window's p95 in the baseline's exponential moving average
+BASELINE_WEIGHT = 0.2
+
+# ... or when more than this share of its requests were 5xx, 429 or connection errors
+ERROR_RATE_THRESHOLD = 0.05
+
+# Completed requests per adjustment
+WINDOW_SIZE = 20
+
+# Statuses that indicate an overloaded POD
+OVERLOAD_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+TOKEN_PATH = '/tenancy/auth/oauth/token'
+
+# Upper bound used until set_max_concurrency is called (main.py sets it from
+# --max-concurrency, or --concurrency without it)
+DEFAULT_MAX_CONCURRENCY = 8
+
+_default_max_limit = DEFAULT_MAX_CONCURRENCY
+_default_initial_limit: Optional[int] = None
+
+
+def set_max_concurrency(max_limit: int, initial: Optional[int] = None) -> None:
+    # Upper bound and starting limit (default: the bound) for limiters of sessions created after this call
+    global _default_max_limit, _default_initial_limit
+    _default_max_limit = max(1, max_limit)
+    _default_initial_limit = initial
+
+
+def get_max_concurrency() -> int:
+    return _default_max_limit
+
+
+def get_initial_concurrency() -> Optional[int]:
+    return _default_initial_limit
+
+
+class AIMDLimiter:
+    """
+    Concurrency limit adjusted from observed latency and error rate.
+    """
+    
+    def __init__(self, name: str, max_limit: int, initial: Optional[int] = None,
+                 window_size: int = WINDOW_SIZE):
+        """
+        Initialize AIMDLimiter.
+        
+        Args:
+            name: Label used in metrics, e.g. "POD-1 reads"
+            max_limit: Upper bound for the limit
+            initial: Starting limit (default: max_limit)
+            window_size: Completed requests per adjustment
+        """
+        self.name = name
+        self.max_limit = max(1, max_limit)
+        self.limit = min(self.max_limit, initial or self.max_limit)
+        self.window_size = window_size
+        
+        self.in_flight = 0
+        self.completed = 0
+        self.errors = 0
+        self.increases = 0
+        self.decreases = 0
+        self.peak_limit = self.limit
+        self.baseline_p95: Optional[float] = None
+        self.last_p95: Optional[float] = None
+        
+        self._condition = threading.Condition()
+        self._latencies: List[float] = []
+        self._window_errors = 0
+    
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        # Wait for a slot; False if none freed up within `timeout` seconds
+        with self._condition:
+            if not self._condition.wait_for(lambda: self.in_flight < self.limit, timeout):
+                return False
+            self.in_flight += 1
+            return True
+    
+    def abandon(self) -> None:
+        # Give back a slot whose request was never sent
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+    
+    def release(self, latency: float, error: bool) -> None:
+        with self._condition:
+            self.in_flight -= 1
+            self.completed += 1
+            self._latencies.append(latency)
+            if error:
+                self.errors += 1
+                self._window_errors += 1
+            if len(self._latencies) >= self.window_size:
+                self._adjust()
+            self._condition.notify_all()
+    
+    def _adjust(self) -> None:
+        latencies = sorted(self._latencies)
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        error_rate = self._window_errors / len(latencies)
+        self._latencies = []
+        self._window_errors = 0
+        
+        self.last_p95 = p95
+        baseline = p95 if self.baseline_p95 is None else self.baseline_p95
+        # Compared before this window is averaged in; slower windows raise the baseline gradually
+        self.baseline_p95 = baseline + BASELINE_WEIGHT * (p95 - baseline)
+        
+        if error_rate > ERROR_RATE_THRESHOLD or p95 > baseline * LATENCY_TOLERANCE:
+            new_limit = max(1, self.limit // 2)
+            if new_limit < self.limit:
+                self.decreases += 1
+        else:
+            new_limit = min(self.max_limit, self.limit + 1)
+            if new_limit > self.limit:
+                self.increases += 1
+        
+        self.limit = new_limit
+        self.peak_limit = max(self.peak_limit, new_limit)
+    
+    def to_dict(self) -> Dict:
+        with self._condition:
+            return {
+                'name': self.name,
+                'limit': self.limit,
+                'max_limit': self.max_limit,
+                'peak_limit': self.peak_limit,
+                'completed': self.completed,
+                'errors': self.errors,
+                'increases': self.increases,
+                'decreases': self.decreases,
+                'last_p95_seconds': self.last_p95,
+                'baseline_p95_seconds': self.baseline_p95
+            }
+
+
+class PodLimits:
+    """
+    Read and write limiters for one POD.
+    """
+    
+    def __init__(self, label: str, max_limit: Optional[int] = None, initial: Optional[int] = None):
+        if max_limit is None:
+            max_limit = get_max_concurrency()
+            initial = initial or get_initial_concurrency()
+        self.label = label
+        self.read = AIMDLimiter(f"{label} reads", max_limit, initial)
+        self.write = AIMDLimiter(f"{label} writes", max_limit, initial)
+        LIMITERS.extend([self.read, self.write])
+    
+    @staticmethod
+    def endpoint_class(method: str, url: str) -> str:
+        if TOKEN_PATH in url:
+            return 'token'
+        return 'read' if method.upper() in ('GET', 'HEAD') else 'write'
+    
+    def for_request(self, method: str, url: str) -> Optional[AIMDLimiter]:
+        endpoint = self.endpoint_class(method, url)
+        if endpoint == 'token':
+            return None
+        return self.read if endpoint == 'read' else self.write
+
+
+class LimitedSession(requests.Session):
+    """
+    requests.Session whose requests wait for a slot of the POD's limiters
+    and are sent with their endpoint class's timeouts.
+    """
+    
+    # Seconds between cancellation checks while waiting for a limiter slot
+    ACQUIRE_POLL = 0.5
+    
+    def __init__(self, limits: PodLimits):
+        super().__init__()
+        self.limits = limits
+    
+    def request(self, method, url, *args, limited: bool = True, **kwargs):
+        # limited=False sends the request without waiting for a limiter slot
+        endpoint = self.limits.endpoint_class(method, url)
+        kwargs['timeout'] = RUN.request_timeout(endpoint, kwargs.get('timeout'))
+        limiter = self.limits.for_request(method, url) if limited else None
+        if limiter is None:
+            return super().request(method, url, *args, **kwargs)
+        
+        while not limiter.acquire(self.ACQUIRE_POLL):
+            RUN.check()
+        try:
+            # Time spent queueing counts against the deadlines
+            kwargs['timeout'] = RUN.request_timeout(endpoint, kwargs['timeout'])
+        except requests.exceptions.RequestException:
+            limiter.abandon()
+            raise
+        
+        start = time.perf_counter()
+        error = True
+        try:
+            response = super().request(method, url, *args, **kwargs)
+            error = response.status_code in OVERLOAD_STATUSES
+            return response
+        finally:
+            limiter.release(time.perf_counter() - start, error)
+
+
+def map_as_completed(func: Callable[[Any], Any], items: Iterable[Any],
+                     max_workers: int) -> Iterator[Tuple[Any, Any]]:
+    """
+    Call func(item) on up to max_workers threads, yielding (item, result) as calls complete.
+    
+    Items are pulled lazily, at most 2 x max_workers ahead of the running calls, so
+    large or streamed inputs are not read up front. Once the run is cancelled or past
+    its deadline no further items are submitted. Exceptions raised by func propagate.
+    """
+    max_workers = max(1, max_workers)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {}
+        for item in items:
+            if RUN.stopped():
+                break
+            if len(pending) >= max_workers * 2:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield pending.pop(future), future.result()
+            pending[executor.submit(func, item)] = item
+        
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield pending.pop(future), future.result()
+
+
+# Every limiter created in this process, for the run summary
+LIMITERS: List[AIMDLimiter] = []
+
+
+def limiter_report_lines() -> List[str]:
+    lines = []
+    for limiter in LIMITERS:
+        values = limiter.to_dict()
+        if not values['completed']:
+            continue
+        p95 = f"{values['last_p95_seconds'] * 1000:.0f}ms" if values['last_p95_seconds'] is not None else "n/a"
+        lines.append(f"{values['name']}: limit {values['limit']}/{values['max_limit']} "
+                     f"(peak {values['peak_limit']}), {values['completed']} requests, "
+                     f"{values['errors']} overload errors, +{values['increases']}/-{values['decreases']} "
+                     f"adjustments, last p95 {p95}")
+    return lines
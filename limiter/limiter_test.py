@@ -0,0 +1,154 @@
+"""
+Tests for the adaptive concurrency limiters.
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+from limiter.limiter import (DEFAULT_MAX_CONCURRENCY, AIMDLimiter, LimitedSession, PodLimits, map_as_completed,
+                             set_max_concurrency)
+
+
+def run_window(limiter, latency, errors=0):
+    # Complete one window of requests with the given latency
+    for index in range(limiter.window_size):
+        assert limiter.acquire(0)
+        limiter.release(latency, index < errors)
+
+
+def test_starts_at_max_limit():
+    """--concurrency N allows N requests in flight from the start"""
+    limiter = AIMDLimiter("test", 8)
+    assert limiter.limit == 8
+    assert all(limiter.acquire(0) for _ in range(8))
+    assert not limiter.acquire(0)
+    assert AIMDLimiter("test", 8, initial=3).limit == 3
+    assert AIMDLimiter("test", 0).limit == 1
+
+
+def test_slow_window_halves_and_healthy_windows_grow_back():
+    limiter = AIMDLimiter("test", 8, window_size=10)
+    run_window(limiter, 0.1)
+    assert limiter.limit == 8
+
+    run_window(limiter, 1.0)
+    assert limiter.limit == 4 and limiter.decreases == 1
+
+    # The slow window raised the baseline, so moderately slower windows count as healthy
+    run_window(limiter, 0.2)
+    run_window(limiter, 0.2)
+    assert limiter.limit == 6 and limiter.increases == 2
+
+
+def test_errors_halve_the_limit():
+    limiter = AIMDLimiter("test", 8, window_size=10)
+    run_window(limiter, 0.1, errors=2)
+    assert limiter.limit == 4
+    run_window(limiter, 0.1, errors=1)
+    run_window(limiter, 0.1, errors=1)
+    assert limiter.limit == 1
+
+
+def test_one_fast_window_does_not_set_a_permanent_baseline():
+    """After a fast outlier, steady normal latency lets the limit recover"""
+    limiter = AIMDLimiter("test", 8, window_size=10)
+    run_window(limiter, 0.01)
+    for _ in range(10):
+        run_window(limiter, 0.1)
+    assert limiter.limit == 8
+    assert 0.05 < limiter.baseline_p95 <= 0.1
+
+
+def test_limit_stays_within_bounds():
+    limiter = AIMDLimiter("test", 2, window_size=5)
+    for _ in range(5):
+        run_window(limiter, 0.1)
+    assert limiter.limit == 2
+    for latency in (1.0, 10.0, 100.0):
+        run_window(limiter, latency)
+    assert limiter.limit == 1
+    assert limiter.to_dict()['peak_limit'] == 2
+
+
+@pytest.fixture
+def max_concurrency():
+    yield set_max_concurrency
+    set_max_concurrency(DEFAULT_MAX_CONCURRENCY)
+
+
+def test_limits_only_back_off_without_a_higher_maximum(max_concurrency):
+    """With the maximum at --concurrency, healthy windows never raise the limit above it"""
+    max_concurrency(4)
+    limits = PodLimits("POD-test")
+    limiter = limits.read
+    limiter.window_size = 5
+    assert limiter.limit == limiter.max_limit == limits.write.limit == 4
+
+    for _ in range(5):
+        run_window(limiter, 0.1)
+    assert limiter.limit == 4 and limiter.increases == 0
+    run_window(limiter, 1.0)
+    assert limiter.limit == 2
+    for _ in range(5):
+        run_window(limiter, 0.3)
+    assert limiter.limit == 4 and limiter.peak_limit == 4
+
+
+def test_limits_grow_towards_max_concurrency(max_concurrency):
+    """Limits start at --concurrency and grow up to --max-concurrency"""
+    max_concurrency(6, initial=2)
+    limits = PodLimits("POD-test")
+    limiter = limits.write
+    limiter.window_size = 5
+    assert (limiter.limit, limiter.max_limit) == (2, 6)
+    assert limits.read.limit == 2
+
+    for _ in range(10):
+        run_window(limiter, 0.1)
+    assert limiter.limit == 6 and limiter.increases == 4
+    # Explicit limits ignore the run's starting value
+    assert PodLimits("POD-other", 3).read.limit == 3
+
+
+def test_pod_limits_route_by_endpoint():
+    limits = PodLimits("POD-test", 4)
+    assert limits.for_request('GET', "https://pod/api/v2/templates") is limits.read
+    assert limits.for_request('HEAD', "https://pod") is limits.read
+    assert limits.for_request('POST', "https://pod/api/v2/templates/clone") is limits.write
+    assert limits.for_request('POST', "https://pod/tenancy/auth/oauth/token") is None
+
+
+class OkAdapter(BaseAdapter):
+    # Answers every request with an empty 200
+
+    def send(self, request, **kwargs):
+        response = requests.Response()
+        response.status_code = 200
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+def test_unlimited_requests_skip_the_limiter():
+    """Warm-up requests (limited=False) do not wait for a read slot"""
+    limits = PodLimits("POD-test", 1)
+    session = LimitedSession(limits)
+    session.mount('https://', OkAdapter())
+
+    assert session.head("https://pod").status_code == 200
+    assert limits.read.completed == 1
+
+    assert limits.read.acquire(0)
+    assert session.head("https://pod", limited=False).status_code == 200
+    assert limits.read.completed == 1 and limits.read.in_flight == 1
+
+
+def test_map_as_completed():
+    results = dict(map_as_completed(lambda item: item * 2, range(20), 3))
+    assert results == {item: item * 2 for item in range(20)}
@@ -15,25 +15,499 @@ POD-2 (Destination):
     2. Get global template ID by same name
     3. Clone template using payload from POD-1
        (replace 'id' with 'clonedTemplateId', use POD-2's global template ID)
+
+Commands:
+=========
+    python main.py [run]                         Extract from POD-1 and clone to POD-2
+    python main.py extract --snapshot s.db       Extract POD-1 templates into a snapshot file only
+    python main.py apply --snapshot s.db         Clone from a snapshot without touching POD-1
+                   [--target-pod 3]              (optionally into another destination POD)
+    python main.py sync --interval 300           Keep destination clones in step with POD-1
+    python main.py plan [--snapshot s.db]        Dry run: decide clone/skip/missing per template and
+                                                 estimate the API calls and bytes, without cloning
+    python main.py cleanup [--discover]          List clones created by earlier runs on destination PODs
+                   [--include-sync] [--confirm]  (also those made by sync, and delete them)
+
+Sharding:
+=========
+    python main.py --shard 2/4      Process only the 2nd of 4 hash partitions
+    python main.py --workers 4      Launch 4 local shard workers and merge results
+
+Record / Replay:
+================
+    python main.py --record run.cassette     Record every HTTP exchange (secrets redacted)
+    python main.py --replay run.cassette     Rerun offline against the recorded responses
+                   [--replay-latency]        (optionally with the recorded response times)
+
+Deadlines:
+==========
+    python main.py --deadline 3600 --template-deadline 120
+                                    Stop starting new work after an hour and give each template
+                                    two minutes; the first Ctrl-C also stops cleanly and the
+                                    partial results are summarised (a second Ctrl-C aborts)
+
+Priorities:
+===========
+    python main.py --input templates.csv --priority "app:hpe-alletra=10" --pod-slots 4
+                                    Extract and clone urgent templates first (CSV/JSONL rows may
+                                    also set a priority column); each POD runs up to 4 templates
+                                    at once, shared fairly between tenant pairs
+
+Profiling:
+==========
+    python main.py --profile        Write output/profile_report.txt (CPU, allocations per
+                                    stage, time blocked on network / JSON / file I/O)
+
+Template Input:
+===============
+    python main.py --input templates.csv      CSV/JSONL rows may set new_name, target_pod and priority
+    some_command | python main.py --input -   Stream template names from stdin
+
+Input lines may also be selectors resolved against an index of POD-1's
+global templates, e.g. "app:hpe-alletra & type:Battery" or "glob:hpe-alletra*".
 """
 import sys
 import json
+import sqlite3
+import signal
+import argparse
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from pathlib import Path
 
 # Ensure imports work correctly
 sys.path.insert(0, str(Path(__file__).parent))
 
 from auth.auth import OpsRampAuth
-from auth.config import load_env_file, get_pod_config, get_tenant_ids
-from config.settings import load_template_names
-from global_template.global_template import GlobalTemplateManager
+from auth.config import load_env_file, get_pod_config, get_tenant_ids, get_configured_pods
+from config.settings import DEFAULT_TARGET_POD, INPUT_FORMATS, load_tenant_pairs, iter_template_selections, dedupe_selections
+from global_template.global_template import GlobalTemplateInfo, GlobalTemplateManager
 from cloned_template.cloned_template import ClonedTemplateManager
 from template_customizations.template_customizations import TemplateCustomizationsManager
 from clone_template.clone_template import CloneTemplateManager
+from catalog.catalog import LazyCatalog, TemplateCatalog, expand_selections, is_selector
+from codec.codec import TRANSFER_STATS
+from limiter.limiter import LIMITERS, limiter_report_lines, map_as_completed, set_max_concurrency
+from artifacts.artifacts import (ArtifactStore, RunArtifacts, new_run_id,
+                                 POD1_CUSTOMIZATIONS, POD2_CLONE_RESPONSE)
+from snapshot.snapshot import DEFAULT_SNAPSHOT_PATH, PayloadCompressor, Snapshot
+from state.state import DEFAULT_STATE_PATH, RunStateStore, shard_state_path
+from verify.verify import TemplateVerifier
+from profiling.profiling import DEFAULT_REPORT_PATH, RunProfiler
+from transport.transport import RecordTransport, ReplayTransport, install_transport
+from sync.sync import DEFAULT_INDEX_PATH, SyncDaemon, SyncIndex
+from plan.plan import ACTIONS, DEFAULT_PLAN_PATH, MigrationPlanner
+from cleanup.cleanup import DELETE_WORKERS, TemplateCleaner, prune_journal, read_journal
+from deadline.deadline import RUN, set_timeouts
+from scheduler.scheduler import SCHEDULER, PriorityRules, parse_priority_rule, prioritized
+from shard.shard import ShardCoordinator, parse_shard_spec, select_shard, order_results
+
+def default_clone_name(template_name):
+    """Name given to a cloned template when the input row does not set one."""
+    return f"MSE Template Test - {template_name}"
+
+
+def parse_args(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="OpsRamp Template Cloning Tool - POD1 to POD2")
+    parser.add_argument('command', nargs='?', default='run', choices=('run', 'extract', 'apply', 'sync', 'plan', 'cleanup'),
+                        help="run: POD-1 to POD-2 (default), extract: POD-1 to snapshot, "
+                             "apply: snapshot to destination POD, sync: poll POD-1 and push changes, "
+                             "plan: dry run with call and byte estimate, "
+                             "cleanup: delete clones created by earlier runs")
+    parser.add_argument('--snapshot', metavar='PATH',
+                        help=f"Snapshot file written by extract and read by apply "
+                             f"(default: output/{DEFAULT_SNAPSHOT_PATH.name})")
+    parser.add_argument('--state', metavar='PATH',
+                        help=f"Run state file holding results and payloads on disk "
+                             f"(default: output/{DEFAULT_STATE_PATH.name})")
+    parser.add_argument('--target-pod', type=int, metavar='N',
+                        help="Clone every template to POD N, overriding per-row target PODs")
+    parser.add_argument('--shard', metavar='I/N',
+                        help="Process only shard I of N (stable hash partition of template names)")
+    parser.add_argument('--workers', type=int, default=0, metavar='N',
+                        help="Launch N local shard worker processes and merge their results")
+    parser.add_argument('--results-file', metavar='PATH',
+                        help="Write per-template results to a JSON file")
+    parser.add_argument('--input', metavar='PATH',
+                        help="Template input file (text, CSV or JSONL), '-' for stdin "
+                             "(default: config/template_names.txt)")
+    parser.add_argument('--input-format', choices=INPUT_FORMATS,
+                        help="Input format, detected from the file extension by default")
+    parser.add_argument('--verify', action='store_true',
+                        help="Read back every cloned template and compare it with the payload sent")
+    parser.add_argument('--verify-workers', type=int, default=4, metavar='N',
+                        help="Maximum concurrent verification reads (default: 4)")
+    parser.add_argument('--catalog', action='store_true',
+                        help="Index all POD-1 global templates up front and resolve every name from it")
+    parser.add_argument('--run-id', default=new_run_id(), metavar='ID',
+                        help="Run ID under which artefacts are recorded in the manifest (default: start time)")
+    parser.add_argument('--tenants', metavar='PATH',
+                        help="CSV/JSONL of source_tenant,target_tenant[,target_pod] pairs to process in one run")
+    parser.add_argument('--tenant-concurrency', type=int, default=4, metavar='N',
+                        help="With --tenants, process up to N tenant pairs at once (default: 4)")
+    parser.add_argument('--concurrency', type=int, default=1, metavar='N',
+                        help="Process up to N templates at once; per-POD read and write limits start at N "
+                             "and adapt from observed latency and errors (default: 1)")
+    parser.add_argument('--max-concurrency', type=int, metavar='N',
+                        help="Let the per-POD limits grow above --concurrency up to N; N templates are run "
+                             "at once, paced by the limits (default: --concurrency, limits only back off)")
+    parser.add_argument('--pod-slots', type=int, metavar='N',
+                        help="Run up to N templates at once per POD, shared fairly between tenant pairs "
+                             "(default: --max-concurrency or --concurrency)")
+    parser.add_argument('--priority', action='append', default=[], metavar='NAME_OR_SELECTOR=N',
+                        help="Give matching templates priority N (higher first, default 0); repeatable, "
+                             "selectors are resolved against the POD-1 catalog")
+    parser.add_argument('--warm-connections', type=int, default=0, metavar='N',
+                        help="Pre-open N pooled connections to each POD at startup (default: 0)")
+    parser.add_argument('--profile', action='store_true',
+                        help="Profile CPU, allocations and blocking time (network, JSON, file I/O)")
+    parser.add_argument('--profile-report', metavar='PATH',
+                        help=f"Profile report location (default: output/{DEFAULT_REPORT_PATH.name})")
+    parser.add_argument('--record', metavar='CASSETTE',
+                        help="Record every HTTP exchange (secrets redacted) into a cassette file")
+    parser.add_argument('--replay', metavar='CASSETTE',
+                        help="Serve HTTP exchanges from a recorded cassette instead of the network")
+    parser.add_argument('--replay-latency', action='store_true',
+                        help="With --replay, wait for each response as long as it took when recorded")
+    parser.add_argument('--interval', type=float, default=300, metavar='SECONDS',
+                        help="sync: seconds between polling cycles (default: 300)")
+    parser.add_argument('--cycles', type=int, metavar='N',
+                        help="sync: stop after N cycles (default: run until Ctrl-C)")
+    parser.add_argument('--deadline', type=float, metavar='SECONDS',
+                        help="Stop starting new requests after SECONDS and summarise partial results")
+    parser.add_argument('--template-deadline', type=float, metavar='SECONDS',
+                        help="Give up on a template whose steps take longer than SECONDS")
+    parser.add_argument('--connect-timeout', type=float, metavar='SECONDS',
+                        help="Connect timeout for every request (default: 10)")
+    parser.add_argument('--read-timeout', type=float, metavar='SECONDS',
+                        help="Response timeout for token and read requests (default: 30 and 60)")
+    parser.add_argument('--write-timeout', type=float, metavar='SECONDS',
+                        help="Response timeout for clone and update requests (default: 180)")
+    parser.add_argument('--skip-existing', action='store_true',
+                        help="Skip templates whose new name already exists on the destination")
+    parser.add_argument('--plan-file', metavar='PATH',
+                        help=f"plan: where to write the plan (default: output/{DEFAULT_PLAN_PATH.name})")
+    parser.add_argument('--confirm', action='store_true',
+                        help="cleanup: delete the listed templates (default: dry run)")
+    parser.add_argument('--discover', action='store_true',
+                        help="cleanup: also select cloned templates named with --name-prefix")
+    parser.add_argument('--name-prefix', default=default_clone_name(''), metavar='TEXT',
+                        help=f"cleanup: name prefix of clones for --discover (default: '{default_clone_name('')}')")
+    parser.add_argument('--delete-workers', type=int, default=DELETE_WORKERS, metavar='N',
+                        help=f"cleanup: delete up to N templates at once per tenant (default: {DELETE_WORKERS})")
+    parser.add_argument('--include-sync', action='store_true',
+                        help="cleanup: also select templates recorded in the sync index (--sync-index)")
+    parser.add_argument('--sync-index', metavar='PATH',
+                        help=f"sync: index of synced templates (default: output/{DEFAULT_INDEX_PATH.name})")
+    
+    if argv is None:
+        argv = sys.argv[1:]
+    args = parser.parse_args(argv)
+    args.argv = list(argv)
+    if args.record and args.replay:
+        parser.error("--record and --replay cannot be used together")
+    if args.tenants and (args.command != 'run' or args.shard or args.workers or args.snapshot):
+        parser.error("--tenants only works with the run command, without sharding or snapshots")
+    if args.command in ('sync', 'plan', 'cleanup') and (args.shard or args.workers):
+        parser.error(f"{args.command} cannot be sharded")
+    if args.shard and args.workers:
+        parser.error("--shard and --workers cannot be used together")
+    if args.max_concurrency is not None and args.max_concurrency < args.concurrency:
+        parser.error("--max-concurrency cannot be lower than --concurrency")
+    if args.shard:
+        try:
+            args.shard = parse_shard_spec(args.shard)
+        except ValueError as e:
+            parser.error(str(e))
+    try:
+        args.priorities = PriorityRules(parse_priority_rule(rule) for rule in args.priority)
+    except ValueError as e:
+        parser.error(str(e))
+    return args
+
+
+def print_summary(pod1_results, clone_results, state_path=None, verify_results=None, artifacts=None):
+    """Print the SUMMARY section for POD-1 and POD-2 results."""
+    print("\n" + "=" * 80)
+    print("SUMMARY")
+    print("=" * 80)
+    
+    print("\nPOD-1 Results:")
+    for name, data in pod1_results.items():
+        print(f"  • {name}")
+        print(f"    Global Template ID: {data['global_template_id']}")
+        print(f"    Cloned Template ID: {data['cloned_template_id']}")
+    
+    print("\nPOD-2 Clone Results:")
+    for name, data in clone_results.items():
+        if data.get('skipped'):
+            print(f"  • {name}: ✓ Skipped (already exists)")
+            print(f"    Existing Template ID: {data['existing_template_id']}")
+            continue
+        status = "✓ Success" if data.get('success') else "✗ Failed"
+        print(f"  • {name}: {status}")
+        if data.get('new_cloned_template_id'):
+            print(f"    New Template ID: {data['new_cloned_template_id']}")
+    
+    for index, (name, data) in enumerate(verify_results or {}):
+        if index == 0:
+            print("\nPOD-2 Verification Results:")
+        if data.get('verified'):
+            print(f"  • {name}: ✓ Verified")
+        elif data.get('error'):
+            print(f"  • {name}: ✗ {data['error']}")
+        else:
+            print(f"  • {name}: ✗ Mismatch in {', '.join(data.get('mismatched_fields', []))}")
+    
+    print_stop_reason()
+    
+    print("\nTransfer:")
+    for line in TRANSFER_STATS.report_lines(len(pod1_results)):
+        print(f"  • {line}")
+    
+    lines = limiter_report_lines()
+    if lines:
+        print("\nConcurrency:")
+        for line in lines:
+            print(f"  • {line}")
+    
+    lines = SCHEDULER.report_lines()
+    if lines:
+        print("\nScheduling:")
+        for line in lines:
+            print(f"  • {line}")
+    
+    if artifacts is not None:
+        print(f"\nArtifacts: {artifacts.store.root} (run {artifacts.run_id}): {artifacts.stored} stored, "
+              f"{artifacts.created} new blob(s), {artifacts.bytes_written} bytes written")
+    
+    if state_path:
+        print(f"\nRun state: {state_path}")
+    
+    print("\n" + "=" * 80)
+    print("Template cloning completed!")
+    print("=" * 80)
+
+
+def print_stop_reason():
+    """Note in the summary that the run was cancelled or hit its deadline."""
+    reason = RUN.stopped()
+    if reason:
+        print(f"\n✗ Stopped early: {reason}. The results above are partial.")
+
+
+def save_results(results_file, pod1_results, clone_results, verify_results=None):
+    """Write per-template results (without customization payloads) to a JSON file."""
+    results = {
+        'pod1_results': {
+            name: {
+                'global_template_id': data['global_template_id'],
+                'cloned_template_id': data['cloned_template_id']
+            }
+            for name, data in pod1_results.items()
+        },
+        'clone_results': dict(clone_results.items()),
+        'verify_results': dict(verify_results or {}),
+        'transfer_stats': TRANSFER_STATS.to_dict(),
+        'concurrency': [limiter.to_dict() for limiter in LIMITERS],
+        'scheduling': SCHEDULER.to_dict(),
+        'stopped': RUN.stopped()
+    }
+    
+    with open(results_file, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=4)
+
+
+def worker_argv(argv):
+    """Drop coordinator-only options (--workers, --results-file, --run-id) from a command line."""
+    result = []
+    skip_next = False
+    for arg in argv:
+        if skip_next:
+            skip_next = False
+            continue
+        option = arg.split('=', 1)[0]
+        if option in ('--workers', '--results-file', '--run-id'):
+            skip_next = '=' not in arg
+            continue
+        result.append(arg)
+    return result
+
+
+def run_coordinator(args):
+    """Run the template list as N local shard workers and print one merged summary."""
+    print("\n[Coordinator] Launching shard workers...")
+    
+    # Workers get the coordinator's own options, minus the ones it handles itself
+    # Workers record their artefacts under the coordinator's run ID
+    coordinator = ShardCoordinator(args.workers, Path(__file__).resolve(),
+                                   worker_argv(args.argv) + ['--run-id', args.run_id])
+    
+    try:
+        if args.command == 'apply':
+            # Workers read their shard of the snapshot; results follow snapshot order
+            with Snapshot(args.snapshot) as snapshot:
+                labels = [entry['label'] for entry in snapshot.iter_entries()]
+            merged = coordinator.run()
+        elif args.input == '-':
+            # stdin can only be read once: stream it to the workers and remember the order
+            labels = []
+            
+            def record_order(items):
+                for selection in items:
+                    labels.append(selection.label)
+                    yield selection
+            
+            merged = coordinator.run(record_order(iter_template_selections('-', args.input_format)))
+        else:
+            selections = iter_template_selections(args.input, args.input_format)
+            merged = coordinator.run()
+            labels = (selection.label for selection in selections)
+    except (FileNotFoundError, ValueError, sqlite3.Error) as e:
+        print(f"  ✗ Error: {str(e)}")
+        return
+    
+    try:
+        pod1_results = order_results(merged['pod1_results'], labels)
+    except ValueError:
+        # Unreadable input row; the workers reported it, keep shard order
+        pod1_results = merged['pod1_results']
+    clone_results = order_results(merged['clone_results'], pod1_results)
+    verify_results = order_results(merged['verify_results'], pod1_results)
+    TRANSFER_STATS.merge(merged['transfer_stats'])
+    
+    results_file = coordinator.output_dir / 'run_results.json'
+    save_results(results_file, pod1_results, clone_results, verify_results.items())
+    print(f"  ✓ Merged results saved to: {results_file}")
+    
+    if args.command != 'extract':
+        # Shard state files are merged into the run's state file
+        state_path = Path(args.state) if args.state else DEFAULT_STATE_PATH
+        with RunStateStore(state_path) as state:
+            state.reset()
+            for shard_index in range(1, args.workers + 1):
+                shard_path = shard_state_path(state_path, (shard_index, args.workers))
+                if shard_path.exists():
+                    state.merge_from(shard_path)
+                    shard_path.unlink()
+        print(f"  ✓ Merged run state saved to: {state_path}")
+    else:
+        state_path = Path(args.snapshot) if args.snapshot else DEFAULT_SNAPSHOT_PATH
+    
+    print_summary(pod1_results, clone_results, state_path, verify_results.items())
+
+
+def for_each(items, func, workers):
+    """
+    Call func(item) for every item on up to `workers` threads (in order on this thread for 1).
+    Stops taking items once the run is cancelled or past its deadline.
+    """
+    if workers <= 1:
+        for item in items:
+            if RUN.stopped():
+                return
+            func(item)
+        return
+    
+    for _ in map_as_completed(func, items, workers):
+        pass
+
+
+def authenticate_pod(pod_number):
+    """Authenticate with a POD, returning (auth, tenant_id)."""
+    pod_config = get_pod_config(pod_number)
+    tenant_ids = get_tenant_ids(pod_number)
+    tenant_id = tenant_ids.get('partner_id') or tenant_ids.get('client_id')
+    
+    if not tenant_id:
+        raise ValueError(f"POD{pod_number} tenant ID not found in .env file")
+    
+    auth = OpsRampAuth(**pod_config)
+    auth.get_token()
+    return auth, tenant_id
+
+
+def required_pods(args, tenant_pairs=None):
+    """
+    POD numbers a command talks to: POD-1 unless applying, plus its destination PODs.
+    
+    Returns:
+        (PODs the command cannot run without, PODs that input rows or journals may target)
+    """
+    from_snapshot = args.command == 'apply' or (args.command == 'plan' and args.snapshot)
+    pods = [] if from_snapshot or args.command == 'cleanup' else [1]
+    if args.command == 'extract':
+        return pods, []
+    
+    if args.target_pod:
+        destinations = {args.target_pod}
+    elif tenant_pairs:
+        destinations = {pair.target_pod for pair in tenant_pairs}
+    else:
+        # Rows may target any configured POD; which ones is only known once they are read
+        destinations = {pod for pod in get_configured_pods() if pod != 1}
+        destinations.add(DEFAULT_TARGET_POD)
+        return pods, sorted(destinations - set(pods))
+    return pods + sorted(destinations - set(pods)), []
+
+
+def authenticate_pods(pod_numbers, warm_connections=0):
+    """
+    Authenticate with several PODs concurrently, optionally pre-opening pooled connections.
+    
+    Returns:
+        ({pod_number: (auth, tenant_id)}, {pod_number: error message})
+    """
+    def connect(pod_number):
+        auth, tenant_id = authenticate_pod(pod_number)
+        auth.warm_up(warm_connections)
+        return auth, tenant_id
+    
+    pods, failures = {}, {}
+    with ThreadPoolExecutor(max_workers=max(1, len(pod_numbers))) as executor:
+        futures = {pod_number: executor.submit(connect, pod_number) for pod_number in pod_numbers}
+        for pod_number, future in futures.items():
+            try:
+                pods[pod_number] = future.result()
+            except Exception as e:
+                failures[pod_number] = str(e)
+    return pods, failures
 
 
-def main():
-    """Main entry point for the template cloning tool."""
+def connect_pods(args, tenant_pairs=None):
+    """
+    Authenticate every POD the command may use before any template work.
+    
+    A required POD that fails stops the run (returns None). A POD that only some
+    input rows might target is left out with a warning; rows that do target it
+    retry the authentication and are skipped if it fails again.
+    """
+    required, optional = required_pods(args, tenant_pairs)
+    pod_numbers = required + optional
+    print(f"\n[Startup] Authenticating with {', '.join(f'POD-{n}' for n in pod_numbers)}...")
+    pods, failures = authenticate_pods(pod_numbers, warm_connections=args.warm_connections)
+    
+    for pod_number in pod_numbers:
+        if pod_number in failures and pod_number in optional:
+            print(f"  ⚠ POD-{pod_number} authentication failed: {failures[pod_number]} "
+                  f"(only templates targeting POD-{pod_number} are affected)")
+        elif pod_number in failures:
+            print(f"  ✗ POD-{pod_number} authentication failed: {failures[pod_number]}")
+        else:
+            print(f"  ✓ Authenticated with POD-{pod_number} (tenant {pods[pod_number][1]})")
+    
+    if any(pod_number in failures for pod_number in required):
+        print("\n✗ Fix the credentials above and rerun. No templates were processed.")
+        return None
+    return pods
+
+
+def main(argv=None):
+    """Main entry point for the template cloning tool. Returns the exit status."""
+    args = parse_args(argv)
     
     print("=" * 80)
     print("OpsRamp Template Cloning Tool - POD1 to POD2")
@@ -42,108 +516,716 @@ def main():
     # Load environment variables
     load_env_file()
     
-    # ========================================================================
-    # STEP 1: Load Template Names from Config
-    # ========================================================================
-    print("\n[Step 1] Loading template names from config...")
+    transport = open_transport(args)
+    if transport is False:
+        return 1
+    
+    set_timeouts(args.connect_timeout, args.read_timeout, args.write_timeout)
+    RUN.set_deadline(args.deadline)
+    
+    configure_concurrency(args)
+    
+    profiler = None
+    if args.profile:
+        report_path = Path(args.profile_report) if args.profile_report else DEFAULT_REPORT_PATH
+        if args.shard:
+            # Shard workers each write their own report
+            report_path = shard_state_path(report_path, args.shard)
+        profiler = RunProfiler(report_path)
+        profiler.start()
+    
+    previous_handler = signal.signal(signal.SIGINT, handle_interrupt)
     try:
-        template_names = load_template_names()
-        print(f"  ✓ Found {len(template_names)} template(s) to process:")
-        for idx, name in enumerate(template_names, 1):
-            print(f"    {idx}. {name}")
-    except (FileNotFoundError, ValueError) as e:
-        print(f"  ✗ Error: {str(e)}")
+        status = execute(args, profiler)
+    finally:
+        signal.signal(signal.SIGINT, previous_handler)
+        if profiler is not None:
+            profiler.stop()
+            print(f"\n  ✓ Profile report saved to: {profiler.write_report()}")
+        if transport is not None:
+            close_transport(transport)
+    return 1 if status is False else 0
+
+
+def template_workers(args):
+    """Templates run at once: enough for the POD limits to reach --max-concurrency."""
+    return max(args.concurrency, args.max_concurrency or 0)
+
+
+def configure_concurrency(args):
+    """Set the adaptive per-POD limits and the POD slots for sessions created from here on."""
+    # Limits start at --concurrency (verification reads run on their own --verify-workers
+    # threads) and may grow up to --max-concurrency
+    initial = max(args.concurrency, args.verify_workers if args.verify else 1)
+    if args.command == 'cleanup':
+        # Deletes are cheap: start the POD limits at --delete-workers
+        initial = max(initial, args.delete_workers)
+    set_max_concurrency(max(initial, args.max_concurrency or 0), initial)
+    SCHEDULER.set_slots(args.pod_slots or template_workers(args))
+
+
+def handle_interrupt(signum, frame):
+    """First Ctrl-C cancels the run cooperatively; a second one aborts at once."""
+    if RUN.stopped():
+        raise KeyboardInterrupt
+    RUN.cancel("interrupted (Ctrl-C)")
+    print("\n  ✗ Interrupted: finishing requests in flight, no new work is started "
+          "(Ctrl-C again to abort)")
+
+
+def open_transport(args):
+    """Install the record/replay transport. Returns None when not used and False on error."""
+    path = args.record or args.replay
+    if not path:
+        return None
+    
+    path = Path(path)
+    if args.shard:
+        # Shard workers keep one cassette each
+        shard_path = shard_state_path(path, args.shard)
+        if args.record or shard_path.exists():
+            path = shard_path
+    
+    if args.record:
+        transport = RecordTransport(path)
+        print(f"\n[Transport] Recording HTTP exchanges to: {path}")
+    else:
+        try:
+            transport = ReplayTransport(path, latency=args.replay_latency)
+        except (FileNotFoundError, ValueError) as e:
+            print(f"\n  ✗ Error: {str(e)}")
+            return False
+        print(f"\n[Transport] Replaying {len(transport)} HTTP exchange(s) from: {path}"
+              + (" (with recorded latencies)" if args.replay_latency else ""))
+    
+    install_transport(transport)
+    return transport
+
+
+def close_transport(transport):
+    """Uninstall the transport and report what it recorded or replayed."""
+    install_transport(None)
+    transport.close()
+    if isinstance(transport, RecordTransport):
+        print(f"  ✓ Recorded {transport.count} HTTP exchange(s) to: {transport.path}")
+    else:
+        print(f"  ✓ Replayed {transport.count} HTTP exchange(s) from: {transport.path}"
+              + (f", {transport.misses} request(s) not in the cassette" if transport.misses else ""))
+
+
+def profile_stage(profiler, name):
+    """Context manager profiling one stage of the run when --profile is set."""
+    return profiler.stage(name) if profiler is not None else nullcontext()
+
+
+def execute(args, profiler=None):
+    """Authenticate and run the selected command. Returns False if it could not run."""
+    tenant_pairs = None
+    if args.tenants:
+        try:
+            tenant_pairs = load_tenant_pairs(args.tenants)
+        except (FileNotFoundError, ValueError) as e:
+            print(f"\n  ✗ Error: {str(e)}")
+            return False
+    
+    # Bad credentials for a required POD stop the run before any template work starts
+    with profile_stage(profiler, 'startup'):
+        pods = connect_pods(args, tenant_pairs)
+    if pods is None:
+        return False
+    
+    if tenant_pairs:
+        with profile_stage(profiler, 'tenant pairs'), ArtifactStore() as store:
+            run_tenant_pairs(args, pods, tenant_pairs, store)
+        return
+    
+    if args.workers:
+        with profile_stage(profiler, 'shard workers'):
+            run_coordinator(args)
+        return
+    
+    if args.command == 'sync':
+        with profile_stage(profiler, 'sync'):
+            return run_sync(args, pods)
+    
+    if args.command == 'plan':
+        with profile_stage(profiler, 'plan'):
+            return run_plan(args, pods)
+    
+    if args.command == 'cleanup':
+        with profile_stage(profiler, 'cleanup'):
+            run_cleanup(args, pods)
         return
     
+    # Results and payloads live on disk; extract writes straight into the snapshot file
+    if args.command == 'extract':
+        state = RunStateStore(args.snapshot or DEFAULT_SNAPSHOT_PATH)
+    else:
+        state_path = Path(args.state) if args.state else DEFAULT_STATE_PATH
+        if args.shard:
+            state_path = shard_state_path(state_path, args.shard)
+        state = RunStateStore(state_path)
+        state.reset()
+    
+    # Customizations and clone responses go to the content-addressed artefact store
+    with state, ArtifactStore() as store:
+        try:
+            run(args, state, pods, profiler, RunArtifacts(store, args.run_id))
+        finally:
+            if args.results_file:
+                save_results(args.results_file, state.pod1_results, state.clone_results,
+                             state.iter_verify_results())
+
+
+def run(args, state, pods, profiler=None, artifacts=None):
+    """Run the selected command, recording results in the run state store."""
+    pod1_results = state.pod1_results
+    clone_results = state.clone_results
+    
+    if args.command == 'apply':
+        with profile_stage(profiler, 'load snapshot'):
+            if not load_snapshot(args, state):
+                return
+    else:
+        # A run can also save its extraction as a separate snapshot
+        snapshot = None
+        if args.command == 'run' and args.snapshot:
+            snapshot = Snapshot(args.snapshot, create=True)
+        try:
+            with profile_stage(profiler, 'extract POD-1'):
+                if not extract_pod1(args, state, pods, snapshot, artifacts):
+                    return
+        finally:
+            if snapshot is not None:
+                print(f"\n  ✓ Snapshot saved to: {snapshot.path} ({len(snapshot)} template(s))")
+                snapshot.close()
+        
+        if args.command == 'extract':
+            print(f"\n  ✓ Snapshot saved to: {state.path} ({len(state)} template(s))")
+            print_summary(pod1_results, clone_results, state.path, artifacts=artifacts)
+            return
+    
+    with profile_stage(profiler, 'clone to destinations'):
+        clone_to_destinations(args, state, pods, artifacts)
+    
     # ========================================================================
-    # PART 1: POD-1 (Source)
+    # SUMMARY
     # ========================================================================
+    print_summary(pod1_results, clone_results, state.path, state.iter_verify_results(), artifacts)
+
+
+def run_tenant_pairs(args, pods, tenant_pairs, store):
+    """Extract and clone every source/destination tenant pair, several pairs at a time."""
+    print(f"\n[Tenants] Processing {len(tenant_pairs)} tenant pair(s), "
+          f"up to {args.tenant_concurrency} at a time...")
+    
+    # Catalogs are cached per source tenant and shared by every pair reading from it
+    catalogs = {}
+    catalogs_lock = threading.Lock()
+    
+    def catalog_for(tenant_id):
+        with catalogs_lock:
+            if tenant_id not in catalogs:
+                catalogs[tenant_id] = LazyCatalog(GlobalTemplateManager(pods[1][0], tenant_id),
+                                                  f"POD-1 tenant {tenant_id}")
+            return catalogs[tenant_id]
+    
+    base_state_path = Path(args.state) if args.state else DEFAULT_STATE_PATH
+    outcomes = {}
+    
+    def process_pair(pair):
+        target_pod = args.target_pod or pair.target_pod
+        state_path = base_state_path.with_name(
+            f"{base_state_path.stem}_{pair.source_tenant}_to_{pair.target_tenant}{base_state_path.suffix}"
+        )
+        if target_pod not in pods:
+            print(f"\n  ✗ {pair.label}: POD-{target_pod} is not configured")
+            outcomes[pair.label] = {'error': f"POD-{target_pod} is not configured", 'state_path': state_path}
+            return
+        
+        # PODs share their authenticated session (pool, limiters, token) across tenants;
+        # the destination may be POD-1 itself when cloning between its tenants
+        source = {1: (pods[1][0], pair.source_tenant)}
+        destination = {target_pod: (pods[target_pod][0], pair.target_tenant)}
+        pair_args = argparse.Namespace(**vars(args))
+        pair_args.target_pod = target_pod
+        # Rules resolve against the pair's own source tenant; labels repeat between pairs
+        pair_args.priorities = PriorityRules(args.priorities.rules)
+        
+        artifacts = RunArtifacts(store, f"{args.run_id}/{pair.source_tenant}->{pair.target_tenant}")
+        
+        print(f"\n[Tenants] Starting {pair.label}")
+        try:
+            with RunStateStore(state_path) as state:
+                state.reset()
+                if extract_pod1(pair_args, state, source, None, artifacts, catalog_for(pair.source_tenant)):
+                    clone_to_destinations(pair_args, state, source, artifacts, destination)
+                
+                clone_results = dict(state.clone_results.items())
+                outcomes[pair.label] = {
+                    'extracted': len(state.pod1_results),
+                    'cloned': sum(1 for result in clone_results.values()
+                                  if result.get('success') and not result.get('skipped')),
+                    'skipped': sum(1 for result in clone_results.values() if result.get('skipped')),
+                    'failed': sum(1 for result in clone_results.values() if not result.get('success')),
+                    'state_path': state_path
+                }
+        except Exception as e:
+            # A broken pair (unwritable state file, unexpected response, ...) does not stop the others
+            print(f"\n  ✗ {pair.label} failed: {str(e)}")
+            outcomes[pair.label] = {'error': str(e), 'state_path': state_path}
+    
+    for_each(tenant_pairs, process_pair, args.tenant_concurrency)
+    print_tenant_summary(tenant_pairs, outcomes)
+
+
+def print_tenant_summary(tenant_pairs, outcomes):
+    """Print the SUMMARY section of a multi-tenant run."""
     print("\n" + "=" * 80)
-    print("PART 1: POD-1 (Source)")
+    print("SUMMARY")
     print("=" * 80)
     
-    # STEP 2: Authenticate with POD-1
-    print("\n[Step 2] Authenticating with POD-1...")
+    print("\nTenant Pairs:")
+    for pair in tenant_pairs:
+        outcome = outcomes.get(pair.label)
+        if outcome is None:
+            print(f"  • {pair.label}: ✗ Not processed")
+            continue
+        if 'error' in outcome:
+            print(f"  • {pair.label}: ✗ Failed: {outcome['error']}")
+            continue
+        status = "✓" if outcome['extracted'] and not outcome['failed'] else "✗"
+        print(f"  • {pair.label}: {status} {outcome['extracted']} extracted, "
+              f"{outcome['cloned']} cloned, {outcome['skipped']} skipped, {outcome['failed']} failed")
+        print(f"    Run state: {outcome['state_path']}")
+    
+    print_stop_reason()
+    
+    print("\nTransfer:")
+    for line in TRANSFER_STATS.report_lines(sum(outcome.get('extracted', 0) for outcome in outcomes.values())):
+        print(f"  • {line}")
+    
+    lines = limiter_report_lines()
+    if lines:
+        print("\nConcurrency:")
+        for line in lines:
+            print(f"  • {line}")
+    
+    lines = SCHEDULER.report_lines()
+    if lines:
+        print("\nScheduling:")
+        for line in lines:
+            print(f"  • {line}")
+    
+    print("\n" + "=" * 80)
+    print("Template cloning completed!")
+    print("=" * 80)
+
+
+def run_sync(args, pods):
+    """Poll POD-1 and clone or update changed templates until interrupted. Returns False on input errors."""
+    pod1_auth, pod1_tenant_id = pods[1]
+    
+    # Destination PODs are authenticated once and reused across cycles
+    destinations = {pod: pods[pod] for pod in pods if pod != 1}
+    
+    def get_destination(target_pod):
+        target_pod = args.target_pod or target_pod
+        if target_pod not in destinations:
+            print(f"\n  [Sync] Authenticating with POD-{target_pod}...")
+            try:
+                destinations[target_pod] = authenticate_pod(target_pod)
+                print(f"  ✓ Authenticated with POD-{target_pod}")
+            except Exception as e:
+                print(f"  ✗ Authentication failed: {str(e)}")
+                return None
+        return destinations[target_pod]
+    
     try:
-        pod1_config = get_pod_config(1)
-        pod1_tenant_ids = get_tenant_ids(1)
-        pod1_tenant_id = pod1_tenant_ids.get('partner_id') or pod1_tenant_ids.get('client_id')
-        
-        if not pod1_tenant_id:
-            print("  ✗ POD1 tenant ID not found in .env file")
-            return
-        
-        pod1_auth = OpsRampAuth(**pod1_config)
-        pod1_auth.get_token()
-        print("  ✓ Authenticated with POD-1")
-        print(f"  ✓ Tenant ID: {pod1_tenant_id}")
-    except Exception as e:
-        print(f"  ✗ Authentication failed: {str(e)}")
-        return
+        selections = list(iter_template_selections(args.input, args.input_format))
+    except (FileNotFoundError, ValueError) as e:
+        print(f"  ✗ Error: {str(e)}")
+        return False
+    if args.target_pod:
+        for selection in selections:
+            selection.target_pod = args.target_pod
+    
+    with SyncIndex(args.sync_index) as index:
+        daemon = SyncDaemon(pod1_auth, pod1_tenant_id, selections, get_destination, index,
+                            default_name=default_clone_name)
+        print(f"  ✓ Sync index: {index.path}")
+        print(f"  ✓ Polling every {args.interval:g}s" + (f" for {args.cycles} cycle(s)" if args.cycles else ""))
+        daemon.run(args.interval, args.cycles)
+
+
+def run_plan(args, pods):
+    """
+    Resolve every template from bulk listings and estimate what run/apply would cost, without cloning.
+    Returns False if the input or snapshot cannot be read.
+    """
+    # The plan's own requests are reported separately from the estimate
+    plan_calls_before = TRANSFER_STATS.to_dict()['responses']
     
-    # Store results for each template
-    pod1_results = {}
+    def get_destination(target_pod):
+        if target_pod not in pods:
+            print(f"\n  [Plan] Authenticating with POD-{target_pod}...")
+            try:
+                pods[target_pod] = authenticate_pod(target_pod)
+            except Exception as e:
+                print(f"  ✗ Authentication failed: {str(e)}")
+                return None
+        print(f"\n  [Plan] Indexing POD-{target_pod} templates...")
+        return pods[target_pod]
     
-    for template_name in template_names:
-        print(f"\n  Processing: {template_name}")
-        print("  " + "-" * 60)
+    planner = MigrationPlanner(get_destination, default_clone_name,
+                               skip_existing=args.skip_existing, verify=args.verify)
+    
+    if args.snapshot:
+        print("\n[Plan] Reading POD-1 templates from snapshot...")
+        try:
+            with Snapshot(args.snapshot) as snapshot:
+                print(f"  ✓ Snapshot: {snapshot.path} ({len(snapshot)} template(s))")
+                entries = []
+                for data in snapshot.iter_entries():
+                    if args.target_pod:
+                        data['target_pod'] = args.target_pod
+                    entries.extend(planner.plan_snapshot([(data, snapshot.load_customizations(data['label']))]))
+        except (FileNotFoundError, ValueError, sqlite3.Error) as e:
+            print(f"  ✗ Error: {str(e)}")
+            return False
+    else:
+        pod1_auth, pod1_tenant_id = pods[1]
+        try:
+            selections = list(iter_template_selections(args.input, args.input_format))
+        except (FileNotFoundError, ValueError) as e:
+            print(f"  ✗ Error: {str(e)}")
+            return False
         
-        # STEP 3: Get Global Template ID from POD-1
-        print("\n  [Step 3] Getting global template ID...")
-        global_mgr = GlobalTemplateManager(pod1_auth, pod1_tenant_id)
-        global_template_info = global_mgr.get_global_template_by_name(template_name)
+        # Global and cloned templates of POD-1 are listed in bulk, never looked up one by one
+        pod1_catalog = LazyCatalog(GlobalTemplateManager(pod1_auth, pod1_tenant_id), "POD-1")
+        if pod1_catalog() is None:
+            print("\n✗ Cannot plan without the POD-1 catalog. Exiting.")
+            return
+        # Where the run would index POD-1: up front with --catalog or selector priority
+        # rules, else at the first selector (or at the first missing name, see estimate)
+        needs_catalog = args.catalog or any(is_selector(target) for target, _ in args.priorities.rules)
+        catalog_at = 0 if needs_catalog else None
+        expanded = []
         
-        if not global_template_info:
-            print(f"    ✗ Global template not found: {template_name}")
-            continue
+        def note_first_selector(items):
+            nonlocal catalog_at
+            for selection in items:
+                if catalog_at is None and is_selector(selection.name):
+                    catalog_at = len(expanded)
+                yield selection
         
-        print(f"    ✓ Global Template ID: {global_template_info.template_id}")
+        for selection in dedupe_selections(expand_selections(note_first_selector(selections), pod1_catalog)):
+            expanded.append(selection)
+        selections = expanded
+        if args.target_pod:
+            for selection in selections:
+                selection.target_pod = args.target_pod
         
-        # STEP 4: Get Cloned Template ID using Global Template ID as parent
-        print("\n  [Step 4] Getting cloned template ID...")
-        cloned_mgr = ClonedTemplateManager(pod1_auth, pod1_tenant_id)
-        cloned_template_info = cloned_mgr.get_cloned_template_by_parent_id(
-            global_template_info.template_id
-        )
+        print("\n  [Plan] Listing POD-1 cloned templates...")
+        source_clones = {}
+        try:
+            for template in ClonedTemplateManager(pod1_auth, pod1_tenant_id).iter_cloned_templates():
+                source_clones.setdefault(template.parent_id, template)
+        except requests.exceptions.RequestException as e:
+            print(f"    ✗ Failed to list cloned templates: {str(e)}")
+            return
+        print(f"    ✓ {len(source_clones)} cloned template(s) with a parent")
         
-        if not cloned_template_info:
-            print(f"    ✗ No cloned template found for parent: {global_template_info.template_id}")
+        entries = planner.plan_live(selections, pod1_catalog.catalog, source_clones, catalog_at)
+    
+    print_plan(args, planner, entries, TRANSFER_STATS.to_dict()['responses'] - plan_calls_before)
+
+
+def print_plan(args, planner, entries, plan_calls):
+    """Print the plan and its cost estimate and write it to the plan file."""
+    estimate = planner.estimate(entries)
+    
+    print("\n" + "=" * 80)
+    print("PLAN")
+    print("=" * 80)
+    
+    symbols = {'clone': "+", 'skip': "=", 'missing': "✗"}
+    for entry in entries:
+        line = f"  {symbols[entry.action]} {entry.action:<7} {entry.label} -> POD-{entry.target_pod}: {entry.new_name}"
+        print(line + (f" ({entry.reason})" if entry.reason else ""))
+    
+    counts = {action: sum(1 for entry in entries if entry.action == action) for action in ACTIONS}
+    print(f"\nTemplates: {len(entries)} ({', '.join(f'{counts[action]} {action}' for action in ACTIONS)})")
+    
+    phases = [('Extract (Steps 3-5)', estimate['extract']), ('Apply (Steps 7-9)', estimate['apply'])]
+    for title, pods in phases:
+        if pods is None:
             continue
+        print(f"\n{title}:")
+        for pod, calls in sorted(pods.items()):
+            total = calls['token'] + calls['get'] + calls['post']
+            print(f"  • POD-{pod}: {total} API call(s) ({calls['token']} token, {calls['get']} GET, "
+                  f"{calls['post']} POST), ~{calls['request_bytes']} bytes sent, "
+                  f"~{calls['response_bytes']} bytes received")
+    
+    if args.snapshot:
+        print("\nPayload sizes are exact (snapshot payloads); call counts exclude retries.")
+    else:
+        print("\nPayload sizes are estimated from listing sizes and are a lower bound "
+              "(plan from a snapshot for exact sizes); call counts exclude retries.")
+    print(f"Planning used {plan_calls} API call(s) and no clone requests.")
+    
+    plan_path = Path(args.plan_file) if args.plan_file else DEFAULT_PLAN_PATH
+    plan_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(plan_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'templates': [entry.to_dict() for entry in entries],
+            'counts': counts,
+            'estimate': {
+                phase: {f"POD-{pod}": calls for pod, calls in pods.items()} if pods is not None else None
+                for phase, pods in (('extract', estimate['extract']), ('apply', estimate['apply']))
+            },
+            'plan_calls': plan_calls
+        }, f, indent=4)
+    print(f"\n  ✓ Plan saved to: {plan_path}")
+
+
+def journal_paths(args):
+    """Run state files (all of them under output/ unless --state is given), plus the sync index with --include-sync."""
+    if args.state:
+        paths = [Path(args.state)]
+    else:
+        paths = sorted(DEFAULT_STATE_PATH.parent.glob(f"{DEFAULT_STATE_PATH.stem}*{DEFAULT_STATE_PATH.suffix}"))
+    if args.include_sync:
+        paths.append(Path(args.sync_index) if args.sync_index else DEFAULT_INDEX_PATH)
+    return [path for path in paths if path.exists()]
+
+
+def run_cleanup(args, pods):
+    """List (and with --confirm delete) cloned templates created by earlier runs."""
+    print("\n[Cleanup] Reading run journals...")
+    # journal: POD -> tenant -> {template ID: (label, file)}; sources: template ID -> every
+    # file recording it (the state files of shards and of their merged run overlap)
+    journal, sources = {}, {}
+    paths = journal_paths(args)
+    for path in paths:
+        print(f"  ✓ {path}")
+    for label, target_pod, target_tenant, template_id, source in read_journal(paths):
+        pod_journal = journal.setdefault(target_pod or DEFAULT_TARGET_POD, {})
+        pod_journal.setdefault(target_tenant, {})[template_id] = (label, source)
+        sources.setdefault(template_id, set()).add(source)
+    print(f"  ✓ {sum(len(entries) for tenants in journal.values() for entries in tenants.values())} "
+          f"template(s) created by earlier runs")
+    
+    if args.target_pod:
+        target_pods = [args.target_pod]
+    else:
+        target_pods = sorted(set(journal) | {pod for pod in pods if pod != 1})
+    if not args.discover:
+        target_pods = [pod for pod in target_pods if journal.get(pod)]
+    
+    # Every destination tenant is listed in bulk once; journal IDs no longer listed are already gone
+    cleaners, selected, gone_ids = {}, {}, []
+    for target_pod in target_pods:
+        if target_pod not in pods:
+            try:
+                pods[target_pod] = authenticate_pod(target_pod)
+            except Exception as e:
+                print(f"\n  ✗ POD-{target_pod} authentication failed: {str(e)}")
+                continue
         
-        print(f"    ✓ Cloned Template ID: {cloned_template_info.template_id}")
-        print(f"    ✓ Cloned Template Name: {cloned_template_info.name}")
-        print(f"    ✓ Scope: {cloned_template_info.scope}")
-        
-        # STEP 5: Get Customizations (JSON body) of the cloned template
-        print("\n  [Step 5] Getting template customizations...")
-        customizations_mgr = TemplateCustomizationsManager(pod1_auth, pod1_tenant_id)
-        customizations = customizations_mgr.get_template_customizations(
-            cloned_template_info.template_id
-        )
+        # Entries without a tenant were journalled before tenants were recorded: the POD's own tenant
+        auth, default_tenant = pods[target_pod]
+        tenants = {}
+        for tenant_id, entries in journal.get(target_pod, {}).items():
+            tenants.setdefault(tenant_id or default_tenant, {}).update(entries)
+        if args.discover:
+            tenants.setdefault(default_tenant, {})
         
-        if not customizations:
-            print("    ✗ Failed to get template customizations")
+        for tenant_id, entries in tenants.items():
+            print(f"\n[Cleanup] Listing cloned templates in POD-{target_pod} (tenant {tenant_id})...")
+            cleaners[(target_pod, tenant_id)] = TemplateCleaner(auth, tenant_id, target_pod)
+            try:
+                candidates, gone = cleaners[(target_pod, tenant_id)].find(
+                    entries, args.name_prefix if args.discover and tenant_id == default_tenant else None
+                )
+            except requests.exceptions.RequestException as e:
+                print(f"  ✗ Failed to list cloned templates: {str(e)}")
+                continue
+            
+            for candidate in candidates:
+                print(f"  - {candidate.name} ({candidate.template_id}) [{candidate.source}]")
+            if gone:
+                print(f"  ✓ {len(gone)} journalled template(s) no longer exist")
+                gone_ids.extend(gone)
+            selected[(target_pod, tenant_id)] = candidates
+    
+    total = sum(len(candidates) for candidates in selected.values())
+    if not args.confirm:
+        print(f"\n  Dry run: {total} template(s) would be deleted. Rerun with --confirm to delete them.")
+        if gone_ids:
+            print(f"  --confirm also removes the {len(gone_ids)} template(s) that no longer exist from the journals.")
+        return
+    
+    outcomes = {}
+    for (target_pod, tenant_id), candidates in selected.items():
+        if not candidates:
             continue
-        
-        print("    ✓ Customizations retrieved successfully")
-        
-        # Save customizations to file
-        safe_filename = template_name.replace(' ', '_').replace('/', '-')[:50]
-        customizations_mgr.save_customizations_to_file(
-            customizations, 
-            f"pod1_{safe_filename}_customizations.json"
-        )
-        
-        # Store results for POD-2 processing
-        pod1_results[template_name] = {
-            'global_template_id': global_template_info.template_id,
-            'cloned_template_id': cloned_template_info.template_id,
-            'customizations': customizations
-        }
+        print(f"\n[Cleanup] Deleting {len(candidates)} template(s) from POD-{target_pod} (tenant {tenant_id})...")
+        for candidate, deleted in cleaners[(target_pod, tenant_id)].delete(candidates, args.delete_workers):
+            print(f"  {'✓ Deleted' if deleted else '✗ Failed'}: {candidate.name} ({candidate.template_id})")
+            outcomes[candidate.template_id] = dict(candidate.to_dict(), deleted=deleted)
+    
+    # Deleted and vanished templates leave the journals, so later cleanups stop reporting them
+    forget = {}
+    for template_id in gone_ids + [template_id for template_id, outcome in outcomes.items() if outcome['deleted']]:
+        for source in sources.get(template_id, ()):
+            forget.setdefault(source, []).append(template_id)
+    pruned = sum(prune_journal(path, forget[path.name]) for path in paths if path.name in forget)
+    if pruned:
+        print(f"\n  ✓ Removed {pruned} journal row(s) of deleted or missing templates")
+    
+    print("\n" + "=" * 80)
+    print("SUMMARY")
+    print("=" * 80)
+    deleted = sum(1 for outcome in outcomes.values() if outcome['deleted'])
+    print(f"\nDeleted {deleted} of {total} template(s), {len(outcomes) - deleted} failed")
+    print_stop_reason()
+    
+    lines = limiter_report_lines()
+    if lines:
+        print("\nConcurrency:")
+        for line in lines:
+            print(f"  • {line}")
+    
+    if args.results_file:
+        with open(args.results_file, 'w', encoding='utf-8') as f:
+            json.dump({'cleanup_results': outcomes, 'stopped': RUN.stopped()}, f, indent=4)
+
+
+def load_snapshot(args, state):
+    """Copy POD-1 templates from a snapshot file into the run state. Returns False on failure."""
+    print("\n[Step 1] Loading POD-1 templates from snapshot...")
+    try:
+        with Snapshot(args.snapshot or DEFAULT_SNAPSHOT_PATH) as snapshot:
+            source = snapshot.metadata()
+            print(f"  ✓ Snapshot: {snapshot.path}")
+            print(f"  ✓ Source: {source.get('source_base_url')} (tenant {source.get('source_tenant_id')}), "
+                  f"extracted {source.get('created_at')}")
+            if args.shard:
+                print(f"  ✓ Shard {args.shard[0]}/{args.shard[1]}")
+            
+            # Compressed payloads are copied as-is and only loaded when cloned
+            state.import_templates(str(snapshot.path), args.shard)
+    except (FileNotFoundError, ValueError, sqlite3.Error) as e:
+        print(f"  ✗ Error: {str(e)}")
+        return False
+    
+    if not state.pod1_results:
+        print("\n✗ No templates in snapshot. Exiting.")
+        return False
+    
+    print(f"  ✓ Loaded {len(state.pod1_results)} template(s)")
+    return True
+
+
+def extract_pod1(args, state, pods, snapshot=None, artifacts=None, pod1_catalog=None):
+    """Run Step 1 and PART 1 (POD-1). Returns False if there is nothing to clone."""
+    pod1_results = state.pod1_results
+    
+    # ========================================================================
+    # STEP 1: Open Template Input (consumed lazily while processing POD-1)
+    # ========================================================================
+    print("\n[Step 1] Opening template input...")
+    try:
+        selections = iter_template_selections(args.input, args.input_format)
+        print(f"  ✓ Reading templates from: {args.input or 'config/template_names.txt'}")
+    except (FileNotFoundError, ValueError) as e:
+        print(f"  ✗ Error: {str(e)}")
+        return False
+    
+    # ========================================================================
+    # PART 1: POD-1 (Source)
+    # ========================================================================
+    print("\n" + "=" * 80)
+    print("PART 1: POD-1 (Source)")
+    print("=" * 80)
+    
+    # STEP 2: POD-1 session (authenticated at startup)
+    print("\n[Step 2] Using the POD-1 session opened at startup...")
+    pod1_auth, pod1_tenant_id = pods[1]
+    print(f"  ✓ Tenant ID: {pod1_tenant_id}")
+    
+    state.set_source(pod1_auth.base_url, pod1_tenant_id)
+    if snapshot is not None:
+        snapshot.set_source(pod1_auth.base_url, pod1_tenant_id)
+    
+    # POD-1 global template index, built on the first selector or unknown name
+    if pod1_catalog is None:
+        pod1_catalog = LazyCatalog(GlobalTemplateManager(pod1_auth, pod1_tenant_id), "POD-1")
+    if args.catalog:
+        pod1_catalog()
+    if args.priorities:
+        # Selector rules need the index; rules naming templates exactly match without it
+        needs_catalog = any(is_selector(target) for target, _ in args.priorities.rules)
+        args.priorities.resolve(pod1_catalog() if needs_catalog else None)
+    
+    # Selectors expand in-memory; expanded names are deduplicated again before sharding
+    selections = dedupe_selections(expand_selections(selections, pod1_catalog))
+    if args.shard:
+        shard_index, shard_count = args.shard
+        selections = select_shard(selections, shard_index, shard_count,
+                                  key=lambda selection: selection.name)
+        print(f"\n  ✓ Processing shard {shard_index}/{shard_count}")
+    
+    # Templates stream in input order until one has a priority (input row or rule)
+    selections = prioritized(selections, args.priorities.for_selection)
+    
+    template_count = 0
+    
+    def numbered(items):
+        nonlocal template_count
+        for selection in items:
+            template_count += 1
+            yield selection, template_count
+    
+    def process_one(item):
+        selection, index = item
+        priority = args.priorities.for_selection(selection)
+        with SCHEDULER.slot(1, pod1_tenant_id, priority) as granted:
+            if not granted:
+                return
+            # Steps 3-5 share the template's deadline
+            with RUN.template_deadline(args.template_deadline):
+                process_pod1_template(selection, index, pod1_auth, pod1_tenant_id,
+                                      pod1_catalog, pod1_results, snapshot, artifacts)
+    
+    try:
+        # Templates are processed on up to --max-concurrency threads; the POD limiters pace the requests
+        for_each(numbered(selections), process_one, template_workers(args))
+    except ValueError as e:
+        print(f"\n  ✗ Input error, stopped reading templates: {str(e)}")
+    
+    if not template_count:
+        print("\n✗ No template names found in input. Exiting.")
+        return False
     
     if not pod1_results:
         print("\n✗ No templates processed from POD-1. Exiting.")
-        return
+        return False
+    
+    return True
+
+
+def clone_to_destinations(args, state, pods, artifacts=None, destinations=None):
+    """
+    Run PART 2: clone every POD-1 result to its destination POD.
+    
+    destinations maps POD numbers to (auth, tenant_id); by default every POD
+    in pods except the source POD-1.
+    """
+    pod1_results = state.pod1_results
+    clone_results = state.clone_results
     
     # ========================================================================
     # PART 2: POD-2 (Destination)
@@ -152,99 +1234,313 @@ def main():
     print("PART 2: POD-2 (Destination)")
     print("=" * 80)
     
-    # STEP 6: Authenticate with POD-2
-    print("\n[Step 6] Authenticating with POD-2...")
-    try:
-        pod2_config = get_pod_config(2)
-        pod2_tenant_ids = get_tenant_ids(2)
-        pod2_tenant_id = pod2_tenant_ids.get('partner_id') or pod2_tenant_ids.get('client_id')
-        
-        if not pod2_tenant_id:
-            print("  ✗ POD2 tenant ID not found in .env file")
-            return
-        
-        pod2_auth = OpsRampAuth(**pod2_config)
-        pod2_auth.get_token()
-        print("  ✓ Authenticated with POD-2")
-        print(f"  ✓ Tenant ID: {pod2_tenant_id}")
-    except Exception as e:
-        print(f"  ✗ Authentication failed: {str(e)}")
-        return
+    # Configured PODs were authenticated at startup; others (rows may name any POD) on first use
+    if destinations is None:
+        destinations = {pod: pods[pod] for pod in pods if pod != 1}
     
-    # Process each template
-    clone_results = {}
+    # Read-backs run in the background while the remaining templates are cloned
+    verifier = TemplateVerifier(args.verify_workers) if args.verify else None
     
-    for template_name, pod1_data in pod1_results.items():
-        print(f"\n  Processing: {template_name}")
-        print("  " + "-" * 60)
+    destinations_lock = threading.Lock()
+    
+    # With --skip-existing, templates already on each destination are listed once per POD
+    existing_clones = {}
+    
+    def existing_on(target_pod):
+        with destinations_lock:
+            if target_pod not in existing_clones:
+                existing_clones[target_pod] = list_existing_clones(target_pod, *destinations[target_pod])
+        return existing_clones[target_pod]
+    
+    def clone_one(item):
+        label, pod1_data = item
+        target_pod = args.target_pod or pod1_data['target_pod']
         
-        # STEP 7: Get Global Template ID from POD-2
-        print("\n  [Step 7] Getting global template ID from POD-2...")
-        global_mgr_pod2 = GlobalTemplateManager(pod2_auth, pod2_tenant_id)
-        global_template_info_pod2 = global_mgr_pod2.get_global_template_by_name(template_name)
+        with destinations_lock:
+            if target_pod not in destinations:
+                # STEP 6: Authenticate with destination POD
+                print(f"\n[Step 6] Authenticating with POD-{target_pod}...")
+                try:
+                    destinations[target_pod] = authenticate_pod(target_pod)
+                    print(f"  ✓ Authenticated with POD-{target_pod}")
+                    print(f"  ✓ Tenant ID: {destinations[target_pod][1]}")
+                except Exception as e:
+                    print(f"  ✗ Authentication failed: {str(e)}")
+                    destinations[target_pod] = None
         
-        if not global_template_info_pod2:
-            print(f"    ✗ Global template not found in POD-2: {template_name}")
-            continue
+        if destinations[target_pod] is None:
+            print(f"\n  ✗ Skipping {label}: POD-{target_pod} is not authenticated")
+            return
         
-        print(f"    ✓ Global Template ID (POD-2): {global_template_info_pod2.template_id}")
+        if args.skip_existing:
+            new_name = pod1_data['new_name'] or default_clone_name(pod1_data['template_name'])
+            existing_id = existing_on(target_pod).get(new_name.casefold())
+            if existing_id:
+                print(f"\n  ✓ Skipping {label}: '{new_name}' already exists in POD-{target_pod}")
+                # Not created by this run, so not journalled as a new clone
+                clone_results[label] = {
+                    'existing_template_id': existing_id,
+                    'success': True,
+                    'skipped': True,
+                    'template_name': pod1_data['template_name'],
+                    'target_pod': target_pod
+                }
+                return
         
-        # STEP 8: Clone template to POD-2
-        print("\n  [Step 8] Cloning template to POD-2...")
-        clone_mgr = CloneTemplateManager(pod2_auth, pod2_tenant_id)
+        priority = args.priorities.for_result(label, pod1_data['template_name'])
+        with SCHEDULER.slot(target_pod, destinations[target_pod][1], priority) as granted:
+            if not granted:
+                return
+            # Steps 7-8 share the template's deadline (verification runs under the run deadline only)
+            with RUN.template_deadline(args.template_deadline):
+                clone_pod1_template(label, pod1_data, target_pod, destinations[target_pod],
+                                    pod1_results, clone_results, verifier, artifacts)
+    
+    items = pod1_results.items()
+    if args.priorities and args.priorities.by_name is None:
+        # Loaded from a snapshot: rules are matched against the snapshot's template names
+        args.priorities.resolve(TemplateCatalog(
+            GlobalTemplateInfo(data['global_template_id'], data['template_name'])
+            for _, data in pod1_results.items()
+        ))
+    if args.priorities.in_use():
+        items = prioritized(items, lambda item: args.priorities.for_result(item[0], item[1]['template_name']))
+    
+    # Templates are cloned on up to --max-concurrency threads; the POD limiters pace the requests
+    for_each(items, clone_one, template_workers(args))
+    
+    if verifier is not None:
+        # STEP 9: Collect verification results
+        print("\n[Step 9] Verifying cloned templates...")
+        for result in verifier.results():
+            state.set_verify_result(result.label, result.to_dict())
+            if result.verified:
+                print(f"  ✓ Verified: {result.label}")
+            elif result.error:
+                print(f"  ✗ {result.label}: {result.error}")
+            else:
+                print(f"  ✗ {result.label}: mismatch in {', '.join(result.mismatched_fields)}")
+
+
+def list_existing_clones(target_pod, auth, tenant_id):
+    """Map the case-folded names of a destination's cloned templates to their IDs."""
+    print(f"\n  [Skip existing] Listing cloned templates in POD-{target_pod}...")
+    existing = {}
+    try:
+        for template in ClonedTemplateManager(auth, tenant_id).iter_cloned_templates():
+            existing.setdefault(template.name.casefold(), template.template_id)
+    except requests.exceptions.RequestException as e:
+        print(f"    ✗ Listing failed, nothing will be skipped: {str(e)}")
+        return {}
+    print(f"    ✓ {len(existing)} cloned template name(s)")
+    return existing
+
+
+def save_artifact(artifacts, label, kind, payload):
+    """Store one artefact of the run, reporting failures without stopping the run."""
+    try:
+        artifact = artifacts.put(label, kind, payload)
+    except (OSError, sqlite3.Error) as e:
+        print(f"  ✗ Failed to store {kind}: {str(e)}")
+        return
+    state = "saved" if artifact.created else "unchanged, not rewritten"
+    print(f"  ✓ Stored {kind} as blob {artifact.digest[:12]} ({state})")
+
+
+def download_customizations(customizations_mgr, cloned_template_id, label, artifacts=None):
+    """
+    Stream a template's customizations into the artefact store and a compressed
+    run state payload at once, without parsing them.
+    
+    Returns:
+        (content hash, compressed payload file), None on failure; the caller
+        closes the file once the payload is stored
+    """
+    payload = PayloadCompressor()
+    
+    def sink(chunks):
+        chunks = payload.feed(chunks)
+        if artifacts is None:
+            for _ in chunks:
+                pass
+            return True
         
-        # Prepare new name for cloned template (optional)
-        new_name = f"MSE Template Test - {template_name}"
+        # Stored once per distinct payload
+        artifact = artifacts.put_stream(label, POD1_CUSTOMIZATIONS, chunks)
+        state = "saved" if artifact.created else "unchanged, not rewritten"
+        print(f"  ✓ Stored {POD1_CUSTOMIZATIONS} as blob {artifact.digest[:12]} ({state})")
+        return True
+    
+    try:
+        if not customizations_mgr.download_template_customizations(cloned_template_id, sink):
+            payload.close()
+            return None
+    except (OSError, sqlite3.Error) as e:
+        print(f"  ✗ Failed to store {POD1_CUSTOMIZATIONS}: {str(e)}")
+        payload.close()
+        return None
+    
+    if not payload.size:
+        payload.close()
+        return None
+    return payload.finish()
+
+
+def clone_pod1_template(label, pod1_data, target_pod, destination, pod1_results, clone_results,
+                        verifier=None, artifacts=None):
+    """Run Steps 7-8 for one template: look up the destination global template and clone."""
+    template_name = pod1_data['template_name']
+    pod2_auth, pod2_tenant_id = destination
+    
+    print(f"\n  Processing: {label}")
+    print("  " + "-" * 60)
+    
+    # STEP 7: Get Global Template ID from POD-2
+    print(f"\n  [Step 7] Getting global template ID from POD-{target_pod}...")
+    global_mgr_pod2 = GlobalTemplateManager(pod2_auth, pod2_tenant_id)
+    global_template_info_pod2 = global_mgr_pod2.get_global_template_by_name(template_name)
+    
+    if not global_template_info_pod2:
+        print(f"    ✗ Global template not found in POD-{target_pod}: {template_name}")
+        return
+    
+    print(f"    ✓ Global Template ID (POD-{target_pod}): {global_template_info_pod2.template_id}")
+    
+    # STEP 8: Clone template to POD-2
+    print(f"\n  [Step 8] Cloning template to POD-{target_pod}...")
+    clone_mgr = CloneTemplateManager(pod2_auth, pod2_tenant_id)
+    
+    # Payloads are loaded from the run state and parsed one template at a time
+    try:
+        customizations = pod1_results.load_customizations(label)
+    except ValueError as e:
+        print(f"    ✗ Invalid customizations payload: {str(e)}")
+        clone_results[label] = {
+            'pod2_global_template_id': global_template_info_pod2.template_id,
+            'success': False,
+            'template_name': template_name,
+            'target_pod': target_pod
+        }
+        return
+    
+    # Prepare new name for cloned template (input rows may override it)
+    new_name = pod1_data['new_name'] or default_clone_name(template_name)
+    
+    clone_response = clone_mgr.clone_template(
+        source_customizations=customizations,
+        target_global_template_id=global_template_info_pod2.template_id,
+        new_template_name=new_name
+    )
+    
+    if clone_response:
+        # Save clone response
+        if artifacts is not None:
+            save_artifact(artifacts, label, POD2_CLONE_RESPONSE, clone_response)
         
-        clone_response = clone_mgr.clone_template(
-            source_customizations=pod1_data['customizations'],
-            target_global_template_id=global_template_info_pod2.template_id,
-            new_template_name=new_name
-        )
+        clone_results[label] = {
+            'pod2_global_template_id': global_template_info_pod2.template_id,
+            'new_cloned_template_id': clone_response.get('id'),
+            'success': True,
+            'template_name': template_name,
+            'target_pod': target_pod,
+            'target_tenant': pod2_tenant_id
+        }
         
-        if clone_response:
-            # Save clone response
-            safe_filename = template_name.replace(' ', '_').replace('/', '-')[:50]
-            clone_mgr.save_clone_response(
-                clone_response,
-                f"pod2_{safe_filename}_clone_response.json"
+        if verifier is not None and clone_response.get('id'):
+            verifier.submit(
+                label,
+                TemplateCustomizationsManager(pod2_auth, pod2_tenant_id),
+                clone_response['id'],
+                clone_mgr.prepare_clone_payload(
+                    customizations, global_template_info_pod2.template_id, new_name
+                )
             )
-            
-            clone_results[template_name] = {
-                'pod2_global_template_id': global_template_info_pod2.template_id,
-                'new_cloned_template_id': clone_response.get('id'),
-                'success': True
-            }
-        else:
-            clone_results[template_name] = {
-                'pod2_global_template_id': global_template_info_pod2.template_id,
-                'success': False
-            }
+            print("    ✓ Verification queued")
+    else:
+        clone_results[label] = {
+            'pod2_global_template_id': global_template_info_pod2.template_id,
+            'success': False,
+            'template_name': template_name,
+            'target_pod': target_pod
+        }
+
+
+def process_pod1_template(selection, index, pod1_auth, pod1_tenant_id, pod1_catalog,
+                          pod1_results, snapshot=None, artifacts=None):
+    """Run Steps 3-5 on POD-1 for one template, storing the result in pod1_results."""
+    template_name = selection.name
     
-    # ========================================================================
-    # SUMMARY
-    # ========================================================================
-    print("\n" + "=" * 80)
-    print("SUMMARY")
-    print("=" * 80)
+    print(f"\n  Processing [{index}]: {selection.label}")
+    print("  " + "-" * 60)
     
-    print("\nPOD-1 Results:")
-    for name, data in pod1_results.items():
-        print(f"  • {name}")
-        print(f"    Global Template ID: {data['global_template_id']}")
-        print(f"    Cloned Template ID: {data['cloned_template_id']}")
+    # STEP 3: Get Global Template ID from POD-1
+    print("\n  [Step 3] Getting global template ID...")
+    # Both lookups match the name exactly, ignoring case, so a template resolves
+    # the same way whether or not the catalog was built earlier in the run
+    if pod1_catalog.catalog is not None:
+        # Already indexed: resolve in-memory instead of querying by name
+        global_template_info = pod1_catalog.catalog.get(template_name)
+    else:
+        global_mgr = GlobalTemplateManager(pod1_auth, pod1_tenant_id)
+        global_template_info = global_mgr.get_global_template_by_name(template_name)
     
-    print("\nPOD-2 Clone Results:")
-    for name, data in clone_results.items():
-        status = "✓ Success" if data.get('success') else "✗ Failed"
-        print(f"  • {name}: {status}")
-        if data.get('new_cloned_template_id'):
-            print(f"    New Template ID: {data['new_cloned_template_id']}")
+    if not global_template_info:
+        print(f"    ✗ Global template not found: {template_name}")
+        catalog = pod1_catalog()
+        suggestions = catalog.suggest(template_name) if catalog is not None else []
+        for suggestion in suggestions:
+            print(f"      Did you mean: {suggestion}")
+        return
     
-    print("\n" + "=" * 80)
-    print("Template cloning completed!")
-    print("=" * 80)
+    print(f"    ✓ Global Template ID: {global_template_info.template_id}")
+    
+    # STEP 4: Get Cloned Template ID using Global Template ID as parent
+    print("\n  [Step 4] Getting cloned template ID...")
+    cloned_mgr = ClonedTemplateManager(pod1_auth, pod1_tenant_id)
+    cloned_template_info = cloned_mgr.get_cloned_template_by_parent_id(
+        global_template_info.template_id
+    )
+    
+    if not cloned_template_info:
+        print(f"    ✗ No cloned template found for parent: {global_template_info.template_id}")
+        return
+    
+    print(f"    ✓ Cloned Template ID: {cloned_template_info.template_id}")
+    print(f"    ✓ Cloned Template Name: {cloned_template_info.name}")
+    print(f"    ✓ Scope: {cloned_template_info.scope}")
+    
+    # STEP 5: Get Customizations (JSON body) of the cloned template
+    print("\n  [Step 5] Getting template customizations...")
+    customizations_mgr = TemplateCustomizationsManager(pod1_auth, pod1_tenant_id)
+    payload = download_customizations(customizations_mgr, cloned_template_info.template_id,
+                                      selection.label, artifacts)
+    
+    if payload is None:
+        print("    ✗ Failed to get template customizations")
+        return
+    
+    print("    ✓ Customizations retrieved successfully")
+    
+    # Store results for POD-2 processing (written to the run state on disk);
+    # the payload is parsed only when it is cloned
+    content_hash, compressed_payload = payload
+    pod1_data = {
+        'global_template_id': global_template_info.template_id,
+        'cloned_template_id': cloned_template_info.template_id,
+        'content_hash': content_hash,
+        'payload': compressed_payload,
+        'template_name': template_name,
+        'new_name': selection.new_name,
+        'target_pod': selection.target_pod,
+        'cloned_template_name': cloned_template_info.name,
+        'version': cloned_template_info.version
+    }
+    with compressed_payload:
+        pod1_results[selection.label] = pod1_data
+        
+        if snapshot is not None:
+            snapshot.add_template(selection.label, pod1_data)
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,187 @@
+"""
+Tests for the run steps in main.py.
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import pytest
+import main
+from artifacts.artifacts import ArtifactStore
+from catalog.catalog import LazyCatalog
+from config.settings import TemplateSelection, load_tenant_pairs
+from global_template.global_template import GlobalTemplateManager
+from limiter.limiter import DEFAULT_MAX_CONCURRENCY, PodLimits
+from scheduler.scheduler import SCHEDULER
+from state.state import RunStateStore
+
+
+@pytest.fixture
+def pod1(fake_network):
+    pod = fake_network.add_pod("pod1")
+    # "Linux Agent" is the first hit of a substring query for "Linux"
+    for name in ("Linux Agent", "Linux"):
+        pod.add_global(name)
+        pod.add_clone("client", name)
+    return pod
+
+
+def test_pod1_lookup_does_not_change_once_indexed(fake_network, pod1, tmp_path):
+    """A name resolves the same way before and after the catalog is built mid-run"""
+    auth = fake_network.auth("pod1")
+    catalog = LazyCatalog(GlobalTemplateManager(auth, "client"), "POD-1")
+
+    def extract(name):
+        with RunStateStore(tmp_path / "state.db") as state:
+            main.process_pod1_template(TemplateSelection(name), 1, auth, "client", catalog, state.pod1_results)
+            entry = dict(state.pod1_results.items()).get(name)
+            state.reset()
+        return entry and entry['global_template_id']
+
+    assert extract("LINUX") == "g-Linux"
+    assert pod1.calls[('GET', 'name')] == 1 and catalog.catalog is None
+    # Not found: the catalog is built for suggestions
+    assert extract("Lin") is None
+    assert catalog.catalog is not None
+
+    assert extract("LINUX") == "g-Linux"
+    assert extract("Lin") is None
+    assert pod1.calls[('GET', 'name')] == 2
+
+
+@pytest.fixture
+def concurrency():
+    yield
+    main.set_max_concurrency(DEFAULT_MAX_CONCURRENCY)
+    SCHEDULER.set_slots(1)
+
+
+@pytest.mark.parametrize('argv, workers, limits, slots', [
+    ([], 1, (1, 1), 1),
+    (['--concurrency', '4'], 4, (4, 4), 4),
+    (['--concurrency', '2', '--max-concurrency', '8'], 8, (2, 8), 8),
+    (['--concurrency', '2', '--max-concurrency', '8', '--pod-slots', '3'], 8, (2, 8), 3),
+    (['--concurrency', '2', '--verify', '--verify-workers', '4'], 2, (4, 4), 2),
+])
+def test_configure_concurrency(concurrency, argv, workers, limits, slots):
+    """Limits start at --concurrency and may grow to --max-concurrency, which sets the workers"""
+    args = main.parse_args(argv)
+    main.configure_concurrency(args)
+
+    assert main.template_workers(args) == workers
+    limiter = PodLimits("POD-test").read
+    assert (limiter.limit, limiter.max_limit) == limits
+    assert SCHEDULER.slots == slots
+
+
+def test_max_concurrency_below_concurrency_is_rejected(capsys):
+    with pytest.raises(SystemExit):
+        main.parse_args(['--concurrency', '4', '--max-concurrency', '2'])
+    assert "--max-concurrency" in capsys.readouterr().err
+
+
+@pytest.fixture
+def tenant_run(fake_network, tmp_path):
+    # POD-1 tenants src-a and src-b each hold a clone of "Linux"; POD-2 has the same global template
+    source, destination = fake_network.add_pod("pod1"), fake_network.add_pod("pod2")
+    source.add_global("Linux")
+    destination.add_global("Linux")
+    for tenant in ("src-a", "src-b"):
+        source.add_clone(tenant, "Linux")
+
+    (tmp_path / "templates.txt").write_text("Linux\n", encoding='utf-8')
+    (tmp_path / "tenants.csv").write_text("source_tenant,target_tenant,target_pod\nsrc-a,dst-a,\nsrc-b,dst-b,\n"
+                                          "src-a,dst-c,3\n", encoding='utf-8')
+    args = main.parse_args(['--tenants', str(tmp_path / "tenants.csv"), '--input', str(tmp_path / "templates.txt"),
+                            '--state', str(tmp_path / "run_state.db")])
+    pods = {1: (fake_network.auth("pod1"), "src-default"), 2: (fake_network.auth("pod2"), "dst-default")}
+    return args, pods, destination
+
+
+def run_pairs(args, pods, tmp_path):
+    with ArtifactStore(tmp_path / "artifacts") as store:
+        main.run_tenant_pairs(args, pods, load_tenant_pairs(args.tenants), store)
+
+
+def test_tenant_pairs_keep_their_own_state(tenant_run, tmp_path, capsys):
+    """Each pair gets its own state file; pairs that fail are summarised, the rest still run"""
+    args, pods, destination = tenant_run
+    run_pairs(args, pods, tmp_path)
+
+    for source, target in (("src-a", "dst-a"), ("src-b", "dst-b")):
+        path = tmp_path / f"run_state_{source}_to_{target}.db"
+        with RunStateStore(path) as state:
+            assert len(state.pod1_results) == 1 and len(state.clone_results) == 1
+        assert [t['name'] for t in destination.clones(target)] == [main.default_clone_name("Linux")]
+
+    out = capsys.readouterr().out
+    assert "src-a -> dst-a (POD2): ✓ 1 extracted, 1 cloned, 0 skipped, 0 failed" in out
+    assert "src-b -> dst-b (POD2): ✓ 1 extracted, 1 cloned" in out
+    assert "src-a -> dst-c (POD3): ✗ Failed: POD-3 is not configured" in out
+    assert f"Run state: {tmp_path / 'run_state_src-b_to_dst-b.db'}" in out
+
+
+def test_failing_pair_does_not_stop_the_others(tenant_run, tmp_path, capsys):
+    args, pods, destination = tenant_run
+    # A directory where the pair's state file belongs cannot be opened
+    (tmp_path / "run_state_src-a_to_dst-a.db").mkdir()
+    run_pairs(args, pods, tmp_path)
+
+    out = capsys.readouterr().out
+    assert "src-a -> dst-a (POD2): ✗ Failed:" in out
+    assert "src-b -> dst-b (POD2): ✓ 1 extracted, 1 cloned" in out
+    assert destination.clones("dst-a") == [] and len(destination.clones("dst-b")) == 1
+
+
+@pytest.fixture
+def pod_env(fake_network, monkeypatch):
+    # POD-1 to POD-3 configured against fake PODs; POD-3 rejects its client key
+    for n in (1, 2, 3):
+        fake_network.add_pod(f"pod{n}")
+        monkeypatch.setenv(f"POD{n}_BASE_URL", f"https://pod{n}")
+        monkeypatch.setenv(f"POD{n}_CLIENT_KEY", f"key{n}")
+        monkeypatch.setenv(f"POD{n}_CLIENT_SECRET", "secret")
+        monkeypatch.setenv(f"POD{n}_CLIENT_ID", f"tenant{n}")
+    fake_network.pods["pod3"].rejected_clients.add("key3")
+    return fake_network
+
+
+def test_authenticate_pods(pod_env):
+    pods, failures = main.authenticate_pods([1, 2, 3], warm_connections=2)
+
+    assert sorted(pods) == [1, 2] and list(failures) == [3]
+    assert pods[2][1] == "tenant2"
+    assert pod_env.pods["pod1"].calls[('HEAD', 'root')] == 2
+    assert pod_env.pods["pod3"].calls[('HEAD', 'root')] == 0
+
+
+def test_warm_up(pod_env):
+    auth = pod_env.auth("pod1")
+    assert auth.warm_up(0) == 0
+    assert auth.warm_up(3) == 3
+    # Capped at the pool size
+    assert auth.warm_up(auth.POOL_SIZE + 5) == auth.POOL_SIZE
+    assert pod_env.pods["pod1"].calls[('HEAD', 'root')] == 3 + auth.POOL_SIZE
+    # An unreachable POD opens nothing
+    assert pod_env.auth("pod9").warm_up(2) == 0
+
+
+@pytest.mark.parametrize('argv, required, optional', [
+    ([], [1], [2, 3]),
+    (['--target-pod', '3'], [1, 3], []),
+    (['extract'], [1], []),
+    (['cleanup'], [], [2, 3]),
+])
+def test_required_pods(pod_env, argv, required, optional):
+    assert main.required_pods(main.parse_args(argv)) == (required, optional)
+
+
+def test_unused_pod_failure_is_a_warning(pod_env, capsys):
+    """A POD only some rows might target does not stop the run when it fails"""
+    pods = main.connect_pods(main.parse_args([]))
+    assert sorted(pods) == [1, 2]
+    assert "⚠ POD-3 authentication failed" in capsys.readouterr().out
+
+    assert main.connect_pods(main.parse_args(['--target-pod', '3'])) is None
+    assert "✗ POD-3 authentication failed" in capsys.readouterr().out
@@ -0,0 +1 @@
+# Plan module
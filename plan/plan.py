@@ -0,0 +1,297 @@
+"""
+Plan Module
+Dry run of a migration: resolves every template on both PODs from bulk
+listings and estimates the API calls and bytes a real run needs.
+
+No template is fetched one by one and nothing is cloned. For each template
+the plan decides:
+
+    clone    - found on both sides, would be cloned
+    skip     - apply would skip it: the destination POD is not available or,
+               with skip_existing, a template with the new name already exists
+    missing  - global template missing on POD-1 or on the destination, or no
+               cloned template on POD-1
+
+Call counts follow the apply step (Steps 7-9 of main.py, one token per
+destination POD) and, when planning from live POD-1 data, the extraction
+(Steps 3-5). Byte counts are exact when planning from a snapshot, which holds
+the customization payloads; otherwise they are estimated from the sizes of
+the templates in the bulk listings.
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import requests
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from auth.auth import OpsRampAuth
+from catalog.catalog import TemplateCatalog
+from cloned_template.cloned_template import ClonedTemplateInfo, ClonedTemplateManager
+from clone_template.clone_template import CloneTemplateManager
+from codec.codec import dumps
+from global_template.global_template import GlobalTemplateInfo, GlobalTemplateManager
+
+ACTIONS = ('clone', 'skip', 'missing')
+
+DEFAULT_PLAN_PATH = Path(__file__).parent.parent / 'output' / 'plan.json'
+
+
+def _size(obj) -> int:
+    return len(dumps(obj)) if obj else 0
+
+
+class PlanEntry:
+    
+    def __init__(self, label: str, template_name: str, target_pod: int, new_name: str,
+                 action: str, reason: str = "", source_global_id: str = "",
+                 source_clone_id: str = "", source_version: str = "",
+                 target_global_id: str = "", existing_template_id: str = "",
+                 request_bytes: int = 0, response_bytes: int = 0, extract_bytes: int = 0):
+        self.label = label
+        self.template_name = template_name
+        self.target_pod = target_pod
+        self.new_name = new_name
+        self.action = action
+        self.reason = reason
+        self.source_global_id = source_global_id
+        self.source_clone_id = source_clone_id
+        self.source_version = source_version
+        self.target_global_id = target_global_id
+        self.existing_template_id = existing_template_id
+        # Clone request body and customizations sizes (exact from a snapshot, else estimated)
+        self.request_bytes = request_bytes
+        self.response_bytes = response_bytes
+        # Estimated bytes read from POD-1 by Steps 3-5
+        self.extract_bytes = extract_bytes
+    
+    def __repr__(self):
+        return f"PlanEntry(label='{self.label[:40]}', action='{self.action}')"
+    
+    def to_dict(self) -> Dict:
+        return {
+            'label': self.label,
+            'template_name': self.template_name,
+            'target_pod': self.target_pod,
+            'new_name': self.new_name,
+            'action': self.action,
+            'reason': self.reason,
+            'source_global_id': self.source_global_id,
+            'source_clone_id': self.source_clone_id,
+            'source_version': self.source_version,
+            'target_global_id': self.target_global_id,
+            'existing_template_id': self.existing_template_id,
+            'request_bytes': self.request_bytes,
+            'response_bytes': self.response_bytes,
+            'extract_bytes': self.extract_bytes
+        }
+
+
+class DestinationIndex:
+    """
+    Bulk-listed global and cloned templates of one destination tenant.
+    """
+    
+    def __init__(self, auth: OpsRampAuth, tenant_id: str, with_clones: bool):
+        self.clone_manager = CloneTemplateManager(auth, tenant_id)
+        self.catalog = TemplateCatalog.from_manager(GlobalTemplateManager(auth, tenant_id))
+        self.clones_by_name: Dict[str, ClonedTemplateInfo] = {}
+        self.clone_count = 0
+        if with_clones and self.catalog is not None:
+            try:
+                for template in ClonedTemplateManager(auth, tenant_id).iter_cloned_templates():
+                    self.clone_count += 1
+                    self.clones_by_name.setdefault(template.name.casefold(), template)
+            except requests.exceptions.RequestException as e:
+                print(f"  ✗ Failed to list cloned templates: {str(e)}")
+                self.catalog = None
+
+
+class MigrationPlanner:
+    """
+    Builds a plan from bulk listings of the source and destination PODs.
+    """
+    
+    def __init__(self, get_destination: Callable[[int], Optional[Tuple[OpsRampAuth, str]]],
+                 default_name: Callable[[str], str], skip_existing: bool = False,
+                 verify: bool = False):
+        """
+        Initialize MigrationPlanner.
+        
+        Args:
+            get_destination: Returns (auth, tenant_id) for a destination POD, None if unavailable
+            default_name: Builds the destination name from the template name
+            skip_existing: Skip templates whose new name already exists on the destination
+            verify: Count the verification read-back of every clone
+        """
+        self.get_destination = get_destination
+        self.default_name = default_name
+        self.skip_existing = skip_existing
+        self.verify = verify
+        self.destinations: Dict[int, Optional[DestinationIndex]] = {}
+        self.source_catalog: Optional[TemplateCatalog] = None
+        self.catalog_at: Optional[int] = None
+    
+    def destination(self, target_pod: int) -> Optional[DestinationIndex]:
+        if target_pod not in self.destinations:
+            destination = self.get_destination(target_pod)
+            self.destinations[target_pod] = (
+                DestinationIndex(*destination, with_clones=self.skip_existing) if destination else None
+            )
+        return self.destinations[target_pod]
+    
+    def plan_live(self, selections: Iterable, source_catalog: TemplateCatalog,
+                  source_clones: Dict[str, ClonedTemplateInfo],
+                  catalog_at: Optional[int] = None) -> List[PlanEntry]:
+        """
+        Plan from POD-1's bulk listings.
+        
+        Args:
+            selections: TemplateSelection objects (selectors already expanded)
+            source_catalog: Catalog of POD-1 global templates
+            source_clones: First cloned template per parent global template ID on POD-1
+            catalog_at: Position in selections at which the extraction indexes POD-1
+                        (0 with --catalog, else where the first selector was expanded);
+                        None if only a name missing on POD-1 would index it
+        """
+        self.source_catalog = source_catalog
+        self.catalog_at = catalog_at
+        entries = []
+        for selection in selections:
+            new_name = selection.new_name or self.default_name(selection.name)
+            entry = PlanEntry(selection.label, selection.name, selection.target_pod, new_name, 'missing')
+            entries.append(entry)
+            
+            source_global: Optional[GlobalTemplateInfo] = source_catalog.get(selection.name)
+            if source_global is None:
+                entry.reason = "global template not found on POD-1"
+                continue
+            entry.source_global_id = source_global.template_id
+            entry.extract_bytes = _size(source_global.raw_response)
+            
+            source_clone = source_clones.get(source_global.template_id)
+            if source_clone is None:
+                entry.reason = "no cloned template on POD-1"
+                continue
+            entry.source_clone_id = source_clone.template_id
+            entry.source_version = source_clone.version
+            # The listing item stands in for the customizations response
+            entry.response_bytes = _size(source_clone.raw_response)
+            entry.extract_bytes += 2 * entry.response_bytes
+            
+            self._plan_destination(entry, source_clone.raw_response)
+        return entries
+    
+    def plan_snapshot(self, snapshot_entries: Iterable[Tuple[Dict, Dict]]) -> List[PlanEntry]:
+        """
+        Plan from a snapshot's (entry, customizations) pairs; body sizes are exact.
+        """
+        entries = []
+        for data, customizations in snapshot_entries:
+            new_name = data['new_name'] or self.default_name(data['template_name'])
+            entry = PlanEntry(data['label'], data['template_name'], data['target_pod'], new_name, 'missing',
+                              source_global_id=data['global_template_id'],
+                              source_clone_id=data['cloned_template_id'],
+                              source_version=data.get('version') or "")
+            entries.append(entry)
+            self._plan_destination(entry, customizations)
+        return entries
+    
+    def _plan_destination(self, entry: PlanEntry, customizations: Dict) -> None:
+        
+        destination = self.destination(entry.target_pod)
+        if destination is None or destination.catalog is None:
+            # apply skips templates for PODs it cannot authenticate with
+            entry.action = 'skip'
+            entry.reason = f"POD-{entry.target_pod} is not available"
+            return
+        
+        existing = destination.clones_by_name.get(entry.new_name.casefold())
+        if existing is not None:
+            entry.action = 'skip'
+            entry.reason = f"'{entry.new_name}' already exists on POD-{entry.target_pod}"
+            entry.existing_template_id = existing.template_id
+            return
+        
+        target_global = destination.catalog.get(entry.template_name)
+        if target_global is None:
+            entry.reason = f"global template not found on POD-{entry.target_pod}"
+            return
+        
+        entry.action = 'clone'
+        entry.target_global_id = target_global.template_id
+        payload = destination.clone_manager.prepare_clone_payload(customizations, target_global.template_id,
+                                                                  entry.new_name)
+        entry.request_bytes = _size(payload)
+    
+    def estimate(self, entries: List[PlanEntry]) -> Dict:
+        """
+        API calls and bytes needed per POD to carry out the plan.
+        
+        Returns:
+            {'apply': {pod: counts}, 'extract': {1: counts} or None (from a snapshot)},
+            where counts holds token, get, post, request_bytes and response_bytes
+        """
+        def counts():
+            return {'token': 1, 'get': 0, 'post': 0, 'request_bytes': 0, 'response_bytes': 0}
+        
+        apply = {}
+        for entry in entries:
+            destination = self.destinations.get(entry.target_pod)
+            if destination is None or destination.catalog is None:
+                continue
+            pod = apply.setdefault(entry.target_pod, counts())
+            if entry.action == 'missing' and entry.source_clone_id:
+                # Step 7 runs and finds nothing
+                pod['get'] += 1
+            elif entry.action == 'clone':
+                target_global = destination.catalog.get(entry.template_name)
+                pod['get'] += 1
+                pod['response_bytes'] += _size(target_global.raw_response)
+                pod['post'] += 1
+                pod['request_bytes'] += entry.request_bytes
+                if self.verify:
+                    pod['get'] += 1
+                    pod['response_bytes'] += entry.request_bytes
+        
+        if self.skip_existing:
+            for target_pod, destination in self.destinations.items():
+                if destination is not None and target_pod in apply:
+                    pages = max(1, -(-destination.clone_count // ClonedTemplateManager.PAGE_SIZE))
+                    apply[target_pod]['get'] += pages
+        
+        extract = None
+        if self.source_catalog is not None:
+            extract = self._estimate_extract(entries, counts())
+            extract = {1: extract}
+        
+        return {'apply': apply, 'extract': extract}
+    
+    def _estimate_extract(self, entries: List[PlanEntry], pod: Dict) -> Dict:
+        # Steps 3-5 in input order, one template at a time. Like the run, Step 3 looks
+        # names up one by one until the catalog is built: at catalog_at, or by the first
+        # name missing on POD-1 (for suggestions); later names resolve from the catalog.
+        catalog_built = False
+        
+        def build_catalog():
+            pages = max(1, -(-len(self.source_catalog) // GlobalTemplateManager.PAGE_SIZE))
+            pod['get'] += pages
+            pod['response_bytes'] += sum(_size(template.raw_response)
+                                         for template in self.source_catalog.by_name.values())
+            return True
+        
+        for index, entry in enumerate(entries):
+            if not catalog_built and self.catalog_at is not None and index >= self.catalog_at:
+                catalog_built = build_catalog()
+            if not catalog_built:
+                pod['get'] += 1
+                if not entry.source_global_id:
+                    catalog_built = build_catalog()
+            if entry.source_global_id:
+                pod['get'] += 2 if entry.source_clone_id else 1
+            pod['response_bytes'] += entry.extract_bytes
+        
+        if not catalog_built and self.catalog_at is not None:
+            # A selector that matched nothing still built it
+            build_catalog()
+        return pod
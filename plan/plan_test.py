@@ -0,0 +1,161 @@
+"""
+Tests for the plan estimate, compared with the requests a real run makes.
+
+Both the run and the plan talk to an in-memory fake of the OpsRamp template
+API, installed like the record/replay transport.
+"""
+import argparse
+import io
+import json
+import sys
+from collections import Counter
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+import main
+from auth.auth import OpsRampAuth
+from scheduler.scheduler import PriorityRules
+from state.state import RunStateStore
+from transport.transport import install_transport
+
+
+class FakePod:
+    """
+    Global templates, cloned templates and customizations of one tenant per host.
+    """
+
+    def __init__(self, global_names, clone_names):
+        self.globals = [{'id': f"g-{name}", 'name': name, 'scope': 'GLOBAL'} for name in global_names]
+        self.clones = [{'id': f"c-{name}", 'name': f"Clone of {name}", 'parentUUID': f"g-{name}",
+                        'scope': 'CLIENT', 'version': 1} for name in clone_names]
+
+    def templates(self, query, params):
+        if query.startswith('scope:GLOBAL+name:'):
+            name = query[len('scope:GLOBAL+name:'):]
+            return {'results': [t for t in self.globals if t['name'] == name][:1]}
+        if '+parentId:' in query:
+            parent_id = query.split('+parentId:', 1)[1]
+            return {'results': [t for t in self.clones if t['parentUUID'] == parent_id][:1]}
+        items = self.globals if query == 'scope:GLOBAL' else self.clones
+        page_no, page_size = int(params['pageNo'][0]), int(params['pageSize'][0])
+        page = items[(page_no - 1) * page_size:page_no * page_size]
+        return {'results': page, 'nextPage': page_no * page_size < len(items)}
+
+    def template(self, template_id):
+        clone = next(t for t in self.clones if t['id'] == template_id)
+        return dict(clone, monitors=[{'metric': 'cpu', 'threshold': 90}])
+
+
+class FakeTransport:
+    # Serves FakePods by host and counts (host, method) of every request
+
+    def __init__(self, pods):
+        self.pods = pods
+        self.calls = Counter()
+
+    def adapter(self, **pool_kwargs):
+        return FakeAdapter(self)
+
+    def send(self, request):
+        parts = urlsplit(request.url)
+        pod = self.pods[parts.hostname]
+        params = parse_qs(parts.query)
+        self.calls[(parts.hostname, request.method)] += 1
+
+        if parts.path.endswith('/oauth/token'):
+            return {'access_token': 'token', 'token_type': 'bearer', 'expires_in': 7200}
+        if parts.path.endswith('/templates/clone'):
+            return {'id': f"new-{json.loads(request.body)['name']}"}
+        if parts.path.endswith('/templates'):
+            return pod.templates(params['queryString'][0], params)
+        return pod.template(parts.path.rsplit('/', 1)[1])
+
+
+class FakeAdapter(BaseAdapter):
+
+    def __init__(self, transport):
+        super().__init__()
+        self.transport = transport
+
+    def send(self, request, **kwargs):
+        response = requests.Response()
+        response.status_code = 200
+        response.headers = CaseInsensitiveDict({'Content-Type': 'application/json'})
+        response.raw = io.BytesIO(json.dumps(self.transport.send(request)).encode('utf-8'))
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def fake_pods():
+    # POD-1: A-F exist, E has no clone; POD-2 lacks D
+    transport = FakeTransport({
+        'pod1': FakePod(list("ABCDEF"), list("ABCDF")),
+        'pod2': FakePod(list("ABCEF"), [])
+    })
+    install_transport(transport)
+    try:
+        pods = {1: (OpsRampAuth("https://pod1", "id", "secret"), "source"),
+                2: (OpsRampAuth("https://pod2", "id", "secret"), "target")}
+        for auth, _ in pods.values():
+            auth.get_token()
+        yield transport, pods
+    finally:
+        install_transport(None)
+
+
+def make_args(tmp_path, names, **overrides):
+    values = dict(input=list(names), input_format='text', catalog=False, priorities=PriorityRules(),
+                  shard=None, concurrency=1, max_concurrency=None, template_deadline=None, target_pod=None,
+                  verify=False, verify_workers=1, skip_existing=False, snapshot=None,
+                  plan_file=str(tmp_path / "plan.json"))
+    values.update(overrides)
+    return argparse.Namespace(**values)
+
+
+def run_calls(transport, pods, args, tmp_path):
+    # Requests made by Steps 3-5 and 7-8 of a real run
+    transport.calls.clear()
+    with RunStateStore(tmp_path / "run_state.db") as state:
+        assert main.extract_pod1(args, state, pods)
+        main.clone_to_destinations(args, state, pods)
+    return transport.calls
+
+
+def plan_estimate(pods, args):
+    main.run_plan(args, dict(pods))
+    with open(args.plan_file, encoding='utf-8') as f:
+        return json.load(f)['estimate']
+
+
+@pytest.mark.parametrize('names, options', [
+    # A name missing on POD-1 builds the catalog mid-run: earlier names were looked up one by one
+    (["A", "B", "C", "Missing", "D", "E", "F"], {}),
+    (["A", "B", "C", "D", "E", "F"], {}),
+    (["Missing", "A", "B"], {}),
+    (["A", "B", "C", "D"], {'catalog': True}),
+    (["A", "glob:[EF]", "B"], {}),
+])
+def test_estimate_matches_recorded_run(fake_pods, tmp_path, names, options):
+    """The plan's GET/POST counts equal those of the run it plans"""
+    transport, pods = fake_pods
+    args = make_args(tmp_path, names, **options)
+
+    estimate = plan_estimate(pods, args)
+    calls = run_calls(transport, pods, args, tmp_path)
+
+    assert estimate['extract']['POD-1']['get'] == calls[('pod1', 'GET')]
+    assert estimate['extract']['POD-1']['post'] == 0
+    assert estimate['apply']['POD-2']['get'] == calls[('pod2', 'GET')]
+    assert estimate['apply']['POD-2']['post'] == calls[('pod2', 'POST')]
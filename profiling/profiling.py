@@ -0,0 +1,252 @@
+"""
+Profiling Module
+Optional run profiler enabled with `main.py --profile`.
+
+Collects, for the whole run:
+    - a cProfile CPU profile of the main thread and of every thread started
+      during the run (worker pools included), merged into one profile that
+      is also saved as .pstats
+    - tracemalloc snapshots around every stage, reported as the top
+      allocating source lines of that stage and the peak traced memory
+      (the snapshots are taken outside the stage's timing; their own cost
+      is reported separately)
+    - time blocked on the network (every requests.Session.request call,
+      including reading the body, plus reading streamed (stream=True) bodies,
+      taken from TRANSFER_STATS), JSON encoding/decoding and file I/O
+      (artefact blobs, run state/snapshot rows and output files), taken from
+      TRANSFER_STATS
+
+The report is written as plain text next to the run output.
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import cProfile
+import io
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import requests
+from codec.codec import TRANSFER_STATS
+
+DEFAULT_REPORT_PATH = Path(__file__).parent.parent / 'output' / 'profile_report.txt'
+
+# Frames kept per traced allocation
+TRACEMALLOC_FRAMES = 10
+
+
+class StageProfile:
+    
+    def __init__(self, name: str, wall_seconds: float, network_seconds: float,
+                 peak_bytes: int, top_allocations: List[str], snapshot_seconds: float = 0.0):
+        self.name = name
+        self.wall_seconds = wall_seconds
+        self.network_seconds = network_seconds
+        self.peak_bytes = peak_bytes
+        self.top_allocations = top_allocations
+        # Time spent taking the tracemalloc snapshots (not part of wall_seconds)
+        self.snapshot_seconds = snapshot_seconds
+    
+    def to_dict(self) -> Dict:
+        return {
+            'name': self.name,
+            'wall_seconds': self.wall_seconds,
+            'network_seconds': self.network_seconds,
+            'peak_bytes': self.peak_bytes,
+            'top_allocations': self.top_allocations,
+            'snapshot_seconds': self.snapshot_seconds
+        }
+
+
+class RunProfiler:
+    """
+    CPU, allocation and blocking-time profiler for one run.
+    """
+    
+    def __init__(self, report_path: Optional[str] = None, top: int = 15):
+        """
+        Initialize RunProfiler.
+        
+        Args:
+            report_path: Text report location (default: output/profile_report.txt);
+                         the CPU profile is saved alongside with a .pstats suffix
+            top: Number of functions and allocation sites listed per section
+        """
+        self.report_path = Path(report_path) if report_path else DEFAULT_REPORT_PATH
+        self.top = top
+        self.stages: List[StageProfile] = []
+        
+        self._cpu = cProfile.Profile()
+        # One profile per thread started during the run (cProfile follows a single thread)
+        self._thread_cpu: List[cProfile.Profile] = []
+        # Set when the main profile already records every thread (Python 3.12+)
+        self._shared_cpu = False
+        self._lock = threading.Lock()
+        self._network_calls = 0
+        self._network_seconds = 0.0
+        self._original_request = None
+        self._started_at = None
+        self._start_time = 0.0
+        self._transfer_start: Dict = {}
+    
+    def start(self) -> None:
+        self._started_at = datetime.now()
+        self._start_time = time.perf_counter()
+        self._transfer_start = TRANSFER_STATS.to_dict()
+        self._patch_requests()
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+        threading.setprofile(self._profile_thread)
+        self._cpu.enable()
+    
+    def stop(self) -> None:
+        self._cpu.disable()
+        threading.setprofile(None)
+        tracemalloc.stop()
+        self._unpatch_requests()
+    
+    def _profile_thread(self, frame, event, arg) -> None:
+        # Installed in every new thread by threading.setprofile; runs once and
+        # replaces itself with a cProfile profile for that thread
+        sys.setprofile(None)
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Python 3.12+: the main profile already records every thread
+            self._shared_cpu = True
+            return
+        with self._lock:
+            self._thread_cpu.append(profile)
+    
+    def cpu_stats(self, stream=None) -> pstats.Stats:
+        """
+        CPU profile of the main thread merged with those of the worker threads.
+        """
+        with self._lock:
+            thread_profiles = list(self._thread_cpu)
+        stats = pstats.Stats(self._cpu, stream=stream)
+        for profile in thread_profiles:
+            stats.add(profile)
+        return stats
+    
+    def network_seconds(self) -> float:
+        # Session.request calls plus streamed bodies, which are read after they return
+        receive_seconds = TRANSFER_STATS.to_dict()['receive_seconds'] - self._transfer_start.get('receive_seconds', 0)
+        return self._network_seconds + receive_seconds
+    
+    def _patch_requests(self) -> None:
+        # Every manager call goes through Session.request (body included unless stream=True)
+        profiler = self
+        original = requests.Session.request
+        
+        def timed_request(session, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return original(session, *args, **kwargs)
+            finally:
+                with profiler._lock:
+                    profiler._network_calls += 1
+                    profiler._network_seconds += time.perf_counter() - start
+        
+        self._original_request = original
+        requests.Session.request = timed_request
+    
+    def _unpatch_requests(self) -> None:
+        if self._original_request is not None:
+            requests.Session.request = self._original_request
+            self._original_request = None
+    
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Profile one stage of the run (wall time, network time, allocations).
+        """
+        snapshot_start = time.perf_counter()
+        before = tracemalloc.take_snapshot()
+        snapshot_seconds = time.perf_counter() - snapshot_start
+        tracemalloc.reset_peak()
+        network_before = self.network_seconds()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - start
+            network = self.network_seconds() - network_before
+            _, peak = tracemalloc.get_traced_memory()
+            snapshot_start = time.perf_counter()
+            after = tracemalloc.take_snapshot()
+            snapshot_seconds += time.perf_counter() - snapshot_start
+            
+            filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+            diff = after.filter_traces(filters).compare_to(before.filter_traces(filters), 'lineno')
+            top_allocations = [str(stat) for stat in diff[:self.top] if stat.size_diff > 0]
+            
+            self.stages.append(StageProfile(name, wall, network, peak, top_allocations, snapshot_seconds))
+    
+    def write_report(self) -> Path:
+        """
+        Write the text report and the .pstats CPU profile.
+        
+        Returns:
+            Path of the text report
+        """
+        self.report_path.parent.mkdir(parents=True, exist_ok=True)
+        pstats_path = self.report_path.with_suffix('.pstats')
+        stream = io.StringIO()
+        stats = self.cpu_stats(stream)
+        stats.dump_stats(str(pstats_path))
+        
+        total = time.perf_counter() - self._start_time
+        transfer = TRANSFER_STATS.to_dict()
+        delta = {field: transfer[field] - self._transfer_start.get(field, 0) for field in transfer}
+        
+        network_seconds = self._network_seconds + delta['receive_seconds']
+        json_seconds = delta['decode_seconds'] + delta['encode_seconds'] + delta['file_encode_seconds']
+        
+        lines = [
+            "OpsRamp Template Cloning Tool - Profile Report",
+            f"Started: {self._started_at.isoformat(timespec='seconds')}",
+            f"Command: {' '.join(sys.argv)}",
+            f"Wall time: {total:.3f}s",
+            "",
+            "Blocking time (summed over all threads)",
+            "-" * 60,
+            f"  Network:    {network_seconds:9.3f}s  ({self._network_calls} requests, "
+            f"streamed bodies {delta['receive_seconds']:.3f}s)",
+            f"  JSON:       {json_seconds:9.3f}s  (decode {delta['decode_seconds']:.3f}s, "
+            f"request bodies {delta['encode_seconds']:.3f}s, "
+            f"blobs and output files {delta['file_encode_seconds']:.3f}s)",
+            f"  File I/O:   {delta['file_write_seconds']:9.3f}s  ({delta['file_writes']} writes to blobs, "
+            f"SQLite and output files, {delta['file_write_bytes']} bytes)",
+            f"  Other:      {max(0.0, total - network_seconds - json_seconds - delta['file_write_seconds']):9.3f}s"
+            "  (wall time minus the above)",
+            "",
+            "Stages",
+            "-" * 60,
+        ]
+        for stage in self.stages:
+            lines.append(f"  {stage.name:<24} wall {stage.wall_seconds:8.3f}s  network {stage.network_seconds:8.3f}s  "
+                         f"peak traced memory {stage.peak_bytes / 1024 / 1024:.1f} MB  "
+                         f"(snapshots {stage.snapshot_seconds:.3f}s, not included)")
+        
+        for stage in self.stages:
+            lines += ["", f"Top allocations: {stage.name}", "-" * 60]
+            lines += [f"  {allocation}" for allocation in stage.top_allocations] or ["  (none)"]
+        
+        stats.sort_stats('cumulative').print_stats(self.top * 2)
+        with self._lock:
+            threads = "all threads" if self._shared_cpu else f"main thread and {len(self._thread_cpu)} worker thread(s)"
+        lines += ["", f"CPU profile, {threads} (cumulative)", "-" * 60,
+                  stream.getvalue().strip(),
+                  "", f"Full CPU profile: {pstats_path} (python -m pstats {pstats_path.name})"]
+        
+        with open(self.report_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        return self.report_path
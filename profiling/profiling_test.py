@@ -0,0 +1,87 @@
+"""
+Tests for the run profiler.
+"""
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+import requests
+from profiling.profiling import RunProfiler
+
+
+@pytest.fixture
+def profiler(tmp_path):
+    profiler = RunProfiler(tmp_path / "profile_report.txt")
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+
+
+def busy_worker(n):
+    return sum(i * i for i in range(n))
+
+
+def test_worker_threads_are_profiled(profiler):
+    """Threads started during the run are merged into the CPU profile"""
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        list(executor.map(busy_worker, [20000] * 4))
+    thread = threading.Thread(target=busy_worker, args=(1000,))
+    thread.start()
+    thread.join()
+    profiler.stop()
+
+    path = profiler.write_report()
+    functions = {name for _, _, name in pstats.Stats(str(path.with_suffix('.pstats'))).stats}
+    assert 'busy_worker' in functions
+    assert "CPU profile, " in path.read_text(encoding='utf-8')
+
+
+def test_stop_restores_hooks(tmp_path):
+    original = requests.Session.request
+    profiler = RunProfiler(tmp_path / "profile_report.txt")
+    profiler.start()
+    assert requests.Session.request is not original
+    profiler.stop()
+
+    assert requests.Session.request is original
+    assert threading.getprofile() is None
+    assert not tracemalloc.is_tracing()
+
+
+def test_stage_allocations_and_timing(profiler):
+    with profiler.stage('allocate'):
+        data = [bytes(1024) for _ in range(2000)]
+        time.sleep(0.01)
+
+    stage = profiler.stages[0]
+    assert stage.name == 'allocate' and len(data) == 2000
+    assert stage.peak_bytes >= 2000 * 1024
+    assert any("profiling_test.py" in allocation for allocation in stage.top_allocations)
+    # Snapshot time is measured on its own, outside the stage's wall time
+    assert stage.wall_seconds >= 0.01 and stage.snapshot_seconds > 0
+    assert stage.to_dict()['snapshot_seconds'] == stage.snapshot_seconds
+
+
+def test_stage_network_time(fake_network, profiler):
+    fake_network.add_pod("pod1")
+    auth = fake_network.auth("pod1")
+    with profiler.stage('authenticate'):
+        auth.get_token()
+    with profiler.stage('idle'):
+        pass
+
+    assert profiler.stages[0].network_seconds > 0
+    assert profiler.stages[1].network_seconds == 0
+    profiler.stop()
+    report = profiler.write_report().read_text(encoding='utf-8')
+    assert "(1 requests," in report
+    assert "authenticate" in report and "snapshots" in report
@@ -0,0 +1,269 @@
+"""
+Scheduler Module
+Priority order, per-POD template slots and fair sharing between tenants.
+
+Templates are given a priority (default 0, higher goes first) by a 'priority'
+column of CSV/JSONL input rows or by --priority SELECTOR=N rules. Work is
+scheduled at two points:
+
+    - input order: once a template with a non-zero priority is read,
+      prioritized() reorders templates within a small read-ahead window
+      before they reach the worker threads; inputs without priorities keep
+      streaming in input order
+    - slots: every template job (extract on POD-1, clone on its destination)
+      holds one of its POD's slots while it runs. A freed slot goes to the
+      waiting job with the highest priority; on a tie, to the tenant with the
+      fewest jobs running on that POD, then the tenant served least so far,
+      then the job that has waited longest
+
+With several tenant pairs (--tenants) the pairs' worker threads compete for
+the same slots, so a tenant whose templates are slow cannot hold every slot
+while the others wait. Jobs still waiting when the run is cancelled or passes
+its deadline are not started.
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from catalog.catalog import TemplateCatalog, is_selector
+from deadline.deadline import RUN
+
+# Templates read ahead of the workers to find the most urgent one; the slots
+# then start the most urgent of the templates waiting for them
+PRIORITY_WINDOW = 100
+
+# Seconds between cancellation checks while waiting for a slot
+WAIT_POLL = 0.5
+
+
+def parse_priority_rule(text: str) -> Tuple[str, int]:
+    """
+    Parse a --priority rule 'NAME_OR_SELECTOR=N'.
+
+    Raises:
+        ValueError: If the rule has no '=N' part or N is not an integer
+    """
+    target, sep, value = text.rpartition('=')
+    target = target.strip()
+    if not sep or not target:
+        raise ValueError(f"Invalid priority rule {text!r}, expected NAME_OR_SELECTOR=N")
+    try:
+        return target, int(value.strip())
+    except ValueError:
+        raise ValueError(f"Invalid priority in rule {text!r}: {value.strip()!r}")
+
+
+class PriorityRules:
+    """
+    --priority rules, and the priorities templates were given during extraction.
+    """
+
+    def __init__(self, rules: Iterable[Tuple[str, int]] = ()):
+        self.rules = list(rules)
+        # Template name (case-folded) -> priority from the rules
+        self.by_name: Optional[Dict[str, int]] = None
+        # Result label -> priority the template was extracted with
+        self.by_label: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __bool__(self):
+        return bool(self.rules)
+
+    def in_use(self) -> bool:
+        # True once any rule exists or any template was extracted with a priority
+        with self._lock:
+            return bool(self.rules) or any(self.by_label.values())
+
+    def resolve(self, catalog: Optional[TemplateCatalog]) -> None:
+        """
+        Match the rules against a catalog; a template matched by several rules
+        gets the highest of their priorities.
+
+        Without a catalog only rules naming a template exactly can match.
+        """
+        by_name: Dict[str, int] = {}
+        for target, priority in self.rules:
+            if is_selector(target):
+                if catalog is None:
+                    continue
+                try:
+                    names = [template.name for template in catalog.resolve(target)]
+                except ValueError as e:
+                    print(f"  ✗ Priority rule ignored: {str(e)}")
+                    continue
+            else:
+                names = [target]
+            for name in names:
+                key = name.casefold()
+                by_name[key] = max(by_name.get(key, priority), priority)
+
+        with self._lock:
+            self.by_name = by_name
+
+    def for_selection(self, selection) -> int:
+        # Highest of the input row's priority and the rules'; remembered for cloning
+        # unless for_result would give the same (0, or the rule's priority) without it
+        priority = selection.priority
+        rule = (self.by_name or {}).get(selection.name.casefold())
+        if rule is not None:
+            priority = max(priority, rule)
+        if priority != (rule or 0):
+            with self._lock:
+                self.by_label[selection.label] = priority
+        return priority
+
+    def for_result(self, label: str, template_name: str) -> int:
+        # Priority of a POD-1 result; templates loaded from a snapshot only have the rules
+        with self._lock:
+            if label in self.by_label:
+                return self.by_label[label]
+            return (self.by_name or {}).get(template_name.casefold(), 0)
+
+
+def prioritized(items: Iterable[Any], priority: Callable[[Any], int],
+                window: int = PRIORITY_WINDOW) -> Iterator[Any]:
+    """
+    Yield items highest priority first, equal priorities in input order.
+
+    Items pass straight through while every priority seen is 0. From the first
+    non-zero priority on, up to `window` items are read ahead of the one
+    yielded, so inputs are reordered within that window only and memory stays bounded.
+    """
+    heap: List[Tuple[int, int, Any]] = []
+    counter = itertools.count()
+    reorder = False
+    for item in items:
+        item_priority = priority(item)
+        reorder = reorder or item_priority != 0
+        if not reorder:
+            yield item
+            continue
+        heapq.heappush(heap, (-item_priority, next(counter), item))
+        if len(heap) > window:
+            yield heapq.heappop(heap)[2]
+    while heap:
+        yield heapq.heappop(heap)[2]
+
+
+class _Job:
+    # A template job waiting for a slot
+
+    def __init__(self, tenant: str, priority: int, seq: int):
+        self.tenant = tenant
+        self.priority = priority
+        self.seq = seq
+        self.queued_at = time.perf_counter()
+
+
+class SlotScheduler:
+    """
+    Grants each POD's template slots to waiting jobs by priority and tenant share.
+    """
+
+    def __init__(self, slots: int = 1):
+        self.slots = max(1, slots)
+        self._condition = threading.Condition()
+        self._seq = itertools.count()
+        self._waiting: Dict[int, List[_Job]] = {}
+        self._running: Dict[int, int] = {}
+        self._running_by_tenant: Dict[Tuple[int, str], int] = {}
+        # (pod, tenant) -> {'started', 'not_started', 'wait_seconds', 'max_wait_seconds'}
+        self._stats: Dict[Tuple[int, str], Dict] = {}
+
+    def set_slots(self, slots: int) -> None:
+        with self._condition:
+            self.slots = max(1, slots)
+            self._condition.notify_all()
+
+    def _next_job(self, pod: int) -> _Job:
+        def rank(job: _Job):
+            stats = self._stats.get((pod, job.tenant), {})
+            return (-job.priority, self._running_by_tenant.get((pod, job.tenant), 0),
+                    stats.get('started', 0), job.seq)
+        return min(self._waiting[pod], key=rank)
+
+    def _record(self, pod: int, tenant: str) -> Dict:
+        return self._stats.setdefault((pod, tenant), {
+            'started': 0, 'not_started': 0, 'wait_seconds': 0.0, 'max_wait_seconds': 0.0
+        })
+
+    @contextmanager
+    def slot(self, pod: int, tenant: str, priority: int = 0) -> Iterator[bool]:
+        """
+        Hold one of the POD's slots for the duration of the block.
+
+        Args:
+            pod: POD the job works on
+            tenant: Tenant the job works for (slots are shared fairly between tenants)
+            priority: Higher priorities are granted first
+
+        Yields:
+            True once the slot is held, False if the run stopped while waiting
+            (the job should then not start)
+        """
+        job = _Job(tenant, priority, next(self._seq))
+        with self._condition:
+            waiting = self._waiting.setdefault(pod, [])
+            waiting.append(job)
+            while not (self._running.get(pod, 0) < self.slots and self._next_job(pod) is job):
+                if RUN.stopped():
+                    waiting.remove(job)
+                    self._record(pod, tenant)['not_started'] += 1
+                    self._condition.notify_all()
+                    break
+                self._condition.wait(WAIT_POLL)
+            else:
+                waiting.remove(job)
+                self._running[pod] = self._running.get(pod, 0) + 1
+                self._running_by_tenant[(pod, tenant)] = self._running_by_tenant.get((pod, tenant), 0) + 1
+
+                waited = time.perf_counter() - job.queued_at
+                stats = self._record(pod, tenant)
+                stats['started'] += 1
+                stats['wait_seconds'] += waited
+                stats['max_wait_seconds'] = max(stats['max_wait_seconds'], waited)
+                job = None
+
+        if job is not None:
+            yield False
+            return
+
+        try:
+            yield True
+        finally:
+            with self._condition:
+                self._running[pod] -= 1
+                self._running_by_tenant[(pod, tenant)] -= 1
+                self._condition.notify_all()
+
+    def to_dict(self) -> Dict:
+        with self._condition:
+            return {
+                'slots_per_pod': self.slots,
+                'jobs': [dict(stats, pod=pod, tenant=tenant)
+                         for (pod, tenant), stats in sorted(self._stats.items())]
+            }
+
+    def report_lines(self) -> List[str]:
+        values = self.to_dict()
+        lines = []
+        for stats in values['jobs']:
+            average = stats['wait_seconds'] / stats['started'] if stats['started'] else 0.0
+            line = (f"POD-{stats['pod']} tenant {stats['tenant']}: {stats['started']} job(s) on "
+                    f"{values['slots_per_pod']} slot(s), waited {average:.2f}s on average "
+                    f"(max {stats['max_wait_seconds']:.2f}s)")
+            if stats['not_started']:
+                line += f", {stats['not_started']} not started"
+            lines.append(line)
+        return lines
+
+
+# Slots shared by every thread of the run (main.py sets the slot count from --pod-slots)
+SCHEDULER = SlotScheduler()
@@ -0,0 +1,133 @@
+"""
+Tests for priority order and per-POD slot scheduling.
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+from catalog.catalog import TemplateCatalog
+from config.settings import TemplateSelection
+from deadline.deadline import RUN
+from global_template.global_template import GlobalTemplateInfo
+from scheduler.scheduler import PriorityRules, SlotScheduler, parse_priority_rule, prioritized
+
+
+def test_parse_priority_rule():
+    assert parse_priority_rule("app:hpe-alletra & type:Battery = 10") == ("app:hpe-alletra & type:Battery", 10)
+    assert parse_priority_rule("a=b=-1") == ("a=b", -1)
+    for rule in ("no priority", "=5", "name=high"):
+        with pytest.raises(ValueError):
+            parse_priority_rule(rule)
+
+
+def test_prioritized_streams_without_priorities():
+    """Items without priorities are yielded before the next one is read"""
+    read = []
+
+    def source():
+        for item in range(5):
+            read.append(item)
+            yield item
+
+    stream = prioritized(source(), lambda item: 0)
+    assert next(stream) == 0 and read == [0]
+    assert list(stream) == [1, 2, 3, 4]
+
+
+def test_prioritized_reorders_within_window():
+    """From the first non-zero priority, higher priorities go first within the window"""
+    priorities = {'a': 0, 'b': 0, 'c': 5, 'd': 0, 'e': 9, 'f': 5}
+    assert list(prioritized(priorities, priorities.get)) == ['a', 'b', 'e', 'c', 'f', 'd']
+
+    # With a window of 2, 'c' is yielded before 'e' has been read
+    assert list(prioritized(['c', 'd', 'a', 'e', 'f'], priorities.get, window=2)) == ['c', 'e', 'f', 'd', 'a']
+
+
+def test_priority_rules_resolve_and_remember():
+    rules = PriorityRules([("glob:*Battery", 5), ("Disk", 3), ("hpe Battery", 7)])
+    catalog = TemplateCatalog([GlobalTemplateInfo("1", "hpe Battery"), GlobalTemplateInfo("2", "Disk")])
+    rules.resolve(catalog)
+
+    assert rules.for_selection(TemplateSelection("hpe Battery")) == 7
+    assert rules.for_selection(TemplateSelection("Disk", priority=4)) == 4
+    assert rules.for_selection(TemplateSelection("Other")) == 0
+    assert rules.for_result("Disk", "Disk") == 4
+    assert rules.for_result("Unknown", "Disk") == 3
+    assert rules.in_use()
+
+
+def test_priority_rules_remember_only_what_differs():
+    """Labels whose priority for_result already gives are not stored"""
+    rules = PriorityRules([("Disk", 3), ("Idle", -2)])
+    rules.resolve(None)
+    for name in ("Other", "Disk", "Idle"):
+        rules.for_selection(TemplateSelection(name))
+    rules.for_selection(TemplateSelection("Urgent", priority=9))
+
+    assert rules.by_label == {"Urgent": 9, "Idle": 0}
+    assert [rules.for_result(name, name) for name in ("Other", "Disk", "Idle", "Urgent")] == [0, 3, 0, 9]
+
+
+def test_priority_rules_copies_are_independent():
+    """Each tenant pair resolves and remembers priorities on its own copy"""
+    shared = PriorityRules([("glob:*Battery", 5)])
+    first, second = PriorityRules(shared.rules), PriorityRules(shared.rules)
+    first.resolve(TemplateCatalog([GlobalTemplateInfo("1", "hpe Battery")]))
+    second.resolve(TemplateCatalog([GlobalTemplateInfo("1", "other Battery")]))
+
+    assert first.for_selection(TemplateSelection("hpe Battery")) == 5
+    assert second.for_selection(TemplateSelection("hpe Battery")) == 0
+    assert second.for_result("hpe Battery", "hpe Battery") == 0
+    assert not PriorityRules().in_use()
+
+
+def start_waiting(scheduler, pod, tenant, priority, started):
+    # Queue a job behind the held slot; it records its name once granted
+    def job():
+        with scheduler.slot(pod, tenant, priority) as granted:
+            if granted:
+                started.append((tenant, priority))
+    thread = threading.Thread(target=job)
+    thread.start()
+    time.sleep(0.05)
+    return thread
+
+
+def test_slots_go_to_highest_priority_then_least_served_tenant():
+    scheduler = SlotScheduler(1)
+    started = []
+    with scheduler.slot(1, "a", 0) as granted:
+        assert granted
+        threads = [start_waiting(scheduler, 1, tenant, priority, started)
+                   for tenant, priority in (("a", 0), ("a", 0), ("b", 0), ("a", 9))]
+    for thread in threads:
+        thread.join(5)
+
+    assert started == [("a", 9), ("b", 0), ("a", 0), ("a", 0)]
+    jobs = {job['tenant']: job for job in scheduler.to_dict()['jobs']}
+    assert jobs["a"]['started'] == 4 and jobs["b"]['started'] == 1
+
+
+def test_slots_are_per_pod():
+    scheduler = SlotScheduler(1)
+    with scheduler.slot(1, "a") as first, scheduler.slot(2, "a") as second:
+        assert first and second
+
+
+def test_waiting_jobs_do_not_start_after_cancel():
+    scheduler = SlotScheduler(1)
+    started = []
+    RUN.reset()
+    try:
+        with scheduler.slot(1, "a"):
+            thread = start_waiting(scheduler, 1, "b", 0, started)
+            RUN.cancel("test")
+            thread.join(5)
+    finally:
+        RUN.reset()
+    assert started == []
+    assert [job['not_started'] for job in scheduler.to_dict()['jobs'] if job['tenant'] == "b"] == [1]
@@ -0,0 +1 @@
+# Shard module
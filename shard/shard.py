@@ -0,0 +1,214 @@
+"""
+Shard Module
+Splits the template list across worker processes and aggregates their results.
+
+A shard is addressed as "i/n" (1-based), e.g. "2/4" is the second of four
+shards. Templates are assigned to shards by a stable hash of their name, so
+every process (on this host or another) computes the same partition.
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import hashlib
+import json
+import subprocess
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from catalog.catalog import is_selector
+
+
+def parse_shard_spec(spec: str) -> Tuple[int, int]:
+    """
+    Parse a shard spec of the form "i/n".
+    
+    Args:
+        spec: Shard spec, e.g. "1/4"
+        
+    Returns:
+        Tuple of (shard_index, shard_count), shard_index is 1-based
+    """
+    try:
+        index_str, count_str = spec.split('/', 1)
+        shard_index = int(index_str)
+        shard_count = int(count_str)
+    except ValueError:
+        raise ValueError(f"Invalid shard spec '{spec}', expected i/n (e.g. 1/4)")
+    
+    if shard_count < 1 or not 1 <= shard_index <= shard_count:
+        raise ValueError(f"Invalid shard spec '{spec}', need 1 <= i <= n")
+    
+    return shard_index, shard_count
+
+
+def shard_of(template_name: str, shard_count: int) -> int:
+    """
+    Return the 1-based shard a template name belongs to.
+    
+    Uses SHA-1 of the name rather than hash(), which is salted per process.
+    """
+    digest = hashlib.sha1(template_name.encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big') % shard_count + 1
+
+
+def select_shard(items: Iterable, shard_index: int, shard_count: int,
+                 key: Optional[Callable] = None) -> Iterator:
+    """
+    Lazily yield only the items that belong to the given shard.
+    
+    Args:
+        items: Template names, or other items when key is given
+        shard_index: 1-based shard index
+        shard_count: Total number of shards
+        key: Optional function returning the template name of an item
+    """
+    for item in items:
+        name = key(item) if key else item
+        if shard_of(name, shard_count) == shard_index:
+            yield item
+
+
+class ShardCoordinator:
+    """
+    Launches local shard worker processes and merges their results.
+    Each worker is a separate process with its own auth token and connection pool.
+    """
+    
+    def __init__(self, worker_count: int, script_path: str,
+                 extra_args: Optional[List[str]] = None, output_dir: Optional[Path] = None):
+        """
+        Initialize ShardCoordinator.
+        
+        Args:
+            worker_count: Number of worker processes (shards) to launch
+            script_path: Entry point script run by each worker
+            extra_args: Additional command line arguments passed to every worker
+            output_dir: Directory for worker logs and results files
+        """
+        if worker_count < 1:
+            raise ValueError("worker_count must be at least 1")
+        
+        self.worker_count = worker_count
+        self.script_path = str(script_path)
+        self.extra_args = list(extra_args or [])
+        self.output_dir = output_dir or Path(__file__).parent.parent / 'output'
+    
+    def _shard_paths(self, shard_index: int) -> Tuple[Path, Path]:
+        stem = f"shard_{shard_index}_of_{self.worker_count}"
+        return (self.output_dir / f"{stem}_results.json",
+                self.output_dir / f"{stem}.log")
+    
+    def run(self, selections: Optional[Iterable] = None) -> Dict[str, Dict]:
+        """
+        Launch all workers, wait for them and merge their results.
+        
+        Args:
+            selections: Optional TemplateSelection stream to hand out to the
+                        workers over stdin (as JSONL) instead of letting each
+                        worker read the input source itself
+        
+        Returns:
+            Merged results with 'pod1_results', 'clone_results', 'verify_results', summed
+            'transfer_stats' and per-shard 'workers' status
+        """
+        self.output_dir.mkdir(exist_ok=True)
+        feed_stdin = selections is not None
+        
+        processes = []
+        for shard_index in range(1, self.worker_count + 1):
+            results_path, log_path = self._shard_paths(shard_index)
+            if results_path.exists():
+                results_path.unlink()
+            
+            command = [
+                sys.executable, '-u', self.script_path,
+                '--shard', f"{shard_index}/{self.worker_count}",
+                '--results-file', str(results_path)
+            ] + self.extra_args
+            if feed_stdin:
+                command += ['--input', '-', '--input-format', 'jsonl']
+            
+            log_file = open(log_path, 'w', encoding='utf-8')
+            process = subprocess.Popen(command, stdout=log_file, stderr=subprocess.STDOUT,
+                                       stdin=subprocess.PIPE if feed_stdin else None,
+                                       text=True, encoding='utf-8')
+            processes.append((shard_index, process, log_file))
+            print(f"  ✓ Started shard {shard_index}/{self.worker_count} (pid {process.pid}), log: {log_path}")
+        
+        if feed_stdin:
+            self._feed_workers(selections, processes)
+        
+        merged = {'pod1_results': {}, 'clone_results': {}, 'verify_results': {},
+                  'transfer_stats': {}, 'workers': {}}
+        
+        for shard_index, process, log_file in processes:
+            return_code = process.wait()
+            log_file.close()
+            
+            results_path, log_path = self._shard_paths(shard_index)
+            shard_results = self.load_results(results_path)
+            
+            for key in ('pod1_results', 'clone_results', 'verify_results'):
+                merged[key].update(shard_results.get(key, {}))
+            for field, value in shard_results.get('transfer_stats', {}).items():
+                merged['transfer_stats'][field] = merged['transfer_stats'].get(field, 0) + value
+            merged['workers'][f"{shard_index}/{self.worker_count}"] = {
+                'return_code': return_code,
+                'log_file': str(log_path)
+            }
+            
+            if return_code == 0:
+                print(f"  ✓ Shard {shard_index}/{self.worker_count} finished")
+            else:
+                print(f"  ✗ Shard {shard_index}/{self.worker_count} exited with code {return_code}, see {log_path}")
+            
+            if results_path.exists():
+                results_path.unlink()
+        
+        return merged
+    
+    def _feed_workers(self, selections: Iterable, processes: List) -> None:
+        # Route each selection to its shard's stdin as it is read. Selectors go
+        # to every worker, which expands them and keeps its own shard's matches.
+        
+        for selection in selections:
+            if is_selector(selection.name):
+                targets = [process for _, process, _ in processes]
+            else:
+                targets = [processes[shard_of(selection.name, self.worker_count) - 1][1]]
+            
+            line = json.dumps(selection.to_dict()) + '\n'
+            for process in targets:
+                try:
+                    process.stdin.write(line)
+                    process.stdin.flush()
+                except (BrokenPipeError, OSError):
+                    # Worker already exited, its return code is reported below
+                    pass
+        
+        for _, process, _ in processes:
+            try:
+                process.stdin.close()
+            except (BrokenPipeError, OSError):
+                pass
+    
+    @staticmethod
+    def load_results(results_path: Path) -> Dict:
+        """
+        Load a worker results file, empty results if the worker wrote none.
+        """
+        if not results_path.exists():
+            return {}
+        
+        with open(results_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+
+def order_results(results: Dict[str, Dict], template_names: Iterable[str]) -> Dict[str, Dict]:
+    """
+    Reorder merged per-template results to follow the template list order.
+    """
+    ordered = {name: results[name] for name in template_names if name in results}
+    for name, data in results.items():
+        ordered.setdefault(name, data)
+    return ordered
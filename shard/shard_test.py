@@ -0,0 +1,50 @@
+"""
+Tests for shard partitioning.
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+from shard.shard import parse_shard_spec, select_shard, shard_of
+
+
+def test_parse_shard_spec():
+    """Shard specs are 1-based 'i/n'"""
+    assert parse_shard_spec("1/4") == (1, 4)
+    assert parse_shard_spec("4/4") == (4, 4)
+
+
+@pytest.mark.parametrize('spec', ["", "2", "a/4", "0/4", "5/4", "1/0", "1/2/3"])
+def test_parse_shard_spec_invalid(spec):
+    """Malformed or out-of-range specs are rejected"""
+    with pytest.raises(ValueError):
+        parse_shard_spec(spec)
+
+
+def test_shard_of_is_stable():
+    """The same name always lands in the same shard, independent of hash() salting"""
+    names = [f"Template {i}" for i in range(200)]
+    first = [shard_of(name, 4) for name in names]
+    assert first == [shard_of(name, 4) for name in names]
+    assert set(first) == {1, 2, 3, 4}
+    # Fixed value: every host must compute the same partition
+    assert shard_of("hpe-alletra", 4) == 3
+    assert shard_of("anything", 1) == 1
+
+
+def test_select_shard_partitions_input():
+    """Every name is selected by exactly one shard"""
+    names = [f"Template {i}" for i in range(100)]
+    shards = [list(select_shard(names, index, 3)) for index in range(1, 4)]
+    assert sorted(name for shard in shards for name in shard) == sorted(names)
+    for index, shard in enumerate(shards, 1):
+        assert all(shard_of(name, 3) == index for name in shard)
+
+
+def test_select_shard_key():
+    """Items other than names are partitioned by their key"""
+    items = [{'name': f"Template {i}"} for i in range(20)]
+    selected = list(select_shard(items, 2, 2, key=lambda item: item['name']))
+    assert selected == [item for item in items if shard_of(item['name'], 2) == 2]
@@ -0,0 +1 @@
+# Snapshot module
@@ -0,0 +1,335 @@
+"""
+Snapshot Module
+Self-contained SQLite snapshot of source (POD-1) templates.
+
+`extract` writes one row per template (global/cloned IDs, version, content
+hash and the zlib-compressed customization payload); `apply` clones from the
+snapshot into any destination POD without touching POD-1 again.
+
+Payloads streamed from POD-1 (PayloadCompressor) are stored as received,
+without parsing; their content hash is the SHA-256 of those bytes, prefixed
+with 'raw:', instead of the hash of the canonical form. Their compressed form
+is spooled to a temporary file and copied into the row in chunks, so large
+payloads are never held in memory as a whole.
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import hashlib
+import shutil
+import sqlite3
+import tempfile
+import threading
+import zlib
+from datetime import datetime
+from typing import IO, Dict, Iterable, Iterator, Optional, Tuple
+from codec.codec import canonical_hash, dumps, loads, timed_write
+from shard.shard import shard_of
+
+SNAPSHOT_FORMAT_VERSION = '1'
+
+DEFAULT_SNAPSHOT_PATH = Path(__file__).parent.parent / 'output' / 'pod1_snapshot.db'
+
+# Content hashes of payloads stored as received
+RAW_HASH_PREFIX = 'raw:'
+
+# Compressed streamed payloads up to this size stay in memory, larger ones spill to disk
+PAYLOAD_SPOOL_SIZE = 1024 * 1024
+
+# Chunk size for copying spooled payloads into the snapshot
+PAYLOAD_COPY_SIZE = 64 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS templates (
+    label TEXT PRIMARY KEY,
+    template_name TEXT NOT NULL,
+    new_name TEXT,
+    target_pod INTEGER,
+    global_template_id TEXT NOT NULL,
+    cloned_template_id TEXT NOT NULL,
+    cloned_template_name TEXT,
+    version TEXT,
+    content_hash TEXT NOT NULL,
+    payload BLOB NOT NULL,
+    extracted_at TEXT NOT NULL
+);
+"""
+
+
+def compress_payload(payload: Dict) -> bytes:
+    return zlib.compress(dumps(payload), 6)
+
+
+def decompress_payload(blob: bytes) -> Dict:
+    return loads(zlib.decompress(blob))
+
+
+class PayloadCompressor:
+    """
+    Compresses a JSON payload arriving in chunks into the snapshot payload
+    format and hashes it on the fly, without parsing it. Compressed output is
+    written to a spooled temporary file as it is produced.
+    """
+    
+    def __init__(self):
+        self._compressor = zlib.compressobj(6)
+        self._sha256 = hashlib.sha256()
+        self._file = tempfile.SpooledTemporaryFile(max_size=PAYLOAD_SPOOL_SIZE)
+        self.size = 0
+    
+    def feed(self, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        # Pass chunks through, compressing and hashing each one
+        for chunk in chunks:
+            self._sha256.update(chunk)
+            self.size += len(chunk)
+            self._file.write(self._compressor.compress(chunk))
+            yield chunk
+    
+    def finish(self) -> Tuple[str, IO[bytes]]:
+        """
+        Returns:
+            (content hash, compressed payload file) for Snapshot.add_template;
+            the caller closes the file once the payload is stored
+        """
+        self._file.write(self._compressor.flush())
+        self._file.seek(0)
+        return RAW_HASH_PREFIX + self._sha256.hexdigest(), self._file
+    
+    def close(self) -> None:
+        self._file.close()
+
+
+class Snapshot:
+    """
+    Reads and writes a POD-1 template snapshot file.
+    Safe to write from several shard processes at once (SQLite locking)
+    and from several threads (one connection guarded by a lock).
+    """
+    
+    SCHEMA = SCHEMA
+    
+    def __init__(self, path: Optional[str] = None, create: bool = False):
+        """
+        Open a snapshot file.
+        
+        Args:
+            path: Snapshot file path, defaults to output/pod1_snapshot.db
+            create: Create the file (and schema) if it does not exist
+        """
+        self.path = Path(path) if path else DEFAULT_SNAPSHOT_PATH
+        
+        if not create and not self.path.exists():
+            raise FileNotFoundError(f"Snapshot file not found: {self.path}")
+        
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(str(self.path), timeout=60, check_same_thread=False)
+        if create:
+            self.conn.executescript(self.SCHEMA)
+            self.conn.commit()
+    
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def set_source(self, base_url: str, tenant_id: str) -> None:
+        # Record where the snapshot was extracted from
+        
+        values = {
+            'format_version': SNAPSHOT_FORMAT_VERSION,
+            'source_base_url': base_url,
+            'source_tenant_id': tenant_id,
+            'created_at': datetime.now().isoformat()
+        }
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO meta (key, value) VALUES (?, ?)", values.items()
+            )
+    
+    def metadata(self) -> Dict[str, str]:
+        with self._lock:
+            return dict(self.conn.execute("SELECT key, value FROM meta"))
+    
+    def add_template(self, label: str, pod1_data: Dict) -> str:
+        """
+        Store one extracted template, replacing any earlier row with the same label.
+        
+        Args:
+            label: Result key of the template (name, plus target POD if overridden)
+            pod1_data: POD-1 result entry, including either 'customizations' or a
+                streamed 'payload' (compressed bytes or file) with its 'content_hash'
+                (see PayloadCompressor)
+            
+        Returns:
+            Content hash of the customization payload
+        """
+        if 'customizations' in pod1_data:
+            content_hash = canonical_hash(pod1_data['customizations'])
+            payload = compress_payload(pod1_data['customizations'])
+        else:
+            content_hash, payload = pod1_data['content_hash'], pod1_data['payload']
+        
+        # Spooled payloads (PayloadCompressor) are copied into a zero-filled blob in chunks
+        spooled = not isinstance(payload, bytes) and hasattr(self.conn, 'blobopen')
+        if spooled:
+            payload.seek(0, 2)
+            size = value = payload.tell()
+            payload.seek(0)
+        else:
+            if not isinstance(payload, bytes):
+                # sqlite3 without incremental blob I/O (Python < 3.11)
+                payload.seek(0)
+                payload = payload.read()
+            size = len(payload)
+            value = payload
+        
+        with self._lock, timed_write(size), self.conn:
+            cursor = self.conn.execute(
+                f"""INSERT OR REPLACE INTO templates
+                    (label, template_name, new_name, target_pod, global_template_id,
+                     cloned_template_id, cloned_template_name, version, content_hash,
+                     payload, extracted_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, {'zeroblob(?)' if spooled else '?'}, ?)""",
+                (label, pod1_data['template_name'], pod1_data.get('new_name'),
+                 pod1_data.get('target_pod'), pod1_data['global_template_id'],
+                 pod1_data['cloned_template_id'], pod1_data.get('cloned_template_name'),
+                 pod1_data.get('version'), content_hash, value,
+                 datetime.now().isoformat())
+            )
+            if spooled:
+                with self.conn.blobopen('templates', 'payload', cursor.lastrowid) as blob:
+                    shutil.copyfileobj(payload, blob, PAYLOAD_COPY_SIZE)
+        return content_hash
+    
+    def __len__(self):
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM templates").fetchone()[0]
+    
+    def __contains__(self, label: str) -> bool:
+        with self._lock:
+            row = self.conn.execute("SELECT 1 FROM templates WHERE label = ?", (label,)).fetchone()
+        return row is not None
+    
+    def _fetch(self, query: str, params: Tuple = ()) -> Iterator[Tuple]:
+        # Page through a query so the lock is not held while callers work on rows
+        
+        last_rowid = 0
+        while True:
+            with self._lock:
+                rows = self.conn.execute(
+                    f"{query} AND rowid > ? ORDER BY rowid LIMIT 100", params + (last_rowid,)
+                ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield row[1:]
+            last_rowid = rows[-1][0]
+    
+    def iter_entries(self) -> Iterator[Dict]:
+        """
+        Yield stored templates in extraction order, without their payloads.
+        
+        Each entry has the keys main.py keeps for POD-1 results (except
+        'customizations', see load_customizations) plus 'label' and 'content_hash'.
+        """
+        rows = self._fetch(
+            """SELECT rowid, label, template_name, new_name, target_pod, global_template_id,
+                      cloned_template_id, cloned_template_name, version, content_hash
+               FROM templates WHERE 1"""
+        )
+        for row in rows:
+            yield {
+                'label': row[0],
+                'template_name': row[1],
+                'new_name': row[2],
+                'target_pod': row[3],
+                'global_template_id': row[4],
+                'cloned_template_id': row[5],
+                'cloned_template_name': row[6],
+                'version': row[7],
+                'content_hash': row[8]
+            }
+    
+    def load_customizations(self, label: str) -> Dict:
+        """
+        Load, verify against its content hash and parse one template's payload.
+        
+        Raises:
+            KeyError: No template with this label
+            ValueError: The payload is corrupt or not valid JSON
+        """
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT content_hash, payload FROM templates WHERE label = ?", (label,)
+            ).fetchone()
+        if row is None:
+            raise KeyError(label)
+        
+        content_hash, data = row[0], zlib.decompress(row[1])
+        if content_hash.startswith(RAW_HASH_PREFIX):
+            # Stored as received: check the bytes before parsing them
+            valid = hashlib.sha256(data).hexdigest() == content_hash[len(RAW_HASH_PREFIX):]
+            customizations = loads(data) if valid else None
+        else:
+            customizations = loads(data)
+            valid = canonical_hash(customizations) == content_hash
+        if not valid:
+            raise ValueError(f"Snapshot payload for '{label}' does not match its content hash")
+        return customizations
+    
+    def iter_templates(self) -> Iterator[Dict]:
+        """
+        Yield stored templates in extraction order, each with its 'customizations'.
+        Payloads are loaded one at a time.
+        """
+        for entry in self.iter_entries():
+            entry['customizations'] = self.load_customizations(entry['label'])
+            yield entry
+    
+    def import_templates(self, source_path: str,
+                         shard: Optional[Tuple[int, int]] = None) -> int:
+        """
+        Copy templates (compressed payloads as-is) from another snapshot file.
+        
+        Args:
+            source_path: Snapshot file to copy from
+            shard: Optional (shard_index, shard_count) to copy only one shard
+            
+        Returns:
+            Number of templates copied
+        """
+        if not Path(source_path).exists():
+            raise FileNotFoundError(f"Snapshot file not found: {source_path}")
+        
+        shard_index, shard_count = shard or (None, None)
+        with self._lock:
+            self.conn.create_function('shard_of', 2, shard_of, deterministic=True)
+            self.conn.execute("ATTACH DATABASE ? AS source", (str(source_path),))
+            try:
+                with timed_write(), self.conn:
+                    self.conn.execute("INSERT OR IGNORE INTO meta SELECT key, value FROM source.meta")
+                    cursor = self.conn.execute(
+                        """INSERT OR REPLACE INTO templates
+                           SELECT label, template_name, new_name, target_pod, global_template_id,
+                                  cloned_template_id, cloned_template_name, version, content_hash,
+                                  payload, extracted_at
+                           FROM source.templates
+                           WHERE ? IS NULL OR shard_of(template_name, ?) = ?
+                           ORDER BY rowid""",
+                        (shard_count, shard_count, shard_index)
+                    )
+                    return cursor.rowcount
+            finally:
+                self.conn.execute("DETACH DATABASE source")
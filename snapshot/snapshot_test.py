@@ -0,0 +1,53 @@
+"""
+Tests for snapshot payload storage.
+"""
+import json
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+from snapshot import snapshot
+from snapshot.snapshot import PayloadCompressor, Snapshot
+
+
+def pod1_data(name, **payload):
+    return dict(payload, global_template_id=f"global-{name}", cloned_template_id=f"cloned-{name}",
+                template_name=name, target_pod=2)
+
+
+def stream(compressor, data, size=100):
+    # Consume a body through the compressor like a streamed download
+    for _ in compressor.feed(data[i:i + size] for i in range(0, len(data), size)):
+        pass
+    return compressor.finish()
+
+
+@pytest.mark.parametrize('spool_size', [snapshot.PAYLOAD_SPOOL_SIZE, 16])
+def test_streamed_payload_round_trip(tmp_path, monkeypatch, spool_size):
+    """Streamed payloads are stored as received, in memory or spilled to disk"""
+    monkeypatch.setattr(snapshot, 'PAYLOAD_SPOOL_SIZE', spool_size)
+    customizations = {'name': "A", 'monitors': [{'metric': f"m{i}", 'noise': os.urandom(8).hex()}
+                                                for i in range(50)]}
+    compressor = PayloadCompressor()
+    content_hash, payload = stream(compressor, json.dumps(customizations).encode('utf-8'))
+    assert content_hash.startswith(snapshot.RAW_HASH_PREFIX)
+
+    with payload, Snapshot(tmp_path / "snapshot.db", create=True) as snap:
+        assert snap.add_template("A", pod1_data("A", content_hash=content_hash, payload=payload)) == content_hash
+        # The same file can be stored again (run state and snapshot)
+        snap.add_template("B", pod1_data("B", content_hash=content_hash, payload=payload))
+        assert snap.load_customizations("A") == customizations
+        assert snap.load_customizations("B") == customizations
+
+
+def test_parsed_and_compressed_payloads(tmp_path):
+    with Snapshot(tmp_path / "snapshot.db", create=True) as snap:
+        snap.add_template("A", pod1_data("A", customizations={'name': "A"}))
+        snap.add_template("B", pod1_data("B", content_hash=snapshot.RAW_HASH_PREFIX + "0" * 64,
+                                         payload=snapshot.compress_payload({'name': "B"})))
+        assert snap.load_customizations("A") == {'name': "A"}
+        with pytest.raises(ValueError):
+            snap.load_customizations("B")
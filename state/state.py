@@ -0,0 +1,273 @@
+"""
+Run State Module
+Disk-backed store for per-run POD-1 and clone results.
+
+Extends the snapshot format with a clone_results table, so a run's state is
+also a valid snapshot for `apply`. Payloads stay zlib-compressed on disk and
+are loaded one at a time, keeping memory flat regardless of template count.
+The file remains after the run and can be queried with any SQLite client.
+
+Every template a run creates is also appended to clone_journal, which reset()
+leaves alone, so `cleanup` can find clones made by any earlier run in the file.
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import json
+from datetime import datetime
+from typing import Dict, Iterator, Optional, Tuple
+from codec.codec import timed_write
+from snapshot.snapshot import SCHEMA as SNAPSHOT_SCHEMA, Snapshot
+
+DEFAULT_STATE_PATH = Path(__file__).parent.parent / 'output' / 'run_state.db'
+
+SCHEMA = SNAPSHOT_SCHEMA + """
+CREATE TABLE IF NOT EXISTS clone_results (
+    label TEXT PRIMARY KEY,
+    template_name TEXT,
+    target_pod INTEGER,
+    pod2_global_template_id TEXT,
+    new_cloned_template_id TEXT,
+    success INTEGER NOT NULL,
+    finished_at TEXT NOT NULL,
+    skipped INTEGER NOT NULL DEFAULT 0,
+    existing_template_id TEXT,
+    target_tenant TEXT
+);
+CREATE TABLE IF NOT EXISTS clone_journal (
+    template_id TEXT PRIMARY KEY,
+    label TEXT NOT NULL,
+    template_name TEXT,
+    target_pod INTEGER,
+    target_tenant TEXT,
+    created_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS verify_results (
+    label TEXT PRIMARY KEY,
+    template_id TEXT,
+    verified INTEGER NOT NULL,
+    mismatched_fields TEXT,
+    error TEXT,
+    checked_at TEXT NOT NULL
+);
+"""
+
+# Columns added to clone_results after its first release, added to older state files on open
+CLONE_RESULT_COLUMNS = (
+    ('skipped', 'INTEGER NOT NULL DEFAULT 0'),
+    ('existing_template_id', 'TEXT'),
+    ('target_tenant', 'TEXT')
+)
+
+CLONE_RESULT_FIELDS = ('label, template_name, target_pod, pod2_global_template_id, new_cloned_template_id, '
+                       'success, finished_at, skipped, existing_template_id, target_tenant')
+
+CLONE_JOURNAL_FIELDS = 'template_id, label, template_name, target_pod, target_tenant, created_at'
+
+# reset() compacts the file only when most of it is free pages (the next run reuses
+# the rest), and never for small files: at least this many free pages (4 MB by default)
+VACUUM_MIN_FREE_PAGES = 1024
+VACUUM_FREE_SHARE = 0.5
+
+
+def shard_state_path(path: Path, shard: Tuple[int, int]) -> Path:
+    # Each shard worker keeps its own state file next to the run's state file
+    shard_index, shard_count = shard
+    return path.with_name(f"{path.stem}_shard_{shard_index}_of_{shard_count}{path.suffix}")
+
+
+class RunStateStore(Snapshot):
+    """
+    SQLite-backed run state exposing dict-like pod1_results and clone_results views.
+    """
+    
+    SCHEMA = SCHEMA
+    
+    def __init__(self, path: Optional[str] = None):
+        """
+        Open (or create) a run state file.
+        
+        Args:
+            path: State file path, defaults to output/run_state.db
+        """
+        super().__init__(path or DEFAULT_STATE_PATH, create=True)
+        with self._lock, self.conn:
+            columns = {row[1] for row in self.conn.execute("PRAGMA table_info(clone_results)")}
+            for column, definition in CLONE_RESULT_COLUMNS:
+                if column not in columns:
+                    self.conn.execute(f"ALTER TABLE clone_results ADD COLUMN {column} {definition}")
+            if 'target_tenant' not in columns:
+                # State file from before the clone journal: journal the clones it still holds
+                self.conn.execute(
+                    f"""INSERT OR IGNORE INTO clone_journal ({CLONE_JOURNAL_FIELDS})
+                        SELECT new_cloned_template_id, label, template_name, target_pod, NULL, finished_at
+                        FROM clone_results
+                        WHERE success = 1 AND new_cloned_template_id IS NOT NULL ORDER BY rowid"""
+                )
+        self.pod1_results = Pod1ResultsView(self)
+        self.clone_results = CloneResultsView(self)
+    
+    def reset(self) -> None:
+        # Start a new run in this file (the clone journal is kept)
+        with self._lock, self.conn:
+            for table in ('meta', 'templates', 'clone_results', 'verify_results'):
+                self.conn.execute(f"DELETE FROM {table}")
+        with self._lock:
+            free_pages = self.conn.execute("PRAGMA freelist_count").fetchone()[0]
+            pages = self.conn.execute("PRAGMA page_count").fetchone()[0]
+            if free_pages >= VACUUM_MIN_FREE_PAGES and free_pages > pages * VACUUM_FREE_SHARE:
+                self.conn.execute("VACUUM")
+    
+    def set_clone_result(self, label: str, result: Dict) -> None:
+        finished_at = datetime.now().isoformat()
+        with self._lock, timed_write(), self.conn:
+            self.conn.execute(
+                f"""INSERT OR REPLACE INTO clone_results ({CLONE_RESULT_FIELDS})
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (label, result.get('template_name'), result.get('target_pod'),
+                 result.get('pod2_global_template_id'), result.get('new_cloned_template_id'),
+                 1 if result.get('success') else 0, finished_at,
+                 1 if result.get('skipped') else 0, result.get('existing_template_id'),
+                 result.get('target_tenant'))
+            )
+            if result.get('success') and result.get('new_cloned_template_id'):
+                self.conn.execute(
+                    f"INSERT OR IGNORE INTO clone_journal ({CLONE_JOURNAL_FIELDS}) VALUES (?, ?, ?, ?, ?, ?)",
+                    (result['new_cloned_template_id'], label, result.get('template_name'),
+                     result.get('target_pod'), result.get('target_tenant'), finished_at)
+                )
+    
+    def iter_clone_results(self) -> Iterator[Tuple[str, Dict]]:
+        # Results come back with the keys main.py stored them with
+        rows = self._fetch(
+            """SELECT rowid, label, template_name, target_pod, pod2_global_template_id,
+                      new_cloned_template_id, success, skipped, existing_template_id, target_tenant
+               FROM clone_results WHERE 1"""
+        )
+        for row in rows:
+            result = {
+                'success': bool(row[5]),
+                'template_name': row[1],
+                'target_pod': row[2]
+            }
+            if row[6]:
+                # Already on the destination, not cloned by this run
+                result['skipped'] = True
+                result['existing_template_id'] = row[7]
+            else:
+                result['pod2_global_template_id'] = row[3]
+            if row[4]:
+                result['new_cloned_template_id'] = row[4]
+            if row[8]:
+                result['target_tenant'] = row[8]
+            yield row[0], result
+    
+    def clone_result_count(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM clone_results").fetchone()[0]
+    
+    def set_verify_result(self, label: str, result: Dict) -> None:
+        with self._lock, timed_write(), self.conn:
+            self.conn.execute(
+                """INSERT OR REPLACE INTO verify_results
+                   (label, template_id, verified, mismatched_fields, error, checked_at)
+                   VALUES (?, ?, ?, ?, ?, ?)""",
+                (label, result.get('template_id'), 1 if result.get('verified') else 0,
+                 json.dumps(result.get('mismatched_fields', [])), result.get('error', ''),
+                 datetime.now().isoformat())
+            )
+    
+    def iter_verify_results(self) -> Iterator[Tuple[str, Dict]]:
+        rows = self._fetch(
+            """SELECT rowid, label, template_id, verified, mismatched_fields, error
+               FROM verify_results WHERE 1"""
+        )
+        for row in rows:
+            yield row[0], {
+                'template_id': row[1],
+                'verified': bool(row[2]),
+                'mismatched_fields': json.loads(row[3] or '[]'),
+                'error': row[4] or ''
+            }
+    
+    def merge_from(self, other_path: Path) -> None:
+        """
+        Copy templates, clone results and the clone journal from another state
+        file (e.g. a shard worker's).
+        """
+        self.import_templates(str(other_path))
+        with self._lock:
+            self.conn.execute("ATTACH DATABASE ? AS other", (str(other_path),))
+            try:
+                with self.conn:
+                    self.conn.execute(
+                        f"""INSERT OR REPLACE INTO clone_results ({CLONE_RESULT_FIELDS})
+                            SELECT {CLONE_RESULT_FIELDS} FROM other.clone_results ORDER BY rowid"""
+                    )
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO verify_results SELECT * FROM other.verify_results ORDER BY rowid"
+                    )
+                    self.conn.execute(
+                        f"""INSERT OR IGNORE INTO clone_journal ({CLONE_JOURNAL_FIELDS})
+                            SELECT {CLONE_JOURNAL_FIELDS} FROM other.clone_journal ORDER BY rowid"""
+                    )
+            finally:
+                self.conn.execute("DETACH DATABASE other")
+
+
+class Pod1ResultsView:
+    """
+    Dict-like view of POD-1 results. Entries are returned without their
+    customization payload; use load_customizations(label) to fetch it.
+    """
+    
+    def __init__(self, store: RunStateStore):
+        self.store = store
+    
+    def __setitem__(self, label: str, pod1_data: Dict) -> None:
+        self.store.add_template(label, pod1_data)
+    
+    def __contains__(self, label: str) -> bool:
+        return label in self.store
+    
+    def __len__(self) -> int:
+        return len(self.store)
+    
+    def __bool__(self) -> bool:
+        return len(self) > 0
+    
+    def __iter__(self) -> Iterator[str]:
+        return (label for label, _ in self.items())
+    
+    def items(self) -> Iterator[Tuple[str, Dict]]:
+        for entry in self.store.iter_entries():
+            yield entry.pop('label'), entry
+    
+    def load_customizations(self, label: str) -> Dict:
+        return self.store.load_customizations(label)
+
+
+class CloneResultsView:
+    """
+    Dict-like view of POD-2 clone results.
+    """
+    
+    def __init__(self, store: RunStateStore):
+        self.store = store
+    
+    def __setitem__(self, label: str, result: Dict) -> None:
+        self.store.set_clone_result(label, result)
+    
+    def __len__(self) -> int:
+        return self.store.clone_result_count()
+    
+    def __bool__(self) -> bool:
+        return len(self) > 0
+    
+    def __iter__(self) -> Iterator[str]:
+        return (label for label, _ in self.items())
+    
+    def items(self) -> Iterator[Tuple[str, Dict]]:
+        return self.store.iter_clone_results()
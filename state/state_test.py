@@ -0,0 +1,157 @@
+"""
+Tests for the disk-backed run state store.
+"""
+import os
+import sqlite3
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from state import state as state_module
+from state.state import RunStateStore, shard_state_path
+
+
+def pod1_data(name, target_pod=2):
+    return {
+        'global_template_id': f"global-{name}",
+        'cloned_template_id': f"cloned-{name}",
+        'customizations': {'name': name, 'monitors': [{'id': 1, 'threshold': 90}]},
+        'template_name': name,
+        'new_name': None,
+        'target_pod': target_pod,
+        'cloned_template_name': f"Clone of {name}",
+        'version': "3"
+    }
+
+
+CLONED = {
+    'pod2_global_template_id': "pod2-global-A",
+    'new_cloned_template_id': "new-A",
+    'success': True,
+    'template_name': "A",
+    'target_pod': 2
+}
+
+SKIPPED = {
+    'existing_template_id': "existing-B",
+    'success': True,
+    'skipped': True,
+    'template_name': "B",
+    'target_pod': 3
+}
+
+FAILED = {
+    'pod2_global_template_id': "pod2-global-C",
+    'success': False,
+    'template_name': "C",
+    'target_pod': 2
+}
+
+
+def test_pod1_results_round_trip(tmp_path):
+    """Entries come back without payloads; payloads load one at a time"""
+    with RunStateStore(tmp_path / "state.db") as state:
+        state.pod1_results["A"] = pod1_data("A")
+        state.pod1_results["B (POD3)"] = pod1_data("B", 3)
+
+        assert len(state.pod1_results) == 2 and "A" in state.pod1_results
+        entries = dict(state.pod1_results.items())
+        assert list(entries) == ["A", "B (POD3)"]
+        assert entries["B (POD3)"]['target_pod'] == 3
+        assert 'customizations' not in entries["A"]
+        assert state.pod1_results.load_customizations("A") == pod1_data("A")['customizations']
+
+
+def test_clone_results_round_trip(tmp_path):
+    """Clone, skip and failure results keep every field they were stored with"""
+    path = tmp_path / "state.db"
+    with RunStateStore(path) as state:
+        state.clone_results["A"] = CLONED
+        state.clone_results["B (POD3)"] = SKIPPED
+        state.clone_results["C"] = FAILED
+
+    # Read back from the file, as cleanup and the summary do after a run
+    with RunStateStore(path) as state:
+        assert len(state.clone_results) == 3
+        assert dict(state.clone_results.items()) == {"A": CLONED, "B (POD3)": SKIPPED, "C": FAILED}
+
+
+def test_verify_results_round_trip(tmp_path):
+    with RunStateStore(tmp_path / "state.db") as state:
+        state.set_verify_result("A", {'template_id': "new-A", 'verified': False,
+                                      'mismatched_fields': ['monitors'], 'error': ''})
+        assert list(state.iter_verify_results()) == [
+            ("A", {'template_id': "new-A", 'verified': False, 'mismatched_fields': ['monitors'], 'error': ''})
+        ]
+
+
+def test_reset_starts_a_new_run(tmp_path):
+    with RunStateStore(tmp_path / "state.db") as state:
+        state.pod1_results["A"] = pod1_data("A")
+        state.clone_results["A"] = CLONED
+        state.reset()
+        assert not state.pod1_results and not state.clone_results
+
+
+def pragma(state, name):
+    return state.conn.execute(f"PRAGMA {name}").fetchone()[0]
+
+
+def test_reset_compacts_only_mostly_free_files(tmp_path, monkeypatch):
+    """Free pages are left for the next run unless they are most of a large enough file"""
+    monkeypatch.setattr(state_module, 'VACUUM_MIN_FREE_PAGES', 64)
+    with RunStateStore(tmp_path / "state.db") as state:
+        # Incompressible payloads, so each template takes a few pages
+        for n in range(100):
+            state.pod1_results[f"T{n}"] = dict(pod1_data(f"T{n}"), customizations={'blob': os.urandom(4096).hex()})
+        state.reset()
+        assert pragma(state, 'freelist_count') == 0
+        compacted = pragma(state, 'page_count')
+
+        for n in range(5):
+            state.pod1_results[f"T{n}"] = dict(pod1_data(f"T{n}"), customizations={'blob': os.urandom(4096).hex()})
+        state.reset()
+        # Too few free pages to be worth a VACUUM
+        assert 0 < pragma(state, 'freelist_count') < 64
+        assert pragma(state, 'page_count') > compacted
+
+
+def test_merge_from_shards(tmp_path):
+    """Shard state files merge into the run's state file with every result field"""
+    run_path = tmp_path / "run_state.db"
+    shards = [shard_state_path(run_path, (index, 2)) for index in (1, 2)]
+    assert shards[0].name == "run_state_shard_1_of_2.db"
+
+    with RunStateStore(shards[0]) as shard:
+        shard.pod1_results["A"] = pod1_data("A")
+        shard.clone_results["A"] = CLONED
+        shard.set_verify_result("A", {'template_id': "new-A", 'verified': True})
+    with RunStateStore(shards[1]) as shard:
+        shard.pod1_results["B (POD3)"] = pod1_data("B", 3)
+        shard.clone_results["B (POD3)"] = SKIPPED
+
+    with RunStateStore(run_path) as state:
+        for path in shards:
+            state.merge_from(path)
+        assert list(state.pod1_results) == ["A", "B (POD3)"]
+        assert state.pod1_results.load_customizations("B (POD3)") == pod1_data("B", 3)['customizations']
+        assert dict(state.clone_results.items()) == {"A": CLONED, "B (POD3)": SKIPPED}
+        assert [label for label, _ in state.iter_verify_results()] == ["A"]
+
+
+def test_opens_state_files_without_skip_columns(tmp_path):
+    """State files written before skip results were stored gain the columns on open"""
+    path = tmp_path / "old_state.db"
+    conn = sqlite3.connect(str(path))
+    conn.execute("""CREATE TABLE clone_results (
+        label TEXT PRIMARY KEY, template_name TEXT, target_pod INTEGER, pod2_global_template_id TEXT,
+        new_cloned_template_id TEXT, success INTEGER NOT NULL, finished_at TEXT NOT NULL)""")
+    conn.execute("INSERT INTO clone_results VALUES ('A', 'A', 2, 'pod2-global-A', 'new-A', 1, 'now')")
+    conn.commit()
+    conn.close()
+
+    with RunStateStore(path) as state:
+        assert dict(state.clone_results.items()) == {"A": CLONED}
+        state.clone_results["B (POD3)"] = SKIPPED
+        assert dict(state.clone_results.items())["B (POD3)"] == SKIPPED
@@ -0,0 +1,358 @@
+"""
+Sync Module
+Long-running POD-1 to destination sync with change detection.
+
+Each cycle lists cloned template metadata on POD-1 (most recently updated
+first) and compares each template's `version` with a local SQLite index.
+Customizations are fetched only for new or changed templates, which are then
+cloned (first time) or updated (afterwards) on the destination POD. Listing
+stops at the first page that is entirely older than the previous cycle, so
+steady-state polling costs one page plus the changed templates; every
+`full_every` cycles a full listing catches anything the early stop missed.
+
+A destination template that was deleted since the last cycle (404 on update)
+is cloned again and the index is pointed at the new clone.
+
+Authenticated sessions (and their pooled connections) are kept for the
+lifetime of the daemon; tokens are refreshed by OpsRampAuth when they expire.
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import requests
+from auth.auth import OpsRampAuth
+from catalog.catalog import TemplateCatalog, expand_selections
+from config.settings import TemplateSelection, dedupe_selections
+from global_template.global_template import GlobalTemplateManager
+from cloned_template.cloned_template import ClonedTemplateManager, ClonedTemplateInfo
+from template_customizations.template_customizations import TemplateCustomizationsManager
+from clone_template.clone_template import CloneTemplateManager, TemplateNotFound
+from deadline.deadline import RUN
+
+DEFAULT_INDEX_PATH = Path(__file__).parent.parent / 'output' / 'sync_index.db'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS synced_templates (
+    label TEXT PRIMARY KEY,
+    source_template_id TEXT NOT NULL,
+    source_version TEXT,
+    target_pod INTEGER,
+    target_template_id TEXT,
+    synced_at TEXT NOT NULL,
+    target_tenant TEXT
+);
+"""
+
+# Fields that may carry a template's last update time, in order of preference
+UPDATE_MARKER_FIELDS = ('updatedTime', 'updatedDate', 'modifiedTime')
+
+
+def update_marker(template: ClonedTemplateInfo) -> Optional[str]:
+    for field in UPDATE_MARKER_FIELDS:
+        value = template.raw_response.get(field)
+        if value is not None:
+            return str(value)
+    return None
+
+
+class SyncIndex:
+    """
+    Local index of synced templates (source version and destination template ID).
+    """
+    
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path) if path else DEFAULT_INDEX_PATH
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(str(self.path), timeout=60, check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(synced_templates)")}
+        if 'target_tenant' not in columns:
+            # Index written before destination tenants were recorded
+            self.conn.execute("ALTER TABLE synced_templates ADD COLUMN target_tenant TEXT")
+        self.conn.commit()
+    
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def get(self, label: str) -> Optional[Dict]:
+        with self._lock:
+            row = self.conn.execute(
+                """SELECT source_template_id, source_version, target_pod, target_template_id, target_tenant
+                   FROM synced_templates WHERE label = ?""", (label,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            'source_template_id': row[0],
+            'source_version': row[1],
+            'target_pod': row[2],
+            'target_template_id': row[3],
+            'target_tenant': row[4]
+        }
+    
+    def record(self, label: str, source_template_id: str, source_version: str,
+               target_pod: int, target_template_id: str, target_tenant: Optional[str] = None) -> None:
+        with self._lock, self.conn:
+            self.conn.execute(
+                """INSERT OR REPLACE INTO synced_templates
+                   (label, source_template_id, source_version, target_pod, target_template_id,
+                    synced_at, target_tenant)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                (label, source_template_id, source_version, target_pod, target_template_id,
+                 datetime.now().isoformat(), target_tenant)
+            )
+    
+    def get_meta(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+    
+    def set_meta(self, key: str, value: str) -> None:
+        with self._lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+
+class SyncDaemon:
+    """
+    Polls POD-1 and keeps destination PODs in step with it.
+    """
+    
+    def __init__(self, source_auth: OpsRampAuth, source_tenant_id: str,
+                 selections: Iterable[TemplateSelection],
+                 get_destination: Callable[[int], Optional[Tuple[OpsRampAuth, str]]],
+                 index: SyncIndex, full_every: int = 12, default_name: Callable[[str], str] = None):
+        """
+        Initialize SyncDaemon.
+        
+        Args:
+            source_auth: OpsRampAuth for POD-1
+            source_tenant_id: POD-1 tenant ID
+            selections: Templates (names or selectors) to keep in sync
+            get_destination: Returns (auth, tenant_id) for a destination POD number, None if unavailable
+            index: Local sync index
+            full_every: Run a full catalog listing every N cycles
+            default_name: Builds the destination name from the template name
+        """
+        self.source_auth = source_auth
+        self.source_tenant_id = source_tenant_id
+        self.selections = list(selections)
+        self.get_destination = get_destination
+        self.index = index
+        self.full_every = max(1, full_every)
+        self.default_name = default_name or (lambda name: name)
+        
+        self.cycle = 0
+        # parent (global) template ID -> selections that track it
+        self.tracked: Dict[str, List[TemplateSelection]] = {}
+        self.destination_catalogs: Dict[int, Optional[TemplateCatalog]] = {}
+    
+    def refresh_catalogs(self) -> bool:
+        """
+        Re-index POD-1 global templates and resolve the tracked selections.
+        Destination catalogs are rebuilt on next use.
+        """
+        print("\n  [Sync] Indexing POD-1 global templates...")
+        source_catalog = TemplateCatalog.from_manager(
+            GlobalTemplateManager(self.source_auth, self.source_tenant_id)
+        )
+        if source_catalog is None:
+            return False
+        
+        self.tracked = {}
+        for selection in dedupe_selections(expand_selections(self.selections, lambda: source_catalog)):
+            template = source_catalog.get(selection.name)
+            if template is None:
+                print(f"    ✗ Global template not found: {selection.name}")
+                for suggestion in source_catalog.suggest(selection.name):
+                    print(f"      Did you mean: {suggestion}")
+                continue
+            self.tracked.setdefault(template.template_id, []).append(selection)
+        
+        self.destination_catalogs = {}
+        print(f"    ✓ Tracking {sum(len(s) for s in self.tracked.values())} template(s)")
+        return True
+    
+    def _destination_global_id(self, target_pod: int, auth: OpsRampAuth,
+                               tenant_id: str, template_name: str) -> Optional[str]:
+        
+        if target_pod not in self.destination_catalogs:
+            self.destination_catalogs[target_pod] = TemplateCatalog.from_manager(
+                GlobalTemplateManager(auth, tenant_id)
+            )
+        
+        catalog = self.destination_catalogs[target_pod]
+        if catalog is not None:
+            template = catalog.get(template_name)
+        else:
+            template = GlobalTemplateManager(auth, tenant_id).get_global_template_by_name(template_name)
+        return template.template_id if template else None
+    
+    def _list_changed_candidates(self, full: bool) -> Tuple[List[ClonedTemplateInfo], int]:
+        # Return tracked clones from the listing (first clone per parent) and the number listed
+        
+        watermark = None if full else self.index.get_meta('watermark')
+        manager = ClonedTemplateManager(self.source_auth, self.source_tenant_id)
+        
+        candidates: Dict[str, ClonedTemplateInfo] = {}
+        listed = 0
+        newest = None
+        page_all_old = True
+        
+        for template in manager.iter_cloned_templates(sort_by_update=True):
+            listed += 1
+            marker = update_marker(template)
+            if marker is not None and (newest is None or marker > newest):
+                newest = marker
+            if watermark is None or marker is None or marker > watermark:
+                page_all_old = False
+            
+            if template.parent_id in self.tracked and template.parent_id not in candidates:
+                candidates[template.parent_id] = template
+            
+            # Sorted newest first: stop after a whole page older than the last cycle
+            if listed % manager.PAGE_SIZE == 0:
+                if watermark is not None and page_all_old:
+                    break
+                page_all_old = True
+        
+        if newest is not None:
+            self.index.set_meta('watermark', newest)
+        
+        return list(candidates.values()), listed
+    
+    def run_cycle(self) -> Dict[str, int]:
+        """
+        Run one sync cycle.
+        
+        Returns:
+            Counts of listed, changed, cloned, updated and failed templates
+        """
+        self.cycle += 1
+        full = self.cycle == 1 or (self.cycle - 1) % self.full_every == 0
+        counts = {'listed': 0, 'changed': 0, 'cloned': 0, 'updated': 0, 'failed': 0}
+        
+        print(f"\n[Sync] Cycle {self.cycle} ({'full' if full else 'incremental'}) at "
+              f"{datetime.now().isoformat(timespec='seconds')}")
+        
+        if full and not self.refresh_catalogs():
+            counts['failed'] += 1
+            return counts
+        
+        try:
+            candidates, counts['listed'] = self._list_changed_candidates(full)
+        except requests.exceptions.RequestException as e:
+            print(f"  ✗ Failed to list POD-1 templates: {str(e)}")
+            counts['failed'] += 1
+            return counts
+        
+        customizations_mgr = TemplateCustomizationsManager(self.source_auth, self.source_tenant_id)
+        
+        for source in candidates:
+            for selection in self.tracked[source.parent_id]:
+                if RUN.stopped():
+                    break
+                entry = self.index.get(selection.label)
+                if (entry and entry['source_template_id'] == source.template_id
+                        and entry['source_version'] == source.version):
+                    continue
+                
+                counts['changed'] += 1
+                print(f"\n  Changed: {selection.label} (version {source.version})")
+                
+                customizations = customizations_mgr.get_template_customizations(source.template_id)
+                if not customizations:
+                    counts['failed'] += 1
+                    continue
+                
+                outcome = self._push(selection, source, customizations, entry)
+                counts[outcome] += 1
+        
+        print(f"  ✓ Listed {counts['listed']}, changed {counts['changed']}, cloned {counts['cloned']}, "
+              f"updated {counts['updated']}, failed {counts['failed']}")
+        return counts
+    
+    def _push(self, selection: TemplateSelection, source: ClonedTemplateInfo,
+              customizations: Dict, entry: Optional[Dict]) -> str:
+        # Clone or update one template on its destination POD
+        
+        destination = self.get_destination(selection.target_pod)
+        if destination is None:
+            return 'failed'
+        auth, tenant_id = destination
+        
+        target_global_id = self._destination_global_id(selection.target_pod, auth, tenant_id, selection.name)
+        if not target_global_id:
+            print(f"    ✗ Global template not found in POD-{selection.target_pod}: {selection.name}")
+            return 'failed'
+        
+        clone_mgr = CloneTemplateManager(auth, tenant_id)
+        new_name = selection.new_name or self.default_name(selection.name)
+        
+        # Entries without a tenant were recorded before tenants were, for the POD's own tenant
+        update = (entry and entry['target_template_id'] and entry['target_pod'] == selection.target_pod
+                  and entry['target_tenant'] in (None, tenant_id))
+        if update:
+            try:
+                response = clone_mgr.update_template(entry['target_template_id'], customizations,
+                                                     target_global_id, new_name)
+                outcome = 'updated'
+                target_template_id = entry['target_template_id']
+            except TemplateNotFound:
+                print(f"    ⚠ {entry['target_template_id']} no longer exists in POD-{selection.target_pod}, "
+                      f"cloning it again")
+                update = False
+        if not update:
+            response = clone_mgr.clone_template(customizations, target_global_id, new_name)
+            outcome = 'cloned'
+            target_template_id = response.get('id') if response else None
+        
+        if response is None or not target_template_id:
+            return 'failed'
+        
+        self.index.record(selection.label, source.template_id, source.version,
+                          selection.target_pod, target_template_id, tenant_id)
+        return outcome
+    
+    def run(self, interval: float, cycles: Optional[int] = None) -> None:
+        """
+        Run sync cycles until interrupted (Ctrl-C), cancelled, past the run deadline
+        or the cycle limit is reached.
+        
+        Args:
+            interval: Seconds between the start of consecutive cycles
+            cycles: Optional number of cycles to run
+        """
+        try:
+            while cycles is None or self.cycle < cycles:
+                started = time.monotonic()
+                self.run_cycle()
+                if cycles is not None and self.cycle >= cycles:
+                    break
+                if RUN.wait(max(0.0, interval - (time.monotonic() - started))):
+                    break
+        except KeyboardInterrupt:
+            print("\n  ✓ Sync stopped")
+            return
+        
+        if RUN.stopped():
+            print(f"\n  ✓ Sync stopped: {RUN.stopped()}")
@@ -0,0 +1,129 @@
+"""
+Tests for the sync daemon's change detection and destination updates.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+import main
+from cloned_template.cloned_template import ClonedTemplateManager
+from config.settings import TemplateSelection
+from sync.sync import SyncDaemon, SyncIndex
+
+NAMES = list("ABCDEF")
+
+
+@pytest.fixture
+def pods(fake_network, monkeypatch):
+    # Three pages of two cloned templates on POD-1; the destination has the same global templates
+    monkeypatch.setattr(ClonedTemplateManager, 'PAGE_SIZE', 2)
+    source, destination = fake_network.add_pod("pod1"), fake_network.add_pod("pod2")
+    for name in NAMES:
+        source.add_global(name)
+        destination.add_global(name)
+        source.add_clone("source", name)
+    return fake_network, source, destination
+
+
+@pytest.fixture
+def index(tmp_path):
+    with SyncIndex(tmp_path / "sync_index.db") as index:
+        yield index
+
+
+def make_daemon(network, index, full_every=12):
+    destination = (network.auth("pod2"), "target")
+    return SyncDaemon(network.auth("pod1"), "source", [TemplateSelection(name) for name in NAMES],
+                      lambda pod: destination, index, full_every=full_every)
+
+
+def run_cycle(daemon, source):
+    # One cycle, with the number of cloned-template pages it listed on POD-1
+    before = source.calls[('GET', 'clone page')]
+    counts = daemon.run_cycle()
+    return counts, source.calls[('GET', 'clone page')] - before
+
+
+def test_first_cycle_clones_everything(pods, index):
+    network, source, destination = pods
+    counts, pages = run_cycle(make_daemon(network, index), source)
+
+    assert counts['cloned'] == len(NAMES) and counts['failed'] == 0
+    assert pages == 3
+    assert len(destination.clones("target")) == len(NAMES)
+    assert index.get("A")['target_tenant'] == "target"
+
+
+def test_incremental_cycles_stop_at_the_watermark(pods, index):
+    """Unchanged templates cost one page; a changed one is found and updated"""
+    network, source, destination = pods
+    daemon = make_daemon(network, index)
+    run_cycle(daemon, source)
+
+    counts, pages = run_cycle(daemon, source)
+    assert pages == 1
+    assert counts['changed'] == 0 and counts['listed'] == 2
+
+    # The newest page now holds a changed template, so the listing reads one page further
+    changed = next(t for t in source.clones("source") if t['parentUUID'] == "g-C")
+    source.touch(changed['id'], 2)
+    counts, pages = run_cycle(daemon, source)
+    assert pages == 2
+    assert counts['changed'] == 1 and counts['updated'] == 1
+    assert index.get("C")['source_version'] == "2"
+    assert destination.calls[('POST', 'clone')] == len(NAMES)
+
+
+def test_full_listing_every_n_cycles(pods, index):
+    """Every full_every cycles the whole listing is read and the catalogs are rebuilt"""
+    network, source, destination = pods
+    daemon = make_daemon(network, index, full_every=3)
+
+    pages, catalogs = [], []
+    for _ in range(5):
+        catalog_pages = source.calls[('GET', 'global page')]
+        pages.append(run_cycle(daemon, source)[1])
+        catalogs.append(source.calls[('GET', 'global page')] > catalog_pages)
+
+    assert pages == [3, 1, 1, 3, 1]
+    assert catalogs == [True, False, False, True, False]
+
+
+def test_default_full_listing_interval(pods, index):
+    network, source, destination = pods
+    daemon = make_daemon(network, index)
+    pages = [run_cycle(daemon, source)[1] for _ in range(13)]
+    assert pages == [3] + [1] * 11 + [3]
+
+
+def test_deleted_destination_is_cloned_again(pods, index):
+    """A 404 on update clones the template again and repoints the index"""
+    network, source, destination = pods
+    daemon = make_daemon(network, index)
+    run_cycle(daemon, source)
+
+    deleted = index.get("A")['target_template_id']
+    del destination.templates[deleted]
+    source.touch(next(t['id'] for t in source.clones("source") if t['parentUUID'] == "g-A"), 2)
+
+    counts, _ = run_cycle(daemon, source)
+    assert counts['cloned'] == 1 and counts['updated'] == 0 and counts['failed'] == 0
+    entry = index.get("A")
+    assert entry['target_template_id'] != deleted and entry['source_version'] == "2"
+    assert destination.templates[entry['target_template_id']]['tenant'] == "target"
+
+
+@pytest.mark.parametrize('content', [None, "name,target_pod\nA,not-a-pod\n"])
+def test_run_sync_reports_unreadable_input(tmp_path, index, capsys, content):
+    """A missing or malformed input file is reported, not raised"""
+    path = tmp_path / "templates.csv"
+    if content is not None:
+        path.write_text(content, encoding='utf-8')
+    args = argparse.Namespace(input=str(path), input_format='auto', target_pod=None,
+                              sync_index=str(index.path), interval=0, cycles=1)
+
+    assert main.run_sync(args, {1: (None, "source")}) is False
+    assert "✗ Error" in capsys.readouterr().out
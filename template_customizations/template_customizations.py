@@ -8,11 +8,12 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-import json
 import requests
 import urllib3
-from typing import Dict, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
 from auth.auth import OpsRampAuth
+from codec.codec import dump_to_file, iter_response, read_json
+from limiter.limiter import map_as_completed
 
 # Disable SSL warnings (temporary for development)
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -24,6 +25,9 @@ class TemplateCustomizationsManager:
     Retrieves the full JSON body of a template which is needed for cloning.
     """
     
+    # Bytes read at a time when streaming a payload
+    CHUNK_SIZE = 64 * 1024
+    
     def __init__(self, auth: OpsRampAuth, tenant_id: str):
         """
         Initialize TemplateCustomizationsManager.
@@ -53,10 +57,10 @@ class TemplateCustomizationsManager:
         headers = self.auth.get_auth_header()
         
         try:
-            response = requests.get(url, headers=headers, verify=False)
+            response = self.auth.session.get(url, headers=headers, verify=False)
             
             if response.status_code == 200:
-                return response.json()
+                return read_json(response)
             else:
                 print(f"  ✗ API Error [{response.status_code}]: {response.text}")
                 return None
@@ -65,6 +69,53 @@ class TemplateCustomizationsManager:
             print(f"  ✗ Request failed: {str(e)}")
             return None
     
+    def download_template_customizations(self, cloned_template_id: str,
+                                         sink: Callable[[Iterator[bytes]], Any]) -> Optional[Any]:
+        """
+        Stream the customization payload of a cloned template without parsing it.
+        
+        The response body is passed to sink as an iterator of CHUNK_SIZE chunks
+        while it arrives, so the payload is never held in memory as a whole.
+        
+        Args:
+            cloned_template_id: The cloned template ID
+            sink: Consumes the chunks, e.g. writing them to storage
+            
+        Returns:
+            Result of sink, None if the request failed (sink is not called on API errors)
+        """
+        url = f"{self.base_url}/api/v2/tenants/{self.tenant_id}/templates/{cloned_template_id}"
+        
+        headers = self.auth.get_auth_header()
+        
+        try:
+            with self.auth.session.get(url, headers=headers, verify=False, stream=True) as response:
+                if response.status_code == 200:
+                    return sink(iter_response(response, self.CHUNK_SIZE))
+                else:
+                    print(f"  ✗ API Error [{response.status_code}]: {response.text}")
+                    return None
+                
+        except requests.exceptions.RequestException as e:
+            print(f"  ✗ Request failed: {str(e)}")
+            return None
+    
+    def get_customizations_many(self, cloned_template_ids: Iterable[str],
+                                max_workers: Optional[int] = None
+                                ) -> Iterator[Tuple[str, Optional[Dict]]]:
+        """
+        Fetch the customizations of many cloned templates concurrently.
+        
+        Args:
+            cloned_template_ids: Cloned template IDs (read lazily)
+            max_workers: Concurrent requests (default: the POD's read limit)
+            
+        Returns:
+            Iterator of (template ID, customizations or None) in completion order
+        """
+        return map_as_completed(self.get_template_customizations, cloned_template_ids,
+                                max_workers or self.auth.limits.read.max_limit)
+    
     def save_customizations_to_file(self, customizations: Dict, filename: str) -> bool:
 
         # Save customizations payload to a JSON file.
@@ -75,8 +126,7 @@ class TemplateCustomizationsManager:
             
             output_path = output_dir / filename
             
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(customizations, f, indent=4)
+            dump_to_file(customizations, output_path)
             
             print(f"  ✓ Saved customizations to: {output_path}")
             return True
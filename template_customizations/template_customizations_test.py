@@ -0,0 +1,26 @@
+"""
+Tests for fetching template customization payloads.
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+from template_customizations.template_customizations import TemplateCustomizationsManager
+
+
+@pytest.mark.parametrize('count', [5, 25])
+def test_get_customizations_many(fake_network, count):
+    pod = fake_network.add_pod("pod1")
+    ids = [pod.add_clone("client", "Linux", description=f"Clone {i}")['id'] for i in range(count)]
+    other = pod.add_clone("other", "Linux")['id']
+    manager = TemplateCustomizationsManager(fake_network.auth("pod1"), "client")
+
+    results = dict(manager.get_customizations_many(iter(ids + [other, "missing"]), max_workers=4))
+
+    assert set(results) == set(ids) | {other, "missing"}
+    assert [results[template_id]['description'] for template_id in ids] == [f"Clone {i}" for i in range(count)]
+    # Templates of other tenants and unknown IDs are not found
+    assert results[other] is None and results["missing"] is None
+    assert pod.calls[('GET', 'template')] == count + 2
@@ -0,0 +1 @@
+# Transport module
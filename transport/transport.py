@@ -0,0 +1,266 @@
+"""
+Transport Module
+Record/replay of HTTP exchanges for deterministic offline reruns.
+
+Every OpsRampAuth session mounts the installed transport, so all manager and
+token requests go through it:
+
+    - RecordTransport sends requests normally and appends each exchange to a
+      gzip-compressed JSON-lines cassette. Credentials in form bodies and
+      query strings, and tokens in responses, are redacted before writing.
+    - ReplayTransport serves exchanges from a cassette without opening any
+      connection, optionally sleeping for the recorded latency.
+
+Replayed requests are matched on method, URL and a hash of the (redacted)
+body. Repeated identical requests are answered in recorded order, and the
+last recorded answer is reused once they run out.
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import base64
+import gzip
+import hashlib
+import io
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Dict, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from codec.codec import dumps, loads
+
+CASSETTE_VERSION = 1
+
+REDACTED = 'REDACTED'
+
+# Form fields, query parameters and JSON response keys that are never written to a cassette
+SECRET_FIELDS = frozenset({
+    'client_id', 'client_secret', 'access_token', 'refresh_token', 'password', 'token'
+})
+
+
+def _redact_pairs(pairs) -> list:
+    return [(key, REDACTED if key.lower() in SECRET_FIELDS else value) for key, value in pairs]
+
+
+def redact_url(url: str) -> str:
+    parts = urlsplit(url)
+    if not parts.query:
+        return url
+    query = urlencode(_redact_pairs(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit(parts._replace(query=query))
+
+
+def redact_body(body, content_type: str) -> bytes:
+    if body is None:
+        return b''
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    if 'x-www-form-urlencoded' in (content_type or ''):
+        pairs = parse_qsl(body.decode('utf-8'), keep_blank_values=True)
+        return urlencode(_redact_pairs(pairs)).encode('utf-8')
+    return body
+
+
+def redact_response(content: bytes, content_type: str) -> bytes:
+    # Token responses carry bearer tokens; other bodies are stored as-is
+    if 'json' not in (content_type or '') or not content:
+        return content
+    try:
+        data = loads(content)
+    except ValueError:
+        return content
+    if not isinstance(data, dict) or not SECRET_FIELDS.intersection(data):
+        return content
+    return dumps({key: REDACTED if key in SECRET_FIELDS else value for key, value in data.items()})
+
+
+def request_key(request: requests.PreparedRequest) -> Tuple[str, str, str]:
+    """
+    Key used to match a request against recorded exchanges.
+    """
+    content_type = request.headers.get('Content-Type', '')
+    body = redact_body(request.body, content_type)
+    return (request.method, redact_url(request.url), hashlib.sha1(body).hexdigest())
+
+
+class RecordingAdapter(HTTPAdapter):
+    
+    def __init__(self, transport: 'RecordTransport', **pool_kwargs):
+        # pool_kwargs: HTTPAdapter pool settings of the session being recorded
+        super().__init__(**pool_kwargs)
+        self.transport = transport
+    
+    def send(self, request, **kwargs):
+        start = time.perf_counter()
+        response = super().send(request, **kwargs)
+        # Read the body here so the recorded latency includes it
+        content = response.content
+        self.transport.record(request, response, content, time.perf_counter() - start)
+        return response
+
+
+class ReplayAdapter(BaseAdapter):
+    
+    def __init__(self, transport: 'ReplayTransport'):
+        super().__init__()
+        self.transport = transport
+    
+    def send(self, request, **kwargs):
+        exchange = self.transport.lookup(request)
+        if self.transport.latency:
+            time.sleep(exchange['elapsed'])
+        
+        response = requests.Response()
+        response.status_code = exchange['status']
+        response.reason = exchange.get('reason', '')
+        response.headers = CaseInsensitiveDict(exchange['headers'])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.raw = io.BytesIO(_decode_body(exchange))
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+    
+    def close(self):
+        pass
+
+
+def _encode_body(content: bytes) -> Dict:
+    try:
+        return {'body': content.decode('utf-8')}
+    except UnicodeDecodeError:
+        return {'body_b64': base64.b64encode(content).decode('ascii')}
+
+
+def _decode_body(exchange: Dict) -> bytes:
+    if 'body_b64' in exchange:
+        return base64.b64decode(exchange['body_b64'])
+    return exchange.get('body', '').encode('utf-8')
+
+
+class RecordTransport:
+    """
+    Records every exchange into a cassette file.
+    """
+    
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.count = 0
+        self._lock = threading.Lock()
+        self._file = gzip.open(self.path, 'wb')
+        self._file.write(dumps({'cassette_version': CASSETTE_VERSION}) + b'\n')
+    
+    def adapter(self, **pool_kwargs) -> RecordingAdapter:
+        return RecordingAdapter(self, **pool_kwargs)
+    
+    def record(self, request: requests.PreparedRequest, response: requests.Response,
+               content: bytes, elapsed: float) -> None:
+        method, url, body_hash = request_key(request)
+        content_type = response.headers.get('Content-Type', '')
+        exchange = {
+            'method': method,
+            'url': url,
+            'body_sha1': body_hash,
+            'status': response.status_code,
+            'reason': response.reason,
+            # Bodies are stored decoded, so no Content-Encoding is replayed
+            'headers': {'Content-Type': content_type} if content_type else {},
+            'elapsed': round(elapsed, 4),
+            **_encode_body(redact_response(content, content_type))
+        }
+        line = dumps(exchange) + b'\n'
+        with self._lock:
+            self._file.write(line)
+            self.count += 1
+    
+    def close(self) -> None:
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+class ReplayTransport:
+    """
+    Serves recorded exchanges from a cassette file without network access.
+    """
+    
+    def __init__(self, path: str, latency: bool = False):
+        self.path = Path(path)
+        self.latency = latency
+        self.count = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._exchanges = defaultdict(deque)
+        self._last: Dict[Tuple[str, str, str], Dict] = {}
+        
+        if not self.path.exists():
+            raise FileNotFoundError(f"Cassette not found: {self.path}")
+        
+        with gzip.open(self.path, 'rb') as f:
+            header = loads(f.readline())
+            if header.get('cassette_version') != CASSETTE_VERSION:
+                raise ValueError(f"Unsupported cassette version in {self.path}: {header.get('cassette_version')}")
+            for line in f:
+                exchange = loads(line)
+                self._exchanges[(exchange['method'], exchange['url'], exchange['body_sha1'])].append(exchange)
+    
+    def __len__(self):
+        return sum(len(queue) for queue in self._exchanges.values())
+    
+    def adapter(self, **pool_kwargs) -> ReplayAdapter:
+        # Replayed responses open no connections, so pool settings do not apply
+        return ReplayAdapter(self)
+    
+    def lookup(self, request: requests.PreparedRequest) -> Dict:
+        """
+        Next recorded exchange for a request.
+        
+        Raises:
+            requests.exceptions.ConnectionError: If the cassette holds no such request
+        """
+        key = request_key(request)
+        with self._lock:
+            queue = self._exchanges.get(key)
+            if queue:
+                self._last[key] = queue.popleft()
+            exchange = self._last.get(key)
+            if exchange is None:
+                self.misses += 1
+            else:
+                self.count += 1
+        
+        if exchange is None:
+            raise requests.exceptions.ConnectionError(
+                f"No recorded response for {key[0]} {key[1]} in {self.path.name}", request=request
+            )
+        return exchange
+    
+    def close(self) -> None:
+        pass
+
+
+_installed = None
+
+
+def install_transport(transport) -> None:
+    # Sessions created after this call use the transport (None restores the network)
+    global _installed
+    _installed = transport
+
+
+def mount_transport(session: requests.Session, **pool_kwargs) -> None:
+    # Called by OpsRampAuth for every new session, with the pool settings
+    # (pool_connections, pool_maxsize) of the HTTPAdapter it replaces
+    if _installed is not None:
+        adapter = _installed.adapter(**pool_kwargs)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
@@ -0,0 +1,119 @@
+"""
+Tests for cassette redaction and record/replay.
+"""
+import gzip
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+import requests
+from requests.adapters import HTTPAdapter
+from codec.codec import loads
+from transport.transport import (REDACTED, RecordTransport, ReplayTransport, install_transport, redact_body,
+                                 redact_response, redact_url)
+
+TEMPLATE_URL = "https://pod1/api/v2/tenants/client/templates/{}"
+
+
+@pytest.fixture
+def pod(fake_network, monkeypatch):
+    # Recorded requests reach the fake POD instead of the network
+    adapter = fake_network.adapter()
+    monkeypatch.setattr(HTTPAdapter, 'send', lambda self, request, **kwargs: adapter.send(request, **kwargs))
+    pod = fake_network.add_pod("pod1")
+    pod.add_clone("client", "Linux")
+    return pod
+
+
+def record(fake_network, path):
+    # A token request and two reads of a template that changes between them
+    transport = RecordTransport(path)
+    install_transport(transport)
+    auth = fake_network.auth("pod1")
+    auth.get_token()
+    pod = fake_network.pods["pod1"]
+    versions = [auth.session.get(TEMPLATE_URL.format("c1")).json()['version']]
+    pod.touch("c1", 2)
+    versions.append(auth.session.get(TEMPLATE_URL.format("c1")).json()['version'])
+    transport.close()
+    return transport, versions
+
+
+def test_redact_url():
+    url = redact_url("https://pod1/token?client_id=abc&pageNo=2&Token=xyz&password=")
+    assert url == f"https://pod1/token?client_id={REDACTED}&pageNo=2&Token={REDACTED}&password={REDACTED}"
+    assert redact_url("https://pod1/templates") == "https://pod1/templates"
+
+
+def test_redact_body():
+    form = redact_body("grant_type=client_credentials&client_id=abc&client_secret=s3cret",
+                       'application/x-www-form-urlencoded')
+    assert form == f"grant_type=client_credentials&client_id={REDACTED}&client_secret={REDACTED}".encode()
+    # Only form bodies are parsed
+    assert redact_body(b'{"client_secret": "s3cret"}', 'application/json') == b'{"client_secret": "s3cret"}'
+    assert redact_body(None, 'application/json') == b''
+
+
+def test_redact_response():
+    token = b'{"access_token": "abc", "refresh_token": "def", "token_type": "bearer"}'
+    assert loads(redact_response(token, 'application/json')) == {
+        'access_token': REDACTED, 'refresh_token': REDACTED, 'token_type': 'bearer'
+    }
+    # Nested keys, non-JSON and non-object bodies are kept
+    nested = b'{"results": [{"token": "abc"}]}'
+    assert redact_response(nested, 'application/json') == nested
+    assert redact_response(b'access_token=abc', 'text/plain') == b'access_token=abc'
+    assert redact_response(b'not json', 'application/json') == b'not json'
+
+
+def test_cassette_holds_no_credentials(fake_network, pod, tmp_path):
+    transport, _ = record(fake_network, tmp_path / "run.jsonl.gz")
+    assert transport.count == 3
+
+    text = gzip.decompress((tmp_path / "run.jsonl.gz").read_bytes()).decode()
+    assert "secret" not in text and "token-pod1" not in text
+    assert REDACTED in text
+
+
+def test_replay_round_trip_in_order(fake_network, pod, tmp_path):
+    """Identical requests are answered in recorded order, then the last answer is reused"""
+    _, recorded = record(fake_network, tmp_path / "run.jsonl.gz")
+    assert recorded == [1, 2]
+    calls = sum(pod.calls.values())
+
+    replay = ReplayTransport(tmp_path / "run.jsonl.gz")
+    assert len(replay) == 3
+    install_transport(replay)
+    auth = fake_network.auth("pod1")
+    assert auth.get_token()['access_token'] == REDACTED
+    replayed = [auth.session.get(TEMPLATE_URL.format("c1")).json()['version'] for _ in range(3)]
+
+    assert replayed == [1, 2, 2]
+    assert replay.count == 4 and replay.misses == 0
+    assert sum(pod.calls.values()) == calls
+
+
+def test_replay_miss(fake_network, pod, tmp_path):
+    """A request the cassette does not hold fails like an unreachable POD"""
+    record(fake_network, tmp_path / "run.jsonl.gz")
+    replay = ReplayTransport(tmp_path / "run.jsonl.gz")
+    install_transport(replay)
+    session = fake_network.auth("pod1").session
+
+    with pytest.raises(requests.exceptions.ConnectionError, match="No recorded response"):
+        session.get(TEMPLATE_URL.format("c2"))
+    # The same URL with a different method or body does not match either
+    with pytest.raises(requests.exceptions.ConnectionError):
+        session.put(TEMPLATE_URL.format("c1"), json={'name': "Renamed"})
+    assert replay.misses == 2 and replay.count == 0
+
+
+def test_replay_rejects_missing_or_unknown_cassettes(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        ReplayTransport(tmp_path / "missing.jsonl.gz")
+    with gzip.open(tmp_path / "old.jsonl.gz", 'wb') as f:
+        f.write(b'{"cassette_version": 0}\n')
+    with pytest.raises(ValueError, match="Unsupported cassette version"):
+        ReplayTransport(tmp_path / "old.jsonl.gz")
@@ -0,0 +1 @@
+# Verify module
@@ -0,0 +1,127 @@
+"""
+Verify Module
+Reads back cloned templates from the destination POD and checks that they
+hold the payload that was sent.
+
+Each relevant top-level field of the prepared clone payload is hashed in
+canonical JSON form when the check is submitted, so pending checks keep only
+hashes in memory. Checks run on a bounded thread pool while cloning continues.
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional
+from codec.codec import canonical_hash
+from template_customizations.template_customizations import TemplateCustomizationsManager
+
+# Fields assigned or rewritten by the destination POD, not compared
+VOLATILE_FIELDS = frozenset({
+    'id', 'clonedTemplateId', 'parentUUID', 'uniqueId', 'scope', 'version',
+    'createdDate', 'updatedDate', 'createdTime', 'updatedTime', 'createdBy',
+    'updatedBy', 'tenantId', 'clientId', 'partnerId', 'status'
+})
+
+
+def field_hashes(payload: Dict) -> Dict[str, str]:
+    # Canonical hash of every relevant top-level field
+    return {
+        field: canonical_hash(value)
+        for field, value in payload.items()
+        if field not in VOLATILE_FIELDS
+    }
+
+
+class VerificationResult:
+    
+    def __init__(self, label: str, template_id: str, verified: bool,
+                 mismatched_fields: Optional[List[str]] = None, error: str = ""):
+        self.label = label
+        self.template_id = template_id
+        self.verified = verified
+        self.mismatched_fields = mismatched_fields or []
+        self.error = error
+    
+    def __repr__(self):
+        return (f"VerificationResult(label='{self.label[:40]}', "
+                f"verified={self.verified})")
+    
+    def to_dict(self) -> Dict:
+        return {
+            'template_id': self.template_id,
+            'verified': self.verified,
+            'mismatched_fields': self.mismatched_fields,
+            'error': self.error
+        }
+
+
+class TemplateVerifier:
+    """
+    Verifies cloned templates concurrently with bounded parallelism.
+    """
+    
+    def __init__(self, max_workers: int = 4, retries: int = 2, retry_delay: float = 1.0):
+        """
+        Initialize TemplateVerifier.
+        
+        Args:
+            max_workers: Maximum number of concurrent read-backs
+            retries: Extra attempts when the new template cannot be read yet
+            retry_delay: Seconds between attempts
+        """
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='verify')
+        self.futures = []
+    
+    def submit(self, label: str, customizations_mgr: TemplateCustomizationsManager,
+               template_id: str, prepared_payload: Dict) -> None:
+        """
+        Schedule verification of one cloned template.
+        
+        Args:
+            label: Result key of the template
+            customizations_mgr: Manager for the destination POD and tenant
+            template_id: ID of the newly cloned template
+            prepared_payload: Payload that was sent to the clone API
+        """
+        expected = field_hashes(prepared_payload)
+        self.futures.append(
+            self.executor.submit(self._verify, label, customizations_mgr, template_id, expected)
+        )
+    
+    def _verify(self, label: str, customizations_mgr: TemplateCustomizationsManager,
+                template_id: str, expected: Dict[str, str]) -> VerificationResult:
+        
+        actual_payload = None
+        try:
+            for attempt in range(self.retries + 1):
+                # Same GET as Step 5 on POD-1
+                actual_payload = customizations_mgr.get_template_customizations(template_id)
+                if actual_payload is not None:
+                    break
+                if attempt < self.retries:
+                    time.sleep(self.retry_delay)
+        except Exception as e:
+            return VerificationResult(label, template_id, False, error=str(e))
+        
+        if actual_payload is None:
+            return VerificationResult(label, template_id, False, error="Template could not be read back")
+        
+        actual = field_hashes(actual_payload)
+        mismatched = sorted(field for field, digest in expected.items() if actual.get(field) != digest)
+        return VerificationResult(label, template_id, not mismatched, mismatched)
+    
+    def results(self) -> Iterator[VerificationResult]:
+        """
+        Yield verification results as they complete, then shut the pool down.
+        """
+        try:
+            for future in as_completed(self.futures):
+                yield future.result()
+        finally:
+            self.futures = []
+            self.executor.shutdown(wait=True)
@@ -0,0 +1,97 @@
+"""
+Tests for reading back and comparing cloned templates.
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+from state.state import RunStateStore
+from template_customizations.template_customizations import TemplateCustomizationsManager
+from verify.verify import VOLATILE_FIELDS, TemplateVerifier, field_hashes
+
+MONITORS = [{'metric': 'cpu', 'threshold': 90}]
+
+
+@pytest.fixture
+def customizations(fake_network):
+    # Destination tenant holding one clone, read back with MONITORS by the fake POD
+    pod = fake_network.add_pod("pod2")
+    pod.add_clone("target", "Linux", description="Linux servers")
+    return TemplateCustomizationsManager(fake_network.auth("pod2"), "target")
+
+
+def payload(**fields):
+    # Payload as prepared for the clone API
+    return dict({'name': "Clone of Linux", 'description': "Linux servers", 'monitors': MONITORS,
+                 'clonedTemplateId': "g-Linux", 'version': 7}, **fields)
+
+
+def verify(verifier, manager, template_id, prepared):
+    verifier.submit("Linux", manager, template_id, prepared)
+    results = list(verifier.results())
+    assert len(results) == 1
+    return results[0]
+
+
+class FailingManager:
+    # Destination whose read-back raises
+
+    def get_template_customizations(self, template_id):
+        raise RuntimeError("connection reset")
+
+
+def test_field_hashes_skip_volatile_fields():
+    hashes = field_hashes(payload(id="c9", updatedTime="2026-01-01T00:00:00"))
+    assert set(hashes) == {'name', 'description', 'monitors'}
+    assert not VOLATILE_FIELDS.intersection(hashes)
+    # Key order does not change a field's hash
+    assert field_hashes({'monitors': [{'threshold': 90, 'metric': 'cpu'}]})['monitors'] == hashes['monitors']
+
+
+def test_matching_template_is_verified(customizations):
+    """Fields the POD assigns (id, version, scope, ...) differ but are ignored"""
+    result = verify(TemplateVerifier(), customizations, "c1", payload())
+    assert result.verified and result.mismatched_fields == [] and result.error == ""
+
+
+def test_changed_fields_are_listed(customizations):
+    prepared = payload(description="Windows servers", monitors=[{'metric': 'cpu', 'threshold': 80}])
+    result = verify(TemplateVerifier(), customizations, "c1", prepared)
+    assert not result.verified
+    assert result.mismatched_fields == ['description', 'monitors']
+
+
+def test_unreadable_template_is_recorded(fake_network, customizations):
+    """A template that cannot be read back is retried, then reported as an error"""
+    pod = fake_network.pods["pod2"]
+    result = verify(TemplateVerifier(retries=2, retry_delay=0), customizations, "missing", payload())
+    assert not result.verified and result.error == "Template could not be read back"
+    assert pod.calls[('GET', 'template')] == 3
+
+
+def test_read_back_exception_is_recorded():
+    result = verify(TemplateVerifier(retry_delay=0), FailingManager(), "c1", payload())
+    assert not result.verified and result.error == "connection reset"
+
+
+def test_results_persist_in_run_state(customizations, tmp_path):
+    verifier = TemplateVerifier(max_workers=2, retries=0)
+    verifier.submit("Linux", customizations, "c1", payload())
+    verifier.submit("Linux (POD3)", customizations, "c1", payload(name="Renamed"))
+    verifier.submit("Missing", customizations, "missing", payload())
+
+    path = tmp_path / "state.db"
+    with RunStateStore(path) as state:
+        for result in verifier.results():
+            state.set_verify_result(result.label, result.to_dict())
+
+    with RunStateStore(path) as state:
+        stored = dict(state.iter_verify_results())
+    assert stored == {
+        "Linux": {'template_id': "c1", 'verified': True, 'mismatched_fields': [], 'error': ''},
+        "Linux (POD3)": {'template_id': "c1", 'verified': False, 'mismatched_fields': ['name'], 'error': ''},
+        "Missing": {'template_id': "missing", 'verified': False, 'mismatched_fields': [],
+                    'error': "Template could not be read back"}
+    }